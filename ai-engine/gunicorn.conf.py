@@ -0,0 +1,34 @@
+"""
+Gunicorn settings for the production serve mode (`main.py serve-prod`)
+
+Uvicorn workers forked from a master that has already imported the app,
+so crewAI, the tools and the parsed crew configuration are loaded once and
+shared copy-on-write. Workers drain on SIGTERM, see validity_crew.lifecycle.
+"""
+import os
+
+from validity_crew.lifecycle import DRAIN_TIMEOUT_SECONDS
+
+bind = f"{os.getenv('ENGINE_HOST', '0.0.0.0')}:{os.getenv('ENGINE_PORT', '8000')}"
+workers = int(os.getenv("ENGINE_WORKERS", "2"))
+worker_class = "uvicorn.workers.UvicornWorker"
+preload_app = True
+# Room for running executions to finish before workers are killed
+graceful_timeout = DRAIN_TIMEOUT_SECONDS + 30
+timeout = 60
+keepalive = 5
+accesslog = "-"
+loglevel = os.getenv("ENGINE_LOG_LEVEL", "info")
+
+
+def on_starting(server):
+    from validity_crew.lifecycle import prepare_master
+    prepare_master()
+
+
+def post_fork(server, worker):
+    # Never reuse pooled connections inherited from the master
+    from validity_crew.database import engine
+    engine.sync_engine.dispose(close=False)
+    from validity_crew.logging_config import restart_listener_after_fork
+    restart_listener_after_fork()
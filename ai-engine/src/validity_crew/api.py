@@ -1,25 +1,66 @@
-from fastapi import FastAPI, HTTPException, BackgroundTasks, Depends
-from fastapi.responses import JSONResponse
+from fastapi import FastAPI, HTTPException, BackgroundTasks, Depends, Header
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import FileResponse, JSONResponse, StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
+from sqlalchemy import select, func, text
 from datetime import datetime
+from typing import Optional
+import asyncio
+import json
+import os
 import uuid
 import logging
 import traceback
 
 from .models import (
     ValidationRequest, ValidationResponse, ValidationStatus, 
-    ValidationResult, ErrorResponse, HealthResponse, UserContext
+    ValidationResult, ErrorResponse, HealthResponse, UserContext,
+    QuickValidationResult, ValidationUsage, ReadinessResponse, MetricsResponse,
+    SimilarityStats
 )
 from .crew import ValidityCrew
+from .quick import run_quick_validation as run_quick_report
+from .planner import build_task_plan
+from .similarity import find_warm_start, index_execution, similarity_stats
+from .llm_usage import LLMUsageRecorder, register_recorder, unregister_recorder
 from .database import (
     get_db, create_tables, ValidationExecution, AgentResult, ValidationMetrics,
     ExecutionStatus, AgentStatus, AgentStage
 )
+from .streaming import (
+    open_report_stream, get_report_stream, close_report_stream, iter_relayed_events, close_relay
+)
+from .clients import install_llm_client, close_clients, connection_metrics
+from .tracing import (
+    span, record_span, export_trace, install_crewai_tracing, parse_traceparent, parse_queued_since
+)
+from .logging_config import configure_logging, execution_logging, EXECUTION_LOG_DIR
+from .lifecycle import lifecycle, mark_interrupted, SCHEMA_READY_ENV
+
+# Stage each crew task belongs to, used when recording AgentResult rows
+TASK_STAGES = {
+    "requirements_analysis_task": AgentStage.RESEARCH,
+    "market_research_task": AgentStage.RESEARCH,
+    "competition_analysis_task": AgentStage.RESEARCH,
+    "financial_projection_task": AgentStage.ANALYSIS,
+    "risk_assessment_task": AgentStage.ANALYSIS,
+    "product_validation_task": AgentStage.VALIDATION,
+    "operations_analysis_task": AgentStage.ANALYSIS,
+    "marketing_strategy_task": AgentStage.ANALYSIS,
+    "technology_assessment_task": AgentStage.VALIDATION,
+    "legal_analysis_task": AgentStage.VALIDATION,
+}
+
+# Readiness fails if the database doesn't answer within this many seconds
+READINESS_DB_TIMEOUT_SECONDS = 2
+
+# How often report streams without a local producer re-check the database
+STREAM_POLL_INTERVAL_SECONDS = 2
 
 # Configure logging
-logging.basicConfig(level=logging.INFO)
+configure_logging()
 logger = logging.getLogger(__name__)
+install_crewai_tracing()
 
 app = FastAPI(
     title="Business Validation AI Engine",
@@ -32,17 +73,149 @@ app = FastAPI(
 @app.on_event("startup")
 async def startup_event():
     """Initialize database tables on startup"""
-    await create_tables()
+    # Already done by the gunicorn master in production serve mode
+    if not os.getenv(SCHEMA_READY_ENV):
+        await create_tables()
+        logger.info("📊 Database tables created/verified")
+    install_llm_client()
+    lifecycle.mark_started()
     logger.info("🚀 Business Validation AI Engine started successfully")
-    logger.info("📊 Database tables created/verified")
     logger.info("🤖 11 AI agents ready for business validation")
 
 
-async def run_validation_crew(execution_id: str, user_context: UserContext, topic: str):
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Release pooled connections"""
+    close_clients()
+    await close_relay()
+
+
+def _crew_inputs(user_context: UserContext, topic: str) -> dict:
+    return {
+        'topic': topic,
+        'user_context': user_context.dict(),
+        'current_year': str(datetime.now().year)
+    }
+
+
+async def _commit(session: AsyncSession):
+    with span("db.commit"):
+        await session.commit()
+
+
+async def run_validation(
+    execution_id: str,
+    user_context: UserContext,
+    topic: str,
+    mode: str,
+    verbose: bool = False,
+    request_span=None
+):
+    """
+    Background task running the quick report and/or the full crew for an execution
+    
+    Continues the trace of `request_span` (the start_validation span) and
+    exports it when done.
+    """
+    jobs = []
+    if mode in ("quick", "quick_and_full"):
+        jobs.append(run_quick_validation(execution_id, user_context, topic, final=(mode == "quick")))
+    if mode in ("full", "quick_and_full"):
+        jobs.append(run_validation_crew(execution_id, user_context, topic, verbose))
+    trace_id = request_span.trace_id if request_span else None
+    parent_id = request_span.parent_id if request_span else None
+    run_span = None
+    with lifecycle.track(execution_id), execution_logging(execution_id, verbose):
+        try:
+            with span("run_validation", trace_id=trace_id, parent_id=parent_id,
+                      execution_id=execution_id, mode=mode) as run_span:
+                if request_span and run_span:
+                    record_span("queue.engine", request_span.end_us, run_span.start_us,
+                                trace_id=trace_id, parent_id=parent_id)
+                await asyncio.gather(*jobs)
+        except asyncio.CancelledError:
+            # Drain deadline passed during shutdown
+            await mark_interrupted(execution_id)
+            logger.warning(f"🛑 Execution interrupted by shutdown: {execution_id}")
+            raise
+        finally:
+            if run_span:
+                await asyncio.to_thread(export_trace, run_span.trace_id, execution_id)
+
+
+async def run_quick_validation(execution_id: str, user_context: UserContext, topic: str, final: bool):
+    """
+    Produce the quick single-pass report
+    
+    With `final` the quick report is the execution's result; otherwise it is
+    stored alongside while the full crew keeps running.
+    """
+    from .database import async_session_maker
+    
+    async with async_session_maker() as session:
+        result = await session.execute(
+            select(ValidationExecution).where(ValidationExecution.execution_id == execution_id)
+        )
+        execution = result.scalar_one()
+        if final:
+            execution.status = ExecutionStatus.RUNNING
+            execution.started_at = datetime.now()
+            await _commit(session)
+        
+        usage = LLMUsageRecorder()
+        register_recorder(usage)
+        error = None
+        try:
+            with span("quick.report"):
+                report = await asyncio.to_thread(run_quick_report, _crew_inputs(user_context, topic), usage)
+            
+            execution.quick_report_markdown = report
+            execution.quick_completed_at = datetime.now()
+            if final:
+                execution.status = ExecutionStatus.COMPLETED
+                execution.completed_at = execution.quick_completed_at
+                execution.final_report = {
+                    "raw_result": report,
+                    "summary": "Quick validation completed",
+                    "recommendations": []
+                }
+                execution.final_report_markdown = report
+                totals = usage.totals()
+                session.add(ValidationMetrics(
+                    execution_id=execution_id,
+                    agents_count=1,
+                    total_tokens_used=totals["prompt_tokens"] + totals["completion_tokens"],
+                    cached_prompt_tokens=totals["cached_prompt_tokens"],
+                    llm_calls=usage.calls,
+                    execution_duration_seconds=int((execution.completed_at - execution.started_at).total_seconds())
+                ))
+                stream = get_report_stream(execution_id)
+                if stream:
+                    stream.push(report)
+            await _commit(session)
+            logger.info(f"⚡ Quick report ready for execution_id: {execution_id}")
+        
+        except Exception as e:
+            logger.error(f"❌ Quick validation failed for execution_id: {execution_id}, error: {str(e)}")
+            error = str(e)
+            if final:
+                execution.status = ExecutionStatus.FAILED
+                execution.completed_at = datetime.now()
+                execution.error_message = str(e)
+                await _commit(session)
+        
+        finally:
+            unregister_recorder(usage)
+            if final:
+                close_report_stream(execution_id, error)
+
+
+async def run_validation_crew(execution_id: str, user_context: UserContext, topic: str, verbose: bool = False):
     """Background task to run the validation crew"""
     from .database import async_session_maker
     
     async with async_session_maker() as session:
+        error = None
         try:
             # Get the execution record
             result = await session.execute(
@@ -50,62 +223,128 @@ async def run_validation_crew(execution_id: str, user_context: UserContext, topi
             )
             execution = result.scalar_one()
             
+            # Drop agents irrelevant to this idea
+            plan = build_task_plan(user_context, topic)
+            
             # Update status to running
             execution.status = ExecutionStatus.RUNNING
             execution.started_at = datetime.now()
-            await session.commit()
+            execution.task_plan = plan.to_dict()
+            await _commit(session)
             
-            logger.info(f"🚀 Starting validation for execution_id: {execution_id}")
+            logger.info(
+                f"🚀 Starting validation for execution_id: {execution_id} "
+                f"({len(plan.tasks) + 1} agents, skipped: {sorted(plan.skipped)}, merged: {sorted(plan.merged)})"
+            )
             
             # Prepare inputs for the crew
-            inputs = {
-                'topic': topic,
-                'user_context': user_context.dict(),
-                'current_year': str(datetime.now().year)
-            }
+            inputs = _crew_inputs(user_context, topic)
             
-            # Run the crew
-            crew_instance = ValidityCrew()
-            result = crew_instance.crew().kickoff(inputs=inputs)
+            # Build on (or reuse sections of) validations of similar ideas
+            with span("similarity.lookup"):
+                warm = await find_warm_start(session, user_context, topic, plan.tasks, execution.owner_id)
+            if warm.matches:
+                logger.info(
+                    f"🧭 Similar ideas for execution_id: {execution_id}: {warm.matches} "
+                    f"(reused: {sorted(warm.reused)}, context: {sorted(warm.context)})"
+                )
+            
+            # Run the crew under per-task and overall deadlines in a worker
+            # thread, so the event loop keeps serving report streams
+            stream = get_report_stream(execution_id)
+            crew_instance = ValidityCrew(
+                on_report_chunk=stream.push if stream else None, plan=plan, warm_start=warm, verbose=verbose
+            )
+            with span("crew.kickoff", agents=len(plan.tasks) + 1):
+                result = await asyncio.to_thread(crew_instance.kickoff_with_deadlines, inputs)
             
             # Store the result
             execution.status = ExecutionStatus.COMPLETED
             execution.completed_at = datetime.now()
             execution.final_report = {
-                "raw_result": str(result),
-                "summary": "Validation completed successfully",
-                "recommendations": []
+                "raw_result": result.report,
+                "summary": "Validation completed successfully" if not result.missing_sections
+                           else "Validation completed with missing sections",
+                "recommendations": [],
+                "completed_sections": result.completed_sections,
+                "missing_sections": result.missing_sections,
+                "skipped_sections": result.skipped_sections,
+                "reused_sections": result.reused_sections
             }
-            execution.final_report_markdown = str(result)
+            execution.final_report_markdown = result.report
             
-            # Create metrics record
+            # Record per-section outcome so missing sections stay visible
+            for task_name, output in result.section_outputs.items():
+                result_data = {"output": output}
+                if task_name in result.reused_sections:
+                    result_data["reused_from"] = warm.reused_from
+                session.add(AgentResult(
+                    execution_id=execution_id,
+                    agent_name=task_name,
+                    status=AgentStatus.COMPLETED,
+                    stage=TASK_STAGES[task_name],
+                    completed_at=execution.completed_at,
+                    result_data=result_data
+                ))
+            for task_name, reason in result.missing_sections.items():
+                session.add(AgentResult(
+                    execution_id=execution_id,
+                    agent_name=task_name,
+                    status=AgentStatus.FAILED,
+                    stage=TASK_STAGES[task_name],
+                    error_message=reason
+                ))
+            
+            # Create metrics record, including provider prompt-cache hits per call
+            prompt_tokens = sum(call["prompt_tokens"] for call in result.llm_calls)
+            completion_tokens = sum(call["completion_tokens"] for call in result.llm_calls)
             metrics = ValidationMetrics(
                 execution_id=execution_id,
-                agents_count=11,
-                total_tokens_used=0,  # Will be updated based on actual usage
-                report_completeness_score=100
+                agents_count=len(result.completed_sections) + 1,
+                agents_skipped=len(plan.skipped) + len(plan.merged),
+                total_tokens_used=prompt_tokens + completion_tokens,
+                cached_prompt_tokens=sum(call["cached_prompt_tokens"] for call in result.llm_calls),
+                llm_calls=result.llm_calls,
+                execution_duration_seconds=int((execution.completed_at - execution.started_at).total_seconds()),
+                report_completeness_score=result.completeness_score,
+                similarity_checked=warm.vector is not None,
+                similar_execution_id=warm.best_match[0],
+                similarity_score=warm.best_match[1],
+                sections_reused=len(result.reused_sections),
+                sections_with_context=len(warm.context),
+                tokens_saved=warm.tokens_saved if result.reused_sections else 0
             )
             session.add(metrics)
             
-            await session.commit()
-            logger.info(f"✅ Validation completed for execution_id: {execution_id}")
+            await _commit(session)
+            await asyncio.to_thread(index_execution, execution_id, execution.owner_id, warm.vector)
+            logger.info(
+                f"✅ Validation completed for execution_id: {execution_id} "
+                f"(completeness {result.completeness_score}%)"
+            )
             
         except Exception as e:
             logger.error(f"❌ Validation failed for execution_id: {execution_id}, error: {str(e)}")
             logger.error(traceback.format_exc())
             
             # Update status to failed
+            error = str(e)
             execution.status = ExecutionStatus.FAILED
             execution.completed_at = datetime.now()
-            execution.error_message = str(e)
-            await session.commit()
+            execution.error_message = error
+            await _commit(session)
+        
+        finally:
+            close_report_stream(execution_id, error)
 
 
 @app.post("/api/v1/validate", response_model=ValidationResponse)
 async def start_validation(
     request: ValidationRequest,
     background_tasks: BackgroundTasks,
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db),
+    traceparent: Optional[str] = Header(None),
+    tracestate: Optional[str] = Header(None)
 ):
     """
     Start business idea validation process
@@ -122,39 +361,61 @@ async def start_validation(
     9. Technology Assessor
     10. Legal Advisor
     11. Report Generator
+    
+    A W3C `traceparent` header makes the execution's trace part of the
+    caller's (see tracing.py).
     """
+    if lifecycle.draining:
+        raise HTTPException(
+            status_code=503,
+            detail="AI engine is shutting down, retry shortly",
+            headers={"Retry-After": "5"}
+        )
+    trace_id, parent_id = parse_traceparent(traceparent)
+    queued_since = parse_queued_since(tracestate)
     try:
-        execution_id = str(uuid.uuid4())
+        with span("start_validation", trace_id=trace_id, parent_id=parent_id, mode=request.mode) as request_span:
+            if request_span and queued_since:
+                # Time the caller's job spent queued before reaching us
+                record_span("queue.backend", queued_since, request_span.start_us,
+                            trace_id=request_span.trace_id, parent_id=parent_id)
+            execution_id = str(uuid.uuid4())
         
-        # Create execution record in database
-        execution = ValidationExecution(
-            execution_id=execution_id,
-            status=ExecutionStatus.PENDING,
-            user_context=request.user_context.dict(),
-            topic=request.topic,
-            webhook_url=request.webhook_url,
-            created_at=datetime.now()
-        )
+            # Create execution record in database
+            execution = ValidationExecution(
+                execution_id=execution_id,
+                status=ExecutionStatus.PENDING,
+                user_context=request.user_context.dict(),
+                topic=request.topic,
+                webhook_url=request.webhook_url,
+                owner_id=request.owner_id,
+                mode=request.mode,
+                created_at=datetime.now()
+            )
         
-        db.add(execution)
-        await db.commit()
-        await db.refresh(execution)
+            db.add(execution)
+            await _commit(db)
+            await db.refresh(execution)
+            open_report_stream(execution_id)
         
-        # Add background task
-        background_tasks.add_task(
-            run_validation_crew, 
-            execution_id, 
-            request.user_context, 
-            request.topic
-        )
+            # Add background task
+            background_tasks.add_task(
+                run_validation, 
+                execution_id, 
+                request.user_context, 
+                request.topic,
+                request.mode,
+                request.verbose,
+                request_span
+            )
         
-        logger.info(f"🎯 Started validation process: {execution_id}")
+            logger.info(f"🎯 Started validation process: {execution_id} (mode: {request.mode})")
         
-        return ValidationResponse(
-            execution_id=execution_id,
-            status="started",
-            estimated_duration_minutes=20
-        )
+            return ValidationResponse(
+                execution_id=execution_id,
+                status="started",
+                estimated_duration_minutes=1 if request.mode == "quick" else 20
+            )
         
     except Exception as e:
         logger.error(f"Failed to start validation: {str(e)}")
@@ -193,9 +454,11 @@ async def get_validation_status(execution_id: str, db: AsyncSession = Depends(ge
         started_at=execution.started_at,
         completed_at=execution.completed_at,
         agents_completed=agents_completed,
-        total_agents=11,
+        total_agents=len(execution.task_plan["tasks"]) + 1 if execution.task_plan else 11,
         current_stage=f"Stage: {execution.status.value}",
-        error_message=execution.error_message
+        error_message=execution.error_message,
+        mode=execution.mode or "full",
+        quick_report_ready=execution.quick_report_markdown is not None
     )
 
 
@@ -222,14 +485,150 @@ async def get_validation_result(execution_id: str, db: AsyncSession = Depends(ge
             detail=f"Validation not completed. Current status: {execution.status.value}"
         )
     
+    metrics = (await db.execute(
+        select(ValidationMetrics)
+        .where(ValidationMetrics.execution_id == execution_id)
+        .order_by(ValidationMetrics.id.desc())
+        .limit(1)
+    )).scalar_one_or_none()
+    
     return ValidationResult(
         execution_id=execution_id,
         status=execution.status.value,
         final_report=execution.final_report or {},
         final_report_markdown=execution.final_report_markdown or "",
         created_at=execution.created_at,
-        completed_at=execution.completed_at
+        completed_at=execution.completed_at,
+        metrics=ValidationUsage(
+            agents_count=metrics.agents_count,
+            total_tokens=metrics.total_tokens_used or 0,
+            cached_prompt_tokens=metrics.cached_prompt_tokens or 0,
+            llm_calls=len(metrics.llm_calls or []),
+            duration_seconds=metrics.execution_duration_seconds
+        ) if metrics else None
+    )
+
+
+@app.get("/api/v1/result/{execution_id}/quick", response_model=QuickValidationResult)
+async def get_quick_validation_result(execution_id: str, db: AsyncSession = Depends(get_db)):
+    """
+    Get the quick report
+    
+    Available for `quick` and `quick_and_full` executions as soon as the
+    single-pass report is ready, independently of the full crew run.
+    """
+    result = await db.execute(
+        select(ValidationExecution).where(ValidationExecution.execution_id == execution_id)
     )
+    execution = result.scalar_one_or_none()
+    
+    if not execution:
+        raise HTTPException(status_code=404, detail="Execution not found")
+    
+    if execution.quick_report_markdown is None:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Quick report not ready. Current status: {execution.status.value}"
+        )
+    
+    return QuickValidationResult(
+        execution_id=execution_id,
+        report_markdown=execution.quick_report_markdown,
+        completed_at=execution.quick_completed_at
+    )
+
+
+@app.get("/api/v1/result/{execution_id}/stream")
+async def stream_validation_result(execution_id: str, db: AsyncSession = Depends(get_db)):
+    """
+    Stream the final report as it is generated
+    
+    Server-sent events: `chunk` events carry report text as the report generator
+    produces it, `error` the failure message if the execution fails, `done`
+    marks the end. Finished executions send the stored report as a single chunk.
+    """
+    result = await db.execute(
+        select(ValidationExecution).where(ValidationExecution.execution_id == execution_id)
+    )
+    execution = result.scalar_one_or_none()
+    
+    if not execution:
+        raise HTTPException(status_code=404, detail="Execution not found")
+    
+    if execution.status == ExecutionStatus.FAILED:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Validation failed: {execution.error_message}"
+        )
+    
+    return StreamingResponse(
+        _report_events(execution_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+def _sse(event: str, data) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+async def _report_events(execution_id: str):
+    from .database import async_session_maker
+    
+    stream = get_report_stream(execution_id)
+    if stream:
+        async for chunk in stream.iter_chunks():
+            yield _sse("chunk", chunk)
+        if stream.error:
+            yield _sse("error", {"error": stream.error})
+        yield _sse("done", {"execution_id": execution_id})
+        return
+    
+    # Running in another worker: follow its stream through Redis
+    relayed = False
+    async for event in iter_relayed_events(execution_id):
+        relayed = True
+        if "chunk" in event:
+            yield _sse("chunk", event["chunk"])
+        elif event.get("error"):
+            yield _sse("error", {"error": event["error"]})
+    if relayed:
+        yield _sse("done", {"execution_id": execution_id})
+        return
+    
+    # Not relayed (or expired): wait for the stored report instead
+    while True:
+        async with async_session_maker() as session:
+            result = await session.execute(
+                select(ValidationExecution).where(ValidationExecution.execution_id == execution_id)
+            )
+            execution = result.scalar_one()
+        if execution.status == ExecutionStatus.COMPLETED:
+            yield _sse("chunk", execution.final_report_markdown or "")
+            break
+        if execution.status == ExecutionStatus.FAILED:
+            yield _sse("error", {"error": execution.error_message})
+            break
+        await asyncio.sleep(STREAM_POLL_INTERVAL_SECONDS)
+    yield _sse("done", {"execution_id": execution_id})
+
+
+@app.get("/api/v1/logs/{execution_id}")
+async def get_execution_log(execution_id: str):
+    """
+    Log of an execution (JSON lines)
+    
+    Includes the agents' traces when the validation was started with `verbose`.
+    Only available on the worker volume that ran it.
+    """
+    try:
+        uuid.UUID(execution_id)
+    except ValueError:
+        raise HTTPException(status_code=404, detail="Execution log not found")
+    path = EXECUTION_LOG_DIR / f"{execution_id}.log"
+    if not path.exists():
+        raise HTTPException(status_code=404, detail="Execution log not found")
+    return FileResponse(path, media_type="application/x-ndjson")
 
 
 @app.get("/api/v1/health", response_model=HealthResponse)
@@ -242,6 +641,50 @@ async def health_check():
     return HealthResponse()
 
 
+@app.get("/api/v1/ready", response_model=ReadinessResponse, responses={503: {"model": ReadinessResponse}})
+async def readiness_check(db: AsyncSession = Depends(get_db)):
+    """
+    Readiness check endpoint
+    
+    Unlike /health (liveness), fails with 503 while the worker is starting,
+    draining before shutdown or can't reach its database, so load balancers
+    stop routing new validations to it without restarting it.
+    """
+    readiness = ReadinessResponse(status=lifecycle.status, in_flight_executions=len(lifecycle.in_flight))
+    if readiness.status == "ready":
+        try:
+            await asyncio.wait_for(db.execute(text("SELECT 1")), timeout=READINESS_DB_TIMEOUT_SECONDS)
+        except Exception as e:
+            logger.warning(f"Readiness check failed: {str(e)}")
+            readiness.status = "unavailable"
+    return JSONResponse(
+        status_code=200 if readiness.status == "ready" else 503,
+        content=jsonable_encoder(readiness)
+    )
+
+
+@app.get("/api/v1/metrics", response_model=MetricsResponse)
+async def metrics():
+    """
+    Connection reuse of this worker's shared HTTP clients
+    
+    `reuse_ratio` is the share of requests sent over an already open
+    connection; counters are per process.
+    """
+    return MetricsResponse(pid=os.getpid(), **connection_metrics())
+
+
+@app.get("/api/v1/similarity/stats", response_model=SimilarityStats)
+async def get_similarity_stats(db: AsyncSession = Depends(get_db)):
+    """
+    Warm-start statistics
+    
+    How often full validations found similar prior ideas to build on or
+    reuse sections from, and the tokens reusing them saved.
+    """
+    return SimilarityStats(**await similarity_stats(db))
+
+
 @app.exception_handler(Exception)
 async def general_exception_handler(request, exc):
     """General exception handler"""
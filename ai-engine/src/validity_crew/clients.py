@@ -0,0 +1,170 @@
+"""
+Process-wide HTTP clients shared by every agent, tool and execution
+
+LLM calls go through litellm, which hands `litellm.client_session` to the
+provider SDKs; one pooled keep-alive httpx client (HTTP/2 when `h2` is
+installed) therefore serves all agents. Search tools share one requests
+session. Both count requests against newly opened connections, exported
+at /api/v1/metrics.
+"""
+import importlib.util
+import logging
+import os
+import threading
+from typing import Any, Dict, Optional
+
+import httpx
+import litellm
+import requests
+from crewai_tools import SerperDevTool
+from requests.adapters import HTTPAdapter
+
+from .tracing import span
+
+logger = logging.getLogger(__name__)
+
+LLM_POOL_SIZE = int(os.getenv("LLM_HTTP_POOL_SIZE", "32"))
+SEARCH_POOL_SIZE = int(os.getenv("SEARCH_HTTP_POOL_SIZE", "16"))
+KEEPALIVE_EXPIRY_SECONDS = float(os.getenv("HTTP_KEEPALIVE_EXPIRY_SECONDS", "60"))
+LLM_TIMEOUT_SECONDS = float(os.getenv("LLM_HTTP_TIMEOUT_SECONDS", "600"))
+SEARCH_TIMEOUT_SECONDS = float(os.getenv("SEARCH_HTTP_TIMEOUT_SECONDS", "10"))
+HTTP2_ENABLED = importlib.util.find_spec("h2") is not None
+
+
+class ConnectionStats:
+    """Requests sent vs connections opened by one client"""
+
+    def __init__(self):
+        self.requests = 0
+        self.connections_opened = 0
+        self.http2_requests = 0
+        self._lock = threading.Lock()
+
+    def add(self, requests: int = 0, connections_opened: int = 0, http2_requests: int = 0):
+        with self._lock:
+            self.requests += requests
+            self.connections_opened += connections_opened
+            self.http2_requests += http2_requests
+
+    def as_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            reused = max(0, self.requests - self.connections_opened)
+            return {
+                "requests": self.requests,
+                "connections_opened": self.connections_opened,
+                "http2_requests": self.http2_requests,
+                "reuse_ratio": round(reused / self.requests, 3) if self.requests else 0.0,
+            }
+
+
+llm_stats = ConnectionStats()
+
+_llm_client: Optional[httpx.Client] = None
+_search_session: Optional[requests.Session] = None
+_lock = threading.Lock()
+
+
+def _trace_llm_connection(event_name: str, info: Dict[str, Any]):
+    # httpcore trace events; only new connections run the TCP connect
+    if event_name == "connection.connect_tcp.complete":
+        llm_stats.add(connections_opened=1)
+    elif event_name == "http2.send_request_headers.complete":
+        llm_stats.add(http2_requests=1)
+
+
+def _on_llm_request(request: httpx.Request):
+    llm_stats.add(requests=1)
+    request.extensions["trace"] = _trace_llm_connection
+
+
+def install_llm_client() -> httpx.Client:
+    """
+    Share one pooled httpx client between all litellm calls of the process
+
+    Call after forking (app startup): connections must not cross processes.
+    """
+    global _llm_client
+    with _lock:
+        if _llm_client is None:
+            _llm_client = httpx.Client(
+                http2=HTTP2_ENABLED,
+                limits=httpx.Limits(
+                    max_connections=LLM_POOL_SIZE,
+                    max_keepalive_connections=LLM_POOL_SIZE,
+                    keepalive_expiry=KEEPALIVE_EXPIRY_SECONDS
+                ),
+                timeout=httpx.Timeout(LLM_TIMEOUT_SECONDS, connect=10.0),
+                event_hooks={"request": [_on_llm_request]}
+            )
+            litellm.client_session = _llm_client
+            logger.info(f"🔌 Shared LLM HTTP client: pool {LLM_POOL_SIZE}, HTTP/2 {'on' if HTTP2_ENABLED else 'off'}")
+    return _llm_client
+
+
+def search_session() -> requests.Session:
+    """The process-wide keep-alive session of search tools"""
+    global _search_session
+    with _lock:
+        if _search_session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=SEARCH_POOL_SIZE)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _search_session = session
+    return _search_session
+
+
+def search_stats() -> Dict[str, Any]:
+    """Requests and connections of the search session, from urllib3's pool counters"""
+    stats = ConnectionStats()
+    if _search_session is not None:
+        for adapter in set(_search_session.adapters.values()):
+            pools = adapter.poolmanager.pools
+            for key in list(pools.keys()):
+                pool = pools.get(key)
+                if pool is not None:
+                    stats.add(requests=pool.num_requests, connections_opened=pool.num_connections)
+    return stats.as_dict()
+
+
+def connection_metrics() -> Dict[str, Any]:
+    return {"llm": llm_stats.as_dict(), "search": search_stats()}
+
+
+def close_clients():
+    """Close the shared clients (app shutdown)"""
+    global _llm_client, _search_session
+    with _lock:
+        if _llm_client is not None:
+            if litellm.client_session is _llm_client:
+                litellm.client_session = None
+            _llm_client.close()
+            _llm_client = None
+        if _search_session is not None:
+            _search_session.close()
+            _search_session = None
+
+
+class PooledSerperDevTool(SerperDevTool):
+    """SerperDevTool sending its searches over the shared keep-alive session"""
+
+    def _make_api_request(self, search_query: str, search_type: str) -> dict:
+        # Same request as crewai_tools' SerperDevTool (0.59, pinned in
+        # pyproject.toml), minus a new connection per search
+        payload = {"q": search_query, "num": self.n_results}
+        if self.country:
+            payload["gl"] = self.country
+        if self.location:
+            payload["location"] = self.location
+        if self.locale:
+            payload["hl"] = self.locale
+        headers = {"X-API-KEY": os.environ["SERPER_API_KEY"], "content-type": "application/json"}
+        with span("serper.search", search_type=search_type):
+            response = search_session().post(
+                self._get_search_url(search_type), headers=headers, json=payload, timeout=SEARCH_TIMEOUT_SECONDS
+            )
+        response.raise_for_status()
+        results = response.json()
+        if not results:
+            raise ValueError("Empty response from Serper API")
+        return results
@@ -1,9 +1,166 @@
-from crewai import Agent, Crew, Process, Task
+from crewai import Agent, Crew, LLM, Process, Task
 from crewai.project import CrewBase, agent, crew, task
-from crewai_tools import SerperDevTool
+from crewai.tasks.task_output import TaskOutput
+from crewai.utilities.events import crewai_event_bus
+from crewai.utilities.events.llm_events import LLMStreamChunkEvent
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+import copy
+import json
+import litellm
+import logging
+import os
+import threading
+import time
 import yaml
 from pathlib import Path
 
+from .clients import PooledSerperDevTool
+from .llm_usage import LLMUsageRecorder, register_recorder, unregister_recorder
+from .logging_config import run_in_context
+from .tracing import span
+
+logger = logging.getLogger(__name__)
+
+# Deadlines (seconds). A task may override its budget with `deadline_seconds`
+# in tasks.yaml; the report generator always gets at least REPORT_RESERVE_SECONDS.
+TASK_DEADLINE_SECONDS = int(os.getenv("CREW_TASK_DEADLINE_SECONDS", "300"))
+EXECUTION_DEADLINE_SECONDS = int(os.getenv("CREW_EXECUTION_DEADLINE_SECONDS", "1800"))
+REPORT_RESERVE_SECONDS = int(os.getenv("CREW_REPORT_RESERVE_SECONDS", "300"))
+
+# Sections produced before the report, in execution order
+SECTION_TASKS = [
+    "requirements_analysis_task",
+    "market_research_task",
+    "competition_analysis_task",
+    "financial_projection_task",
+    "risk_assessment_task",
+    "product_validation_task",
+    "operations_analysis_task",
+    "marketing_strategy_task",
+    "technology_assessment_task",
+    "legal_analysis_task",
+]
+REPORT_TASK = "report_generation_task"
+
+# Agent performing each section task
+SECTION_AGENTS = {
+    "requirements_analysis_task": "requirements_analyst",
+    "market_research_task": "market_researcher",
+    "competition_analysis_task": "competition_analyst",
+    "financial_projection_task": "financial_projector",
+    "risk_assessment_task": "risk_assessor",
+    "product_validation_task": "product_validator",
+    "operations_analysis_task": "operations_analyst",
+    "marketing_strategy_task": "marketing_strategist",
+    "technology_assessment_task": "technology_assessor",
+    "legal_analysis_task": "legal_advisor",
+}
+
+DEFAULT_MODEL = os.getenv("MODEL", "gpt-4o-mini")
+
+# Providers (OpenAI) only cache prompt prefixes of at least this many tokens
+PROMPT_CACHE_MIN_TOKENS = 1024
+
+# Leading block shared verbatim by every agent prompt of an execution, so the
+# provider can serve it from its prompt cache; agent-specific text follows.
+# Only used when it reaches PROMPT_CACHE_MIN_TOKENS, otherwise it would just
+# add input tokens to every call.
+SHARED_PREFIX_TEMPLATE = """# Business validation brief
+Current year: {current_year}
+Topic: {topic}
+
+Founder context:
+{user_context}
+
+"""
+
+CONFIG_PATH = Path(__file__).parent / 'config'
+
+
+def _load_config(name: str) -> Dict[str, Any]:
+    with open(CONFIG_PATH / name, 'r') as f:
+        return yaml.safe_load(f)
+
+
+# Parsed once at import; with a preloading server (gunicorn preload_app) the
+# forked workers share them instead of re-reading YAML per execution
+AGENTS_CONFIG = _load_config('agents.yaml')
+TASKS_CONFIG = _load_config('tasks.yaml')
+
+# Streaming LLM instances (by id) -> callback receiving their token chunks
+_chunk_listeners: Dict[int, Callable[[str], None]] = {}
+
+
+@crewai_event_bus.on(LLMStreamChunkEvent)
+def _dispatch_stream_chunk(source, event):
+    listener = _chunk_listeners.get(id(source))
+    if listener:
+        listener(event.chunk)
+
+
+class TaskDeadlineExceeded(TimeoutError):
+    """A crew task overran its time budget"""
+
+
+class TaskCancelled(Exception):
+    """Stops the agent of a task that overran its budget at its next LLM call"""
+
+
+# Cancel flag of the task running in the current context; _run_with_deadline
+# sets it when the task overruns, its abandoned thread then stops by itself
+_task_cancel: ContextVar[Optional[threading.Event]] = ContextVar("crew_task_cancel", default=None)
+
+
+class CancellableLLM(LLM):
+    """LLM refusing new calls once the task it runs for was cancelled"""
+
+    def __init__(self, agent_name: str, **params):
+        super().__init__(**params)
+        self.agent_name = agent_name
+
+    def call(self, *args, **kwargs):
+        cancel = _task_cancel.get()
+        if cancel is not None and cancel.is_set():
+            raise TaskCancelled("task cancelled after its deadline")
+        return super().call(*args, **kwargs)
+
+
+@dataclass
+class CrewRunResult:
+    """Outcome of a deadline-bounded crew run"""
+    report: str
+    section_outputs: Dict[str, str] = field(default_factory=dict)
+    missing_sections: Dict[str, str] = field(default_factory=dict)
+    skipped_sections: Dict[str, str] = field(default_factory=dict)
+    # Sections taken from a similar prior execution instead of being run
+    reused_sections: List[str] = field(default_factory=list)
+    llm_calls: List[Dict[str, Any]] = field(default_factory=list)
+
+    @property
+    def completed_sections(self) -> List[str]:
+        return list(self.section_outputs)
+
+    @property
+    def completeness_score(self) -> int:
+        """Share of planned sections that made it into the report, 0-100"""
+        # Sections skipped by the task plan were never planned
+        total = len(self.section_outputs) + len(self.missing_sections)
+        if not total:
+            return 100
+        return round(100 * len(self.section_outputs) / total)
+
+
+def build_shared_prefix(inputs: Dict[str, Any]) -> str:
+    """Deterministic rendering of the inputs every agent receives"""
+    return SHARED_PREFIX_TEMPLATE.format(
+        current_year=inputs.get('current_year', ''),
+        topic=inputs.get('topic', ''),
+        user_context=json.dumps(inputs.get('user_context', {}), ensure_ascii=False, sort_keys=True, indent=2)
+    )
+
 
 @CrewBase
 class ValidityCrew():
@@ -12,23 +169,35 @@ class ValidityCrew():
     agents_config = 'config/agents.yaml'
     tasks_config = 'config/tasks.yaml'
     
-    def __init__(self):
-        # Load configurations
-        config_path = Path(__file__).parent / 'config'
-        
-        with open(config_path / 'agents.yaml', 'r') as f:
-            self.agents_config_data = yaml.safe_load(f)
+    def __init__(
+        self,
+        on_report_chunk: Optional[Callable[[str], None]] = None,
+        plan=None,
+        warm_start=None,
+        verbose: bool = False
+    ):
+        self.on_report_chunk = on_report_chunk
+        # Agent traces, captured into the execution log (logging_config)
+        self.verbose = verbose
+        # Optional planner.TaskPlan selecting the section tasks to run
+        self.plan = plan
+        # Optional similarity.WarmStart with prior sections to reuse or build on
+        self.warm_start = warm_start
+        self.usage = LLMUsageRecorder()
+        self.shared_prefix = ""
         
-        with open(config_path / 'tasks.yaml', 'r') as f:
-            self.tasks_config_data = yaml.safe_load(f)
+        # Per-instance copies of the preloaded configurations
+        self.agents_config_data = copy.deepcopy(AGENTS_CONFIG)
+        self.tasks_config_data = copy.deepcopy(TASKS_CONFIG)
     
     @agent
     def requirements_analyst(self) -> Agent:
         config = self.agents_config_data['requirements_analyst']
         return Agent(
             config=config,
-            tools=[SerperDevTool()],
-            verbose=True
+            llm=self._build_llm('requirements_analyst'),
+            tools=[PooledSerperDevTool()],
+            verbose=self.verbose
         )
     
     @agent
@@ -36,8 +205,9 @@ class ValidityCrew():
         config = self.agents_config_data['market_researcher']
         return Agent(
             config=config,
-            tools=[SerperDevTool()],
-            verbose=True
+            llm=self._build_llm('market_researcher'),
+            tools=[PooledSerperDevTool()],
+            verbose=self.verbose
         )
     
     @agent
@@ -45,8 +215,9 @@ class ValidityCrew():
         config = self.agents_config_data['competition_analyst']
         return Agent(
             config=config,
-            tools=[SerperDevTool()],
-            verbose=True
+            llm=self._build_llm('competition_analyst'),
+            tools=[PooledSerperDevTool()],
+            verbose=self.verbose
         )
     
     @agent
@@ -54,8 +225,9 @@ class ValidityCrew():
         config = self.agents_config_data['financial_projector']
         return Agent(
             config=config,
-            tools=[SerperDevTool()],
-            verbose=True
+            llm=self._build_llm('financial_projector'),
+            tools=[PooledSerperDevTool()],
+            verbose=self.verbose
         )
     
     @agent
@@ -63,8 +235,9 @@ class ValidityCrew():
         config = self.agents_config_data['risk_assessor']
         return Agent(
             config=config,
-            tools=[SerperDevTool()],
-            verbose=True
+            llm=self._build_llm('risk_assessor'),
+            tools=[PooledSerperDevTool()],
+            verbose=self.verbose
         )
     
     @agent
@@ -72,8 +245,9 @@ class ValidityCrew():
         config = self.agents_config_data['product_validator']
         return Agent(
             config=config,
-            tools=[SerperDevTool()],
-            verbose=True
+            llm=self._build_llm('product_validator'),
+            tools=[PooledSerperDevTool()],
+            verbose=self.verbose
         )
     
     @agent
@@ -81,8 +255,9 @@ class ValidityCrew():
         config = self.agents_config_data['operations_analyst']
         return Agent(
             config=config,
-            tools=[SerperDevTool()],
-            verbose=True
+            llm=self._build_llm('operations_analyst'),
+            tools=[PooledSerperDevTool()],
+            verbose=self.verbose
         )
     
     @agent
@@ -90,8 +265,9 @@ class ValidityCrew():
         config = self.agents_config_data['marketing_strategist']
         return Agent(
             config=config,
-            tools=[SerperDevTool()],
-            verbose=True
+            llm=self._build_llm('marketing_strategist'),
+            tools=[PooledSerperDevTool()],
+            verbose=self.verbose
         )
     
     @agent
@@ -99,8 +275,9 @@ class ValidityCrew():
         config = self.agents_config_data['technology_assessor']
         return Agent(
             config=config,
-            tools=[SerperDevTool()],
-            verbose=True
+            llm=self._build_llm('technology_assessor'),
+            tools=[PooledSerperDevTool()],
+            verbose=self.verbose
         )
     
     @agent
@@ -108,21 +285,26 @@ class ValidityCrew():
         config = self.agents_config_data['legal_advisor']
         return Agent(
             config=config,
-            tools=[SerperDevTool()],
-            verbose=True
+            llm=self._build_llm('legal_advisor'),
+            tools=[PooledSerperDevTool()],
+            verbose=self.verbose
         )
     
     @agent
     def report_generator(self) -> Agent:
-        config = self.agents_config_data['report_generator']
+        # Stream report tokens to on_report_chunk while the report is generated
+        llm = self._build_llm('report_generator', stream=self.on_report_chunk is not None)
+        if self.on_report_chunk:
+            _chunk_listeners[id(llm)] = self.on_report_chunk
         return Agent(
-            config=config,
-            verbose=True
+            config=self.agents_config_data['report_generator'],
+            llm=llm,
+            verbose=self.verbose
         )
     
     @task
     def requirements_analysis_task(self) -> Task:
-        config = self.tasks_config_data['requirements_analysis_task']
+        config = self._task_config('requirements_analysis_task')
         return Task(
             config=config,
             agent=self.requirements_analyst()
@@ -130,7 +312,7 @@ class ValidityCrew():
     
     @task
     def market_research_task(self) -> Task:
-        config = self.tasks_config_data['market_research_task']
+        config = self._task_config('market_research_task')
         return Task(
             config=config,
             agent=self.market_researcher()
@@ -138,7 +320,7 @@ class ValidityCrew():
     
     @task
     def competition_analysis_task(self) -> Task:
-        config = self.tasks_config_data['competition_analysis_task']
+        config = self._task_config('competition_analysis_task')
         return Task(
             config=config,
             agent=self.competition_analyst()
@@ -146,7 +328,7 @@ class ValidityCrew():
     
     @task
     def financial_projection_task(self) -> Task:
-        config = self.tasks_config_data['financial_projection_task']
+        config = self._task_config('financial_projection_task')
         return Task(
             config=config,
             agent=self.financial_projector()
@@ -154,7 +336,7 @@ class ValidityCrew():
     
     @task
     def risk_assessment_task(self) -> Task:
-        config = self.tasks_config_data['risk_assessment_task']
+        config = self._task_config('risk_assessment_task')
         return Task(
             config=config,
             agent=self.risk_assessor()
@@ -162,7 +344,7 @@ class ValidityCrew():
     
     @task
     def product_validation_task(self) -> Task:
-        config = self.tasks_config_data['product_validation_task']
+        config = self._task_config('product_validation_task')
         return Task(
             config=config,
             agent=self.product_validator()
@@ -170,7 +352,7 @@ class ValidityCrew():
     
     @task
     def operations_analysis_task(self) -> Task:
-        config = self.tasks_config_data['operations_analysis_task']
+        config = self._task_config('operations_analysis_task')
         return Task(
             config=config,
             agent=self.operations_analyst()
@@ -178,7 +360,7 @@ class ValidityCrew():
     
     @task
     def marketing_strategy_task(self) -> Task:
-        config = self.tasks_config_data['marketing_strategy_task']
+        config = self._task_config('marketing_strategy_task')
         return Task(
             config=config,
             agent=self.marketing_strategist()
@@ -186,7 +368,7 @@ class ValidityCrew():
     
     @task
     def technology_assessment_task(self) -> Task:
-        config = self.tasks_config_data['technology_assessment_task']
+        config = self._task_config('technology_assessment_task')
         return Task(
             config=config,
             agent=self.technology_assessor()
@@ -194,7 +376,7 @@ class ValidityCrew():
     
     @task
     def legal_analysis_task(self) -> Task:
-        config = self.tasks_config_data['legal_analysis_task']
+        config = self._task_config('legal_analysis_task')
         return Task(
             config=config,
             agent=self.legal_advisor()
@@ -202,7 +384,7 @@ class ValidityCrew():
     
     @task
     def report_generation_task(self) -> Task:
-        config = self.tasks_config_data['report_generation_task']
+        config = self._task_config('report_generation_task')
         return Task(
             config=config,
             agent=self.report_generator(),
@@ -220,6 +402,213 @@ class ValidityCrew():
             ]
         )
     
+    def kickoff_with_deadlines(
+        self,
+        inputs: Dict[str, Any],
+        task_deadline: Optional[int] = None,
+        execution_deadline: Optional[int] = None
+    ) -> CrewRunResult:
+        """
+        Run the crew task by task under per-task and overall deadlines.
+
+        A section whose agent overruns its budget (or fails) is recorded as
+        missing and the report generator runs on whatever is available.
+        Overrunning agents cannot be interrupted mid-call: their worker
+        threads are abandoned and stop at their next LLM call, without
+        recording usage or streaming further.
+        """
+        execution_deadline = execution_deadline or EXECUTION_DEADLINE_SECONDS
+        prefix = build_shared_prefix(inputs)
+        self.shared_prefix = prefix if self._prefix_cacheable(prefix) else ""
+        register_recorder(self.usage)
+        try:
+            return self._kickoff_sections(inputs, task_deadline, execution_deadline)
+        finally:
+            unregister_recorder(self.usage)
+
+    def _kickoff_sections(
+        self,
+        inputs: Dict[str, Any],
+        task_deadline: Optional[int],
+        execution_deadline: int
+    ) -> CrewRunResult:
+        deadline_at = time.monotonic() + execution_deadline
+        result = CrewRunResult(report="")
+        section_tasks = SECTION_TASKS
+        if self.plan:
+            section_tasks = self.plan.tasks
+            result.skipped_sections = dict(self.plan.skipped)
+
+        reused = self.warm_start.reused if self.warm_start else {}
+        for task_name in section_tasks:
+            if task_name in reused:
+                self._use_prior_output(getattr(self, task_name)(), reused[task_name])
+                result.section_outputs[task_name] = reused[task_name]
+                result.reused_sections.append(task_name)
+                continue
+
+            # Keep enough time in reserve for the report generator
+            remaining = deadline_at - time.monotonic() - REPORT_RESERVE_SECONDS
+            if remaining <= 0:
+                result.missing_sections[task_name] = "execution deadline reached"
+                continue
+
+            budget = min(self._task_deadline(task_name, task_deadline), remaining)
+            try:
+                with span("crew.task", task=task_name, budget_seconds=round(budget)):
+                    output = self._run_with_deadline(task_name, getattr(self, task_name)(), inputs, budget)
+            except TaskDeadlineExceeded as e:
+                logger.warning(f"⏱️ {e}")
+                result.missing_sections[task_name] = f"exceeded {budget:.0f}s deadline"
+            except Exception as e:
+                logger.warning(f"⚠️ {task_name} failed: {e}")
+                result.missing_sections[task_name] = f"failed: {e}"
+            else:
+                result.section_outputs[task_name] = output
+
+        if not result.section_outputs:
+            raise RuntimeError("No agent finished its section before the deadline")
+
+        report_task = self.report_generation_task()
+        report_task.context = [getattr(self, name)() for name in result.section_outputs]
+        if result.missing_sections or result.skipped_sections:
+            report_task.context.append(
+                self._missing_sections_note(result.missing_sections, result.skipped_sections)
+            )
+
+        budget = max(deadline_at - time.monotonic(), REPORT_RESERVE_SECONDS)
+        try:
+            with span("crew.task", task=REPORT_TASK, budget_seconds=round(budget)):
+                result.report = self._run_with_deadline(REPORT_TASK, report_task, inputs, budget)
+        finally:
+            _chunk_listeners.pop(id(self.report_generator().llm), None)
+        result.llm_calls = list(self.usage.calls)
+        return result
+
+    def _task_deadline(self, task_name: str, default: Optional[int]) -> float:
+        config = self.tasks_config_data.get(task_name) or {}
+        return config.get('deadline_seconds') or default or TASK_DEADLINE_SECONDS
+
+    def _build_llm(self, agent_name: str, **params) -> LLM:
+        """LLM for an agent, tagged so its calls are recorded in self.usage"""
+        config = self.agents_config_data[agent_name]
+        return CancellableLLM(
+            agent_name,
+            model=config.get('llm') or DEFAULT_MODEL,
+            metadata=self.usage.metadata(agent_name),
+            **params
+        )
+
+    def _prefix_cacheable(self, prefix: str) -> bool:
+        """Whether the shared prefix is long enough for the provider to cache it"""
+        try:
+            tokens = litellm.token_counter(model=DEFAULT_MODEL, text=prefix)
+        except Exception as e:
+            logger.debug(f"Could not count shared prefix tokens: {e}")
+            return False
+        if tokens < PROMPT_CACHE_MIN_TOKENS:
+            logger.info(
+                f"Shared prompt prefix is {tokens} tokens, under the {PROMPT_CACHE_MIN_TOKENS} "
+                f"needed for prompt caching; agents use their own prompts"
+            )
+            return False
+        return True
+
+    def _apply_shared_prefix(self, agent: Agent):
+        """Lead the agent's prompt with the execution's shared prefix"""
+        if not self.shared_prefix:
+            return
+        agent.system_template = self.shared_prefix + "{{ .System }}"
+        agent.prompt_template = "{{ .Prompt }}"
+        agent.response_template = None
+
+    def _task_config(self, task_name: str) -> Dict[str, Any]:
+        """
+        Task config, extended with the scope of tasks the plan merged into it
+        and with findings of a similar prior execution
+        """
+        config = self.tasks_config_data[task_name]
+        extra = self.plan.extra_scope(task_name) if self.plan else []
+        if self.warm_start and task_name in self.warm_start.context:
+            extra = [*extra, self.warm_start.context[task_name]]
+        if not extra:
+            return config
+        config = dict(config)
+        config['description'] = "\n\n".join([config['description'], *extra])
+        return config
+
+    def _run_with_deadline(self, task_name: str, task: Task, inputs: Dict[str, Any], budget: float) -> str:
+        """
+        Run a single task as its own crew, waiting at most `budget` seconds
+
+        Raises TaskDeadlineExceeded once the budget is spent, after cancelling
+        the task: it makes no further LLM calls and its usage and report
+        chunks are no longer recorded.
+        """
+        self._apply_shared_prefix(task.agent)
+        single = Crew(
+            agents=[task.agent],
+            tasks=[task],
+            process=Process.sequential,
+            verbose=self.verbose
+        )
+        cancel = threading.Event()
+        executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="crew-task")
+        token = _task_cancel.set(cancel)
+        try:
+            # Keep the execution's logging context, and the cancel flag, in the task thread
+            future = executor.submit(run_in_context(single.kickoff, inputs=inputs))
+            try:
+                return str(future.result(timeout=budget))
+            except FutureTimeoutError:
+                cancel.set()
+                self.usage.detach(task.agent.llm.agent_name)
+                _chunk_listeners.pop(id(task.agent.llm), None)
+                raise TaskDeadlineExceeded(f"{task_name} exceeded its {budget:.0f}s deadline") from None
+        finally:
+            _task_cancel.reset(token)
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _use_prior_output(self, task: Task, output: str):
+        """Stand a reused section in for the task, for the report's context"""
+        task.output = TaskOutput(
+            description=task.description,
+            raw=output,
+            agent=task.agent.role
+        )
+
+    def _missing_sections_note(self, missing: Dict[str, str], skipped: Dict[str, str]) -> Task:
+        """Context entry telling the report generator which sections are absent"""
+        def describe(sections):
+            return "\n".join(
+                f"- {name.replace('_task', '').replace('_', ' ')}: {reason}"
+                for name, reason in sections.items()
+            )
+
+        parts = []
+        if missing:
+            parts.append(
+                "The following analysis sections are unavailable for this report. "
+                "Mark them as missing instead of inventing their content:\n" + describe(missing)
+            )
+        if skipped:
+            parts.append(
+                "The following analyses were intentionally not performed because they "
+                "are not relevant to this idea. Do not add sections for them:\n" + describe(skipped)
+            )
+        note = "\n\n".join(parts)
+        placeholder = Task(
+            description="Missing sections",
+            expected_output="List of missing sections",
+            agent=self.report_generator()
+        )
+        placeholder.output = TaskOutput(
+            description="Missing sections",
+            raw=note,
+            agent=self.report_generator().role
+        )
+        return placeholder
+
     @crew
     def crew(self) -> Crew:
         """Creates the ValidityCrew crew"""
@@ -227,5 +616,5 @@ class ValidityCrew():
             agents=self.agents,  # Automatically created by the @agent decorator
             tasks=self.tasks,    # Automatically created by the @task decorator
             process=Process.sequential,
-            verbose=2
+            verbose=self.verbose
         )
\ No newline at end of file
@@ -1,11 +1,15 @@
+import logging
 import os
 from datetime import datetime
 from enum import Enum
 from typing import Optional
 
-from sqlalchemy import Column, String, DateTime, Text, Integer, JSON, Enum as SQLEnum
+from sqlalchemy import Column, String, DateTime, Text, Integer, Float, Boolean, JSON, Enum as SQLEnum, false, inspect, text
 from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
+from sqlalchemy.schema import CreateColumn
+
+logger = logging.getLogger(__name__)
 
 # Database configuration
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite+aiosqlite:///./validation.db")
@@ -58,6 +62,8 @@ class ValidationExecution(Base):
     user_context: Mapped[dict] = mapped_column(JSON)
     topic: Mapped[str] = mapped_column(String(500))
     webhook_url: Mapped[Optional[str]] = mapped_column(String(1000), nullable=True)
+    owner_id: Mapped[Optional[str]] = mapped_column(String(50), nullable=True)
+    mode: Mapped[str] = mapped_column(String(20), default="full", server_default="full")
     
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.now)
     started_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
@@ -65,6 +71,9 @@ class ValidationExecution(Base):
     
     final_report: Mapped[Optional[dict]] = mapped_column(JSON, nullable=True)
     final_report_markdown: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    quick_report_markdown: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    quick_completed_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+    task_plan: Mapped[Optional[dict]] = mapped_column(JSON, nullable=True)
     error_message: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
 
 
@@ -91,17 +100,55 @@ class ValidationMetrics(Base):
     execution_id: Mapped[str] = mapped_column(String(50))
     
     agents_count: Mapped[int] = mapped_column(Integer)
+    agents_skipped: Mapped[int] = mapped_column(Integer, default=0, server_default="0")
     total_tokens_used: Mapped[int] = mapped_column(Integer, default=0)
+    cached_prompt_tokens: Mapped[int] = mapped_column(Integer, default=0, server_default="0")
+    llm_calls: Mapped[Optional[list]] = mapped_column(JSON, nullable=True)
     execution_duration_seconds: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
     report_completeness_score: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
     
+    # Warm start from similar prior executions (similarity.py)
+    similarity_checked: Mapped[bool] = mapped_column(Boolean, default=False, server_default=false())
+    similar_execution_id: Mapped[Optional[str]] = mapped_column(String(50), nullable=True)
+    similarity_score: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
+    sections_reused: Mapped[int] = mapped_column(Integer, default=0, server_default="0")
+    sections_with_context: Mapped[int] = mapped_column(Integer, default=0, server_default="0")
+    tokens_saved: Mapped[int] = mapped_column(Integer, default=0, server_default="0")
+    
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.now)
 
 
 async def create_tables():
-    """Create all database tables"""
+    """Create missing tables and add columns new models have to existing ones"""
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+        await conn.run_sync(_add_missing_columns)
+
+
+def _add_missing_columns(conn):
+    """
+    Upgrade tables created by earlier versions (create_all never alters them)
+
+    Columns added to a model must be nullable or have a server_default so
+    existing rows get a value. Columns are only ever added, never changed.
+    """
+    inspector = inspect(conn)
+    tables = set(inspector.get_table_names())
+    preparer = conn.dialect.identifier_preparer
+    # Guards against a concurrent upgrade where the database supports it
+    if_not_exists = " IF NOT EXISTS" if conn.dialect.name == "postgresql" else ""
+    for table in Base.metadata.sorted_tables:
+        if table.name not in tables:
+            continue
+        existing = {column["name"] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in existing:
+                continue
+            if not column.nullable and column.server_default is None:
+                raise RuntimeError(f"{table.name}.{column.name} needs a server_default to be added to existing rows")
+            definition = CreateColumn(column).compile(dialect=conn.dialect)
+            conn.execute(text(f"ALTER TABLE {preparer.format_table(table)} ADD COLUMN{if_not_exists} {definition}"))
+            logger.info(f"📊 Added column {table.name}.{column.name}")
 
 
 async def get_db() -> AsyncSession:
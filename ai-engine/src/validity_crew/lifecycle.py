@@ -0,0 +1,130 @@
+"""
+Process lifecycle: readiness, in-flight executions and SIGTERM draining
+
+On SIGTERM a worker stops accepting new executions (readiness and
+/api/v1/validate answer 503) while the server finishes its open requests.
+Executions still running after DRAIN_TIMEOUT_SECONDS are cancelled and
+marked failed, so the backend sees a terminal state instead of an
+execution stuck in "running".
+"""
+import asyncio
+import logging
+import os
+import signal
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+DRAIN_TIMEOUT_SECONDS = int(os.getenv("ENGINE_DRAIN_TIMEOUT_SECONDS", "600"))
+# Set by the gunicorn master once it has created the tables, so workers skip it
+SCHEMA_READY_ENV = "ENGINE_SCHEMA_READY"
+INTERRUPTED_MESSAGE = "Interrupted by AI engine shutdown; please retry"
+
+
+class Lifecycle:
+    """Per-process serving state"""
+
+    def __init__(self):
+        self.started = False
+        self.draining = False
+        self.in_flight: Dict[str, asyncio.Task] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    @property
+    def status(self) -> str:
+        if self.draining:
+            return "draining"
+        return "ready" if self.started else "starting"
+
+    def mark_started(self):
+        """Called from app startup, inside the worker's event loop"""
+        self._loop = asyncio.get_running_loop()
+        self._install_signal_handler()
+        self.started = True
+
+    @contextmanager
+    def track(self, execution_id: str):
+        """Register the current task as running `execution_id`"""
+        self.in_flight[execution_id] = asyncio.current_task()
+        try:
+            yield
+        finally:
+            self.in_flight.pop(execution_id, None)
+
+    def begin_drain(self):
+        """Stop taking executions; cancel those left after the deadline"""
+        if self.draining:
+            return
+        self.draining = True
+        logger.info(
+            f"🛑 Draining: {len(self.in_flight)} execution(s) in flight, "
+            f"deadline {DRAIN_TIMEOUT_SECONDS}s"
+        )
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(
+                self._loop.call_later, DRAIN_TIMEOUT_SECONDS, self._cancel_in_flight
+            )
+
+    def _cancel_in_flight(self):
+        for execution_id, task in list(self.in_flight.items()):
+            logger.warning(f"⏱️ Drain deadline reached, interrupting execution_id: {execution_id}")
+            task.cancel()
+
+    def _install_signal_handler(self):
+        # Chained in front of the server's own handler, which still runs the
+        # graceful shutdown (stop listening, wait for open requests)
+        previous = signal.getsignal(signal.SIGTERM)
+
+        def handle_sigterm(signum, frame):
+            self.begin_drain()
+            if callable(previous):
+                previous(signum, frame)
+            elif previous == signal.SIG_DFL:
+                signal.signal(signum, signal.SIG_DFL)
+                os.kill(os.getpid(), signum)
+
+        signal.signal(signal.SIGTERM, handle_sigterm)
+
+
+lifecycle = Lifecycle()
+
+
+async def mark_interrupted(execution_id: str):
+    """Fail an execution cancelled by draining, unless it already finished"""
+    from sqlalchemy import update
+    from .database import async_session_maker, ValidationExecution, ExecutionStatus
+
+    async with async_session_maker() as session:
+        await session.execute(
+            update(ValidationExecution)
+            .where(
+                ValidationExecution.execution_id == execution_id,
+                ValidationExecution.status.in_([ExecutionStatus.PENDING, ExecutionStatus.RUNNING])
+            )
+            .values(
+                status=ExecutionStatus.FAILED,
+                completed_at=datetime.now(),
+                error_message=INTERRUPTED_MESSAGE
+            )
+        )
+        await session.commit()
+
+
+def prepare_master():
+    """
+    Create tables once in the gunicorn master, before workers fork
+
+    The engine's pool is disposed afterwards so no connection is shared
+    with the children.
+    """
+    from .database import create_tables, engine
+
+    async def prepare():
+        await create_tables()
+        await engine.dispose()
+
+    asyncio.run(prepare())
+    os.environ[SCHEMA_READY_ENV] = "1"
+    logger.info("📊 Database tables created/verified")
@@ -0,0 +1,79 @@
+import threading
+import uuid
+from typing import Any, Dict, List, Optional
+
+import litellm
+
+
+class LLMUsageRecorder:
+    """
+    Per-execution record of LLM calls
+
+    Agents' LLMs carry `metadata={"usage_key": recorder.key, ...}`; the
+    process-wide litellm success callback routes each finished call here.
+    """
+
+    def __init__(self):
+        self.key = str(uuid.uuid4())
+        self.calls: List[Dict[str, Any]] = []
+        # Agents whose calls are no longer recorded (cancelled tasks)
+        self._detached = set()
+        self._lock = threading.Lock()
+
+    def metadata(self, agent_name: str) -> Dict[str, str]:
+        return {"usage_key": self.key, "agent": agent_name}
+
+    def detach(self, agent_name: str):
+        """Stop recording the calls of an agent whose task was abandoned"""
+        with self._lock:
+            self._detached.add(agent_name)
+
+    def record(self, agent_name: Optional[str], model: Optional[str], response, start_time, end_time):
+        usage = getattr(response, "usage", None)
+        if usage is None:
+            return
+        details = getattr(usage, "prompt_tokens_details", None)
+        call = {
+            "agent": agent_name,
+            "model": model,
+            "prompt_tokens": getattr(usage, "prompt_tokens", 0) or 0,
+            "cached_prompt_tokens": getattr(details, "cached_tokens", 0) or 0,
+            "completion_tokens": getattr(usage, "completion_tokens", 0) or 0,
+            "latency_ms": int((end_time - start_time).total_seconds() * 1000),
+        }
+        with self._lock:
+            if agent_name not in self._detached:
+                self.calls.append(call)
+
+    def totals(self) -> Dict[str, int]:
+        with self._lock:
+            calls = list(self.calls)
+        return {
+            "llm_calls": len(calls),
+            "prompt_tokens": sum(c["prompt_tokens"] for c in calls),
+            "cached_prompt_tokens": sum(c["cached_prompt_tokens"] for c in calls),
+            "completion_tokens": sum(c["completion_tokens"] for c in calls),
+        }
+
+
+_recorders: Dict[str, LLMUsageRecorder] = {}
+
+
+def register_recorder(recorder: LLMUsageRecorder):
+    _recorders[recorder.key] = recorder
+
+
+def unregister_recorder(recorder: LLMUsageRecorder):
+    _recorders.pop(recorder.key, None)
+
+
+def _record_llm_call(kwargs, response, start_time, end_time):
+    metadata = (kwargs.get("litellm_params") or {}).get("metadata") or {}
+    recorder = _recorders.get(metadata.get("usage_key"))
+    if recorder:
+        recorder.record(metadata.get("agent"), kwargs.get("model"), response, start_time, end_time)
+
+
+# A plain function callback: crewAI replaces litellm.callbacks on every call,
+# but keeps success_callback entries of other types
+litellm.success_callback.append(_record_llm_call)
@@ -0,0 +1,215 @@
+"""
+Non-blocking structured logging with per-execution log files
+
+Application threads only put records on an in-memory queue
+(QueueHandler); a listener thread formats them as JSON lines to stdout and
+appends records tagged with an execution id to
+EXECUTION_LOG_DIR/<execution_id>.log.
+
+Verbose agent traces are off unless an execution asks for them
+(`verbose` on the request). crewAI prints those traces to stdout; while
+such an execution runs, its writes to stdout are captured as log records
+and end up in the execution's file instead of the process output.
+"""
+import atexit
+import contextvars
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+from collections import OrderedDict
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Optional
+
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+# json (default) or text
+LOG_FORMAT = os.getenv("LOG_FORMAT", "json").lower()
+EXECUTION_LOG_DIR = Path(os.getenv("EXECUTION_LOG_DIR", "output/logs"))
+# Execution log files kept open by the listener at once
+MAX_OPEN_EXECUTION_LOGS = 64
+
+# Set for the duration of an execution; copied into threads with the context
+current_execution_id: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("execution_id", default=None)
+_verbose_execution: contextvars.ContextVar[bool] = contextvars.ContextVar("verbose_execution", default=False)
+
+trace_logger = logging.getLogger("validity_crew.trace")
+
+_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+_listener: Optional[logging.handlers.QueueListener] = None
+_configured = False
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "pid": record.process,
+        }
+        execution_id = getattr(record, "execution_id", None)
+        if execution_id:
+            entry["execution_id"] = execution_id
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False)
+
+
+class _ExecutionContextFilter(logging.Filter):
+    """Tag records with the execution of the thread emitting them"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if not hasattr(record, "execution_id"):
+            record.execution_id = current_execution_id.get()
+        return True
+
+
+class ExecutionFileHandler(logging.Handler):
+    """Appends records of each execution to its own file (listener thread only)"""
+
+    def __init__(self, directory: Path):
+        super().__init__()
+        self.directory = directory
+        self._files: "OrderedDict[str, object]" = OrderedDict()
+
+    def emit(self, record: logging.LogRecord):
+        execution_id = getattr(record, "execution_id", None)
+        if not execution_id:
+            return
+        try:
+            stream = self._open(execution_id)
+            stream.write(self.format(record) + "\n")
+            stream.flush()
+            if getattr(record, "execution_log_end", False):
+                self._files.pop(execution_id).close()
+        except Exception:
+            self.handleError(record)
+
+    def _open(self, execution_id: str):
+        stream = self._files.get(execution_id)
+        if stream is not None:
+            self._files.move_to_end(execution_id)
+            return stream
+        if len(self._files) >= MAX_OPEN_EXECUTION_LOGS:
+            _, oldest = self._files.popitem(last=False)
+            oldest.close()
+        self.directory.mkdir(parents=True, exist_ok=True)
+        stream = open(self.directory / f"{execution_id}.log", "a", encoding="utf-8")
+        self._files[execution_id] = stream
+        return stream
+
+    def close(self):
+        for stream in self._files.values():
+            stream.close()
+        self._files.clear()
+        super().close()
+
+
+class _ExecutionStdout:
+    """
+    sys.stdout replacement sending writes of verbose executions to the log
+
+    Everything else goes to the real stdout unchanged.
+    """
+
+    def __init__(self, stream):
+        self._stream = stream
+
+    def write(self, text: str) -> int:
+        if _verbose_execution.get():
+            if text.strip():
+                trace_logger.info(text.rstrip("\n"))
+            return len(text)
+        return self._stream.write(text)
+
+    def flush(self):
+        self._stream.flush()
+
+    def isatty(self) -> bool:
+        # Keeps rich from emitting colour codes into captured traces
+        return False if _verbose_execution.get() else self._stream.isatty()
+
+    def __getattr__(self, name):
+        return getattr(self._stream, name)
+
+
+def _build_listener() -> logging.handlers.QueueListener:
+    console = logging.StreamHandler(sys.__stdout__)
+    if LOG_FORMAT == "json":
+        console.setFormatter(JsonFormatter())
+    else:
+        console.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+    # Agent traces belong in the execution's file only
+    console.addFilter(lambda record: record.name != trace_logger.name)
+    files = ExecutionFileHandler(EXECUTION_LOG_DIR)
+    files.setFormatter(JsonFormatter())
+    return logging.handlers.QueueListener(_queue, console, files, respect_handler_level=True)
+
+
+def configure_logging():
+    """Route all logging through the queue; idempotent"""
+    global _configured
+    if _configured:
+        return
+    handler = logging.handlers.QueueHandler(_queue)
+    handler.addFilter(_ExecutionContextFilter())
+    root = logging.getLogger()
+    for existing in list(root.handlers):
+        root.removeHandler(existing)
+    root.addHandler(handler)
+    root.setLevel(LOG_LEVEL)
+    # Traces of verbose executions are kept whatever LOG_LEVEL is
+    trace_logger.setLevel(logging.INFO)
+    sys.stdout = _ExecutionStdout(sys.stdout)
+    start_listener()
+    atexit.register(stop_listener)
+    _configured = True
+
+
+def start_listener():
+    """Start the thread draining the queue"""
+    global _listener
+    _listener = _build_listener()
+    _listener.start()
+
+
+def restart_listener_after_fork():
+    """Threads don't survive fork: give a forked worker its own listener"""
+    if _configured:
+        start_listener()
+
+
+def stop_listener():
+    """Flush queued records and stop the listener"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+@contextmanager
+def execution_logging(execution_id: str, verbose: bool = False):
+    """Tag logs emitted within with `execution_id`; capture agent traces if `verbose`"""
+    id_token = current_execution_id.set(execution_id)
+    verbose_token = _verbose_execution.set(verbose)
+    try:
+        yield
+    finally:
+        _verbose_execution.reset(verbose_token)
+        logging.getLogger(__name__).info(
+            f"Execution log closed: {execution_id}", extra={"execution_log_end": True}
+        )
+        current_execution_id.reset(id_token)
+
+
+def run_in_context(fn, *args, **kwargs):
+    """`fn` bound to the caller's context, for executors that don't copy it"""
+    context = contextvars.copy_context()
+    return lambda: context.run(fn, *args, **kwargs)
@@ -1,5 +1,6 @@
 #!/usr/bin/env python
 import asyncio
+import os
 import sys
 from pathlib import Path
 
@@ -60,28 +61,52 @@ def test():
 
 def serve():
     """
-    Start the FastAPI server.
+    Start the FastAPI server in a single process (development).
     """
     import uvicorn
     from validity_crew.api import app
     
+    host = os.getenv("ENGINE_HOST", "0.0.0.0")
+    port = int(os.getenv("ENGINE_PORT", "8000"))
     print("Starting Business Validation AI Engine...")
-    print("FastAPI server will be available at: http://localhost:8000")
-    print("API documentation at: http://localhost:8000/docs")
+    print(f"FastAPI server will be available at: http://localhost:{port}")
+    print(f"API documentation at: http://localhost:{port}/docs")
     
     uvicorn.run(
         "validity_crew.api:app",
-        host="0.0.0.0", 
-        port=8000,
+        host=host, 
+        port=port,
         reload=False,
         log_level="info"
     )
 
 
+def serve_production():
+    """
+    Start the FastAPI server under gunicorn with ENGINE_WORKERS uvicorn workers.
+    """
+    config = Path(__file__).resolve().parent.parent.parent / "gunicorn.conf.py"
+    print(f"Starting Business Validation AI Engine with {os.getenv('ENGINE_WORKERS', '2')} workers...")
+    os.execvp("gunicorn", ["gunicorn", "-c", str(config), "validity_crew.api:app"])
+
+
+def index():
+    """
+    Add completed executions to the similar-idea index (backfill).
+    """
+    from validity_crew.similarity import rebuild_index
+    
+    asyncio.run(rebuild_index())
+
+
 if __name__ == "__main__":
     if len(sys.argv) > 1:
         if sys.argv[1] == "serve":
             serve()
+        elif sys.argv[1] == "serve-prod":
+            serve_production()
+        elif sys.argv[1] == "index":
+            index()
         elif sys.argv[1] == "train":
             train()
         elif sys.argv[1] == "replay":
@@ -24,6 +24,14 @@ class ValidationRequest(BaseModel):
     user_context: UserContext = Field(..., description="User context with business idea details")
     topic: str = Field(..., description="Topic/keyword for research")
     webhook_url: Optional[str] = Field(None, description="Optional webhook URL for completion notification")
+    owner_id: Optional[str] = Field(
+        None, description="Backend user owning the idea; warm starts only use this owner's prior validations"
+    )
+    mode: Literal["full", "quick", "quick_and_full"] = Field(
+        "full",
+        description="full: all agents; quick: single-pass short report; quick_and_full: quick report first while the full run continues"
+    )
+    verbose: bool = Field(False, description="Capture verbose agent traces in the execution's log file")
 
 
 class ValidationResponse(BaseModel):
@@ -44,6 +52,17 @@ class ValidationStatus(BaseModel):
     total_agents: int = Field(11, description="Total number of agents")
     current_stage: str = Field("", description="Current processing stage")
     error_message: Optional[str] = Field(None, description="Error message if failed")
+    mode: str = Field("full", description="Validation mode")
+    quick_report_ready: bool = Field(False, description="Whether the quick report is available")
+
+
+class ValidationUsage(BaseModel):
+    """Resources an execution consumed, for metering and billing"""
+    agents_count: int = Field(..., description="Agents that produced output")
+    total_tokens: int = Field(0, description="Prompt plus completion tokens")
+    cached_prompt_tokens: int = Field(0, description="Prompt tokens served from the provider cache")
+    llm_calls: int = Field(0, description="Number of LLM calls")
+    duration_seconds: Optional[int] = Field(None, description="Execution wall time")
 
 
 class ValidationResult(BaseModel):
@@ -54,6 +73,14 @@ class ValidationResult(BaseModel):
     final_report_markdown: str = Field(..., description="Final report in Markdown format")
     created_at: datetime = Field(..., description="Creation timestamp")
     completed_at: datetime = Field(..., description="Completion timestamp")
+    metrics: Optional[ValidationUsage] = Field(None, description="Resource usage of the execution")
+
+
+class QuickValidationResult(BaseModel):
+    """Quick single-pass validation report"""
+    execution_id: str = Field(..., description="Unique execution ID")
+    report_markdown: str = Field(..., description="Short report in Markdown format")
+    completed_at: datetime = Field(..., description="Completion timestamp")
 
 
 class ErrorResponse(BaseModel):
@@ -66,4 +93,39 @@ class HealthResponse(BaseModel):
     """Health check response"""
     status: Literal["healthy"] = Field("healthy", description="Service status")
     timestamp: datetime = Field(default_factory=datetime.now, description="Check timestamp")
-    version: str = Field("1.0.0", description="API version")
\ No newline at end of file
+    version: str = Field("1.0.0", description="API version")
+
+
+class ReadinessResponse(BaseModel):
+    """Readiness check response"""
+    status: Literal["ready", "starting", "draining", "unavailable"] = Field(..., description="Worker readiness")
+    in_flight_executions: int = Field(0, description="Executions running in this worker")
+    timestamp: datetime = Field(default_factory=datetime.now, description="Check timestamp")
+
+
+class HTTPClientStats(BaseModel):
+    """Requests and connections of a shared HTTP client"""
+    requests: int = Field(0, description="Requests sent")
+    connections_opened: int = Field(0, description="New connections opened")
+    http2_requests: int = Field(0, description="Requests sent over HTTP/2")
+    reuse_ratio: float = Field(0.0, description="Share of requests on a reused connection")
+
+
+class MetricsResponse(BaseModel):
+    """Per-process HTTP client metrics"""
+    pid: int = Field(..., description="Worker process id")
+    llm: HTTPClientStats
+    search: HTTPClientStats
+    timestamp: datetime = Field(default_factory=datetime.now, description="Collection timestamp")
+
+
+class SimilarityStats(BaseModel):
+    """Warm starts of full validations from similar prior ideas"""
+    indexed_executions: int = Field(0, description="Executions in this worker's view of the index")
+    lookups: int = Field(0, description="Validations that searched the index")
+    context_hits: int = Field(0, description="Validations given prior findings as context")
+    reuse_hits: int = Field(0, description="Validations that reused prior sections")
+    context_hit_rate: float = Field(0.0, description="Share of lookups with context hits")
+    reuse_hit_rate: float = Field(0.0, description="Share of lookups with reused sections")
+    sections_reused: int = Field(0, description="Sections reused in total")
+    tokens_saved: int = Field(0, description="Tokens the reused sections cost originally")
@@ -0,0 +1,82 @@
+import re
+from dataclasses import dataclass, field
+from typing import Dict, List
+
+from .crew import SECTION_TASKS
+from .models import UserContext
+
+# Ideas whose product is software or otherwise technology-driven
+TECH_PATTERN = re.compile(
+    # English words, then Russian word stems
+    r"\b(apps?|applications?|saas|software|platforms?|websites?|web|online|mobile|api|ai|"
+    r"ml|bots?|chatbots?|marketplaces?|automation|cloud|digital|iot|hardware|devices?|"
+    r"blockchain|crypto|telegram)\b"
+    r"|\b(приложен|сайт|платформ|онлайн|бот|маркетплейс|автоматизац|нейросет|"
+    r"мобильн|интернет|цифров|программ)",
+    re.IGNORECASE
+)
+
+# Domains with licensing, compliance or liability exposure
+REGULATED_PATTERN = re.compile(
+    r"\b(health|medical|medicine|clinics?|pharma|drugs?|supplements?|finance|fintech|banks?|"
+    r"loans?|credit|payments?|insurance|invest\w*|crypto|alcohol|tobacco|cannabis|gambling|"
+    r"betting|child|children|kids|education|schools?|food|restaurants?|delivery|transport|"
+    r"taxi|real estate|rentals?|personal data|biometric|security|weapons?|import|export)\b"
+    r"|\b(медиц|здоров|клиник|лекарств|аптек|финанс|банк|кредит|займ|платеж|страхов|"
+    r"инвест|алкогол|табак|азарт|ставк|детск|дети|детей|образован|школ|еда|еды|питани|"
+    r"ресторан|доставк|перевоз|такси|недвижим|аренд|персональн|импорт|экспорт)",
+    re.IGNORECASE
+)
+
+# Extra scope a host task takes over when another task is merged into it
+MERGED_SCOPE = {
+    "legal_analysis_task": (
+        "Also briefly cover legal and regulatory basics (business registration, "
+        "taxation, consumer protection) in a short dedicated subsection."
+    ),
+}
+
+
+@dataclass
+class TaskPlan:
+    """Per-execution selection of crew tasks"""
+    tasks: List[str] = field(default_factory=list)
+    skipped: Dict[str, str] = field(default_factory=dict)
+    merged: Dict[str, str] = field(default_factory=dict)
+
+    def extra_scope(self, task_name: str) -> List[str]:
+        """Instructions of tasks merged into `task_name`"""
+        return [MERGED_SCOPE[merged] for merged, host in self.merged.items() if host == task_name]
+
+    def to_dict(self) -> dict:
+        return {"tasks": self.tasks, "skipped": self.skipped, "merged": self.merged}
+
+
+def build_task_plan(user_context: UserContext, topic: str) -> TaskPlan:
+    """
+    Pick the crew tasks worth running for an idea
+
+    Cheap keyword classification of the idea, no LLM call. Low-value tasks are
+    dropped or merged into a neighbour; report generation is always kept by
+    the crew itself.
+    """
+    idea_text = " ".join([
+        topic,
+        user_context.idea_description,
+        user_context.unique_selling_point,
+        user_context.target_audience,
+        user_context.audience_pains,
+    ])
+    plan = TaskPlan()
+
+    if not TECH_PATTERN.search(idea_text):
+        plan.skipped["technology_assessment_task"] = "idea is not technology-driven"
+
+    if not REGULATED_PATTERN.search(idea_text):
+        plan.merged["legal_analysis_task"] = "risk_assessment_task"
+
+    plan.tasks = [
+        name for name in SECTION_TASKS
+        if name not in plan.skipped and name not in plan.merged
+    ]
+    return plan
@@ -0,0 +1,47 @@
+import json
+import os
+from typing import Any, Dict, Optional
+
+from crewai import LLM
+
+from .llm_usage import LLMUsageRecorder
+
+QUICK_MODEL = os.getenv("QUICK_MODEL", os.getenv("MODEL", "gpt-4o-mini"))
+QUICK_MAX_TOKENS = int(os.getenv("QUICK_MAX_TOKENS", "900"))
+QUICK_TIMEOUT_SECONDS = int(os.getenv("QUICK_TIMEOUT_SECONDS", "25"))
+
+QUICK_SYSTEM_PROMPT = """You are a seasoned startup analyst giving a fast first verdict on a business idea.
+Work only from the founder's context and your general knowledge; do not research.
+Answer in Markdown with these sections, keeping the whole report under 400 words:
+## Verdict - one of: Promising, Needs work, Not viable - with a one-sentence reason
+## Market - demand and audience in 2-3 bullets
+## Competition - the most likely alternatives in 2-3 bullets
+## Key risks - top 3 risks
+## Next steps - 3 concrete actions to validate the idea cheaply"""
+
+
+def run_quick_validation(inputs: Dict[str, Any], usage: Optional[LLMUsageRecorder] = None) -> str:
+    """
+    Produce a short validation report in a single LLM call
+
+    Runs with a strict token budget and timeout so the verdict is available
+    within seconds, long before the full crew finishes. The call is recorded
+    on `usage` when given.
+    """
+    params = {"metadata": usage.metadata("quick_validator")} if usage else {}
+    llm = LLM(
+        model=QUICK_MODEL,
+        max_tokens=QUICK_MAX_TOKENS,
+        timeout=QUICK_TIMEOUT_SECONDS,
+        temperature=0.3,
+        **params
+    )
+    prompt = (
+        f"Topic: {inputs['topic']}\n"
+        f"Year: {inputs['current_year']}\n"
+        f"Founder context:\n{json.dumps(inputs['user_context'], ensure_ascii=False, indent=2)}"
+    )
+    return llm.call([
+        {"role": "system", "content": QUICK_SYSTEM_PROMPT},
+        {"role": "user", "content": prompt}
+    ])
@@ -0,0 +1,329 @@
+"""
+Similar-idea index used to warm-start validations from prior results
+
+Completed executions are embedded (topic and founder context) into a NumPy
+matrix of unit vectors persisted under SIMILARITY_INDEX_PATH; a lookup is a
+single matrix-vector product. Matches are scoped to the owner (backend
+user) of the idea: another founder's results are never used.
+
+Only the idea-independent sections (SIMILARITY_REUSABLE_TASKS) take part:
+for a new idea the nearest prior executions above
+SIMILARITY_CONTEXT_THRESHOLD give their outputs of those sections to the
+matching agents as context, and above SIMILARITY_REUSE_THRESHOLD they are
+reused as is. Sections that depend on the founder always run from scratch.
+"""
+import asyncio
+import fcntl
+import json
+import logging
+import os
+import threading
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import litellm
+import numpy as np
+from sqlalchemy import select
+
+from .crew import SECTION_AGENTS
+from .database import AgentResult, AgentStatus, ValidationExecution, ValidationMetrics, ExecutionStatus
+from .models import UserContext
+
+logger = logging.getLogger(__name__)
+
+SIMILARITY_ENABLED = os.getenv("SIMILARITY_ENABLED", "true").lower() == "true"
+SIMILARITY_INDEX_PATH = Path(os.getenv("SIMILARITY_INDEX_PATH", "output/similarity"))
+EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "text-embedding-3-small")
+SIMILARITY_TOP_K = int(os.getenv("SIMILARITY_TOP_K", "3"))
+SIMILARITY_CONTEXT_THRESHOLD = float(os.getenv("SIMILARITY_CONTEXT_THRESHOLD", "0.85"))
+SIMILARITY_REUSE_THRESHOLD = float(os.getenv("SIMILARITY_REUSE_THRESHOLD", "0.95"))
+# Sections about the niche rather than the founder, safe to reuse verbatim
+SIMILARITY_REUSABLE_TASKS = [
+    name.strip() for name in
+    os.getenv("SIMILARITY_REUSABLE_TASKS", "market_research_task,competition_analysis_task").split(",")
+    if name.strip()
+]
+# Characters of a prior section given to an agent as context
+SIMILARITY_CONTEXT_CHARS = int(os.getenv("SIMILARITY_CONTEXT_CHARS", "2000"))
+
+
+def idea_text(user_context: UserContext, topic: str) -> str:
+    """Text embedded for an idea"""
+    return f"{topic}\n{json.dumps(user_context.dict(), ensure_ascii=False, sort_keys=True)}"
+
+
+def embed(text: str) -> np.ndarray:
+    """Unit-length embedding of `text`"""
+    response = litellm.embedding(model=EMBEDDING_MODEL, input=[text])
+    vector = np.asarray(response.data[0]["embedding"], dtype=np.float32)
+    return vector / (np.linalg.norm(vector) or 1.0)
+
+
+class SimilarityIndex:
+    """
+    Execution ids, their owners and unit vectors, persisted as vectors.npy +
+    ids.json
+
+    Workers share the files: writes happen under an exclusive file lock on
+    top of the latest version on disk, and searches reload the index when
+    another process has saved a newer one.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.ids: List[str] = []
+        self.owners: List[Optional[str]] = []
+        self.vectors: Optional[np.ndarray] = None
+        self._version = None
+        self._lock = threading.Lock()
+
+    @property
+    def _vectors_file(self) -> Path:
+        return self.path / "vectors.npy"
+
+    @property
+    def _ids_file(self) -> Path:
+        return self.path / "ids.json"
+
+    def _file_version(self):
+        # Every save replaces ids.json with a new file (new inode)
+        stat = self._ids_file.stat()
+        return stat.st_ino, stat.st_mtime_ns
+
+    def _reload_if_changed(self):
+        try:
+            version = self._file_version()
+        except FileNotFoundError:
+            return
+        if version == self._version:
+            return
+        self.vectors = np.load(self._vectors_file)
+        with open(self._ids_file) as f:
+            data = json.load(f)
+        if isinstance(data, list):
+            # Indexed before matches were scoped to owners: never matched
+            data = {"ids": data, "owners": [None] * len(data)}
+        self.ids, self.owners = data["ids"], data["owners"]
+        self._version = version
+
+    def refresh(self):
+        """Pick up executions indexed by other processes"""
+        with self._lock:
+            self._reload_if_changed()
+
+    def search(self, vector: np.ndarray, owner_id: str, k: int = SIMILARITY_TOP_K) -> List[Tuple[str, float]]:
+        """Up to `k` (execution id, cosine similarity) pairs of `owner_id`, most similar first"""
+        with self._lock:
+            self._reload_if_changed()
+            if self.vectors is None or not len(self.ids):
+                return []
+            # A save by another process may be half-way (vectors replaced first)
+            count = min(len(self.ids), len(self.vectors))
+            rows = np.flatnonzero(np.asarray(self.owners[:count], dtype=object) == owner_id)
+            if not len(rows):
+                return []
+            ids = [self.ids[i] for i in rows]
+            scores = self.vectors[rows] @ vector
+        top = np.argsort(-scores)[:k]
+        return [(ids[i], float(scores[i])) for i in top]
+
+    def add(self, execution_id: str, owner_id: str, vector: np.ndarray):
+        self.path.mkdir(parents=True, exist_ok=True)
+        with self._lock, open(self.path / "index.lock", "w") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            self._reload_if_changed()
+            if execution_id in self.ids:
+                return
+            row = vector.reshape(1, -1).astype(np.float32)
+            self.vectors = row if self.vectors is None else np.vstack([self.vectors, row])
+            self.ids.append(execution_id)
+            self.owners.append(owner_id)
+            self._save()
+
+    def _save(self):
+        # Replace both files atomically; ids.json last, it marks the version
+        tmp_vectors = self.path / "vectors.tmp.npy"
+        np.save(tmp_vectors, self.vectors)
+        os.replace(tmp_vectors, self._vectors_file)
+        tmp_ids = self.path / "ids.json.tmp"
+        with open(tmp_ids, "w") as f:
+            json.dump({"ids": self.ids, "owners": self.owners}, f)
+        os.replace(tmp_ids, self._ids_file)
+        self._version = self._file_version()
+
+    def __len__(self):
+        return len(self.ids)
+
+
+index = SimilarityIndex(SIMILARITY_INDEX_PATH)
+
+
+@dataclass
+class WarmStart:
+    """Prior results found for an execution"""
+    vector: Optional[np.ndarray] = None
+    matches: List[Tuple[str, float]] = field(default_factory=list)
+    # Task -> output reused verbatim, and the execution it came from
+    reused: Dict[str, str] = field(default_factory=dict)
+    reused_from: Optional[str] = None
+    # Task -> prior output given to the agent as context
+    context: Dict[str, str] = field(default_factory=dict)
+    tokens_saved: int = 0
+
+    @property
+    def best_match(self) -> Tuple[Optional[str], Optional[float]]:
+        return self.matches[0] if self.matches else (None, None)
+
+
+async def find_warm_start(
+    session,
+    user_context: UserContext,
+    topic: str,
+    tasks: List[str],
+    owner_id: Optional[str]
+) -> WarmStart:
+    """
+    Look up prior executions of `owner_id` similar to this idea and pick what to reuse
+
+    Never fails the validation: without an owner, embeddings (or an index)
+    the crew simply runs from scratch.
+    """
+    warm = WarmStart()
+    if not SIMILARITY_ENABLED or not owner_id:
+        return warm
+    try:
+        warm.vector = await asyncio.to_thread(embed, idea_text(user_context, topic))
+        warm.matches = [
+            (execution_id, score)
+            for execution_id, score in await asyncio.to_thread(index.search, warm.vector, owner_id)
+            if score >= SIMILARITY_CONTEXT_THRESHOLD
+        ]
+    except Exception as e:
+        logger.warning(f"⚠️ Similar-idea lookup failed: {e}")
+        return warm
+    if not warm.matches:
+        return warm
+
+    outputs = await _prior_outputs(session, [execution_id for execution_id, _ in warm.matches], owner_id)
+    best_id, best_score = warm.best_match
+    if best_score >= SIMILARITY_REUSE_THRESHOLD:
+        warm.reused = {
+            task: outputs[best_id][task]
+            for task in tasks
+            if task in SIMILARITY_REUSABLE_TASKS and task in outputs.get(best_id, {})
+        }
+        if warm.reused:
+            warm.reused_from = best_id
+            warm.tokens_saved = await _section_tokens(session, best_id, list(warm.reused))
+
+    for task in tasks:
+        if task in warm.reused or task not in SIMILARITY_REUSABLE_TASKS:
+            continue
+        # Matches are sorted, so the first one with this section is the closest
+        for execution_id, score in warm.matches:
+            output = outputs.get(execution_id, {}).get(task)
+            if output:
+                warm.context[task] = _context_note(output, score)
+                break
+    return warm
+
+
+async def _prior_outputs(session, execution_ids: List[str], owner_id: str) -> Dict[str, Dict[str, str]]:
+    """Original (not themselves reused) outputs of reusable sections of `owner_id`'s executions"""
+    rows = await session.execute(
+        select(AgentResult.execution_id, AgentResult.agent_name, AgentResult.result_data)
+        .join(ValidationExecution, ValidationExecution.execution_id == AgentResult.execution_id)
+        .where(
+            AgentResult.execution_id.in_(execution_ids),
+            AgentResult.agent_name.in_(SIMILARITY_REUSABLE_TASKS),
+            AgentResult.status == AgentStatus.COMPLETED,
+            ValidationExecution.owner_id == owner_id
+        )
+    )
+    outputs: Dict[str, Dict[str, str]] = {}
+    for execution_id, task_name, data in rows:
+        if data and data.get("output") and not data.get("reused_from"):
+            outputs.setdefault(execution_id, {})[task_name] = data["output"]
+    return outputs
+
+
+async def _section_tokens(session, execution_id: str, tasks: List[str]) -> int:
+    """Tokens the source execution spent on `tasks`, i.e. what reusing them saves"""
+    llm_calls = (await session.execute(
+        select(ValidationMetrics.llm_calls).where(ValidationMetrics.execution_id == execution_id)
+    )).scalars().first() or []
+    agents = {SECTION_AGENTS[task] for task in tasks}
+    return sum(
+        call["prompt_tokens"] + call["completion_tokens"]
+        for call in llm_calls if call.get("agent") in agents
+    )
+
+
+def _context_note(output: str, score: float) -> str:
+    text = output[:SIMILARITY_CONTEXT_CHARS]
+    # Task descriptions are templates; keep prior text from looking like placeholders
+    text = text.replace("{", "(").replace("}", ")")
+    return (
+        f"Findings of an earlier validation of a similar idea (similarity {score:.2f}). "
+        f"Use them as a starting point: verify, update and adapt them to this idea "
+        f"instead of researching from scratch.\n\n{text}"
+    )
+
+
+def index_execution(execution_id: str, owner_id: Optional[str], vector: Optional[np.ndarray]):
+    """Add a completed execution to the index; executions without an owner are left out"""
+    if vector is None or not owner_id:
+        return
+    try:
+        index.add(execution_id, owner_id, vector)
+    except Exception as e:
+        logger.warning(f"⚠️ Could not index execution_id: {execution_id}: {e}")
+
+
+async def similarity_stats(session) -> Dict[str, Any]:
+    """Warm-start hit rates and token savings over all full validations"""
+    rows = (await session.execute(
+        select(ValidationMetrics.similarity_score, ValidationMetrics.sections_reused,
+               ValidationMetrics.sections_with_context, ValidationMetrics.tokens_saved)
+        .where(ValidationMetrics.similarity_checked.is_(True))
+    )).all()
+    lookups = len(rows)
+    context_hits = sum(1 for row in rows if row.sections_with_context)
+    reuse_hits = sum(1 for row in rows if row.sections_reused)
+    return {
+        "indexed_executions": len(index),
+        "lookups": lookups,
+        "context_hits": context_hits,
+        "reuse_hits": reuse_hits,
+        "context_hit_rate": round(context_hits / lookups, 3) if lookups else 0.0,
+        "reuse_hit_rate": round(reuse_hits / lookups, 3) if lookups else 0.0,
+        "sections_reused": sum(row.sections_reused or 0 for row in rows),
+        "tokens_saved": sum(row.tokens_saved or 0 for row in rows),
+    }
+
+
+async def rebuild_index():
+    """Embed every completed execution not yet indexed (backfill)"""
+    from .database import async_session_maker
+
+    async with async_session_maker() as session:
+        rows = (await session.execute(
+            select(ValidationExecution.execution_id, ValidationExecution.owner_id,
+                   ValidationExecution.topic, ValidationExecution.user_context)
+            .where(ValidationExecution.status == ExecutionStatus.COMPLETED, ValidationExecution.owner_id.isnot(None))
+        )).all()
+    index.refresh()
+    added = 0
+    for execution_id, owner_id, topic, user_context in rows:
+        if execution_id in index.ids:
+            continue
+        try:
+            vector = embed(idea_text(UserContext(**user_context), topic))
+        except Exception as e:
+            logger.warning(f"⚠️ Skipping execution_id: {execution_id}: {e}")
+            continue
+        index.add(execution_id, owner_id, vector)
+        added += 1
+    logger.info(f"🧭 Indexed {added} execution(s), {len(index)} in total")
+    return added
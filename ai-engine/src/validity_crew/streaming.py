@@ -0,0 +1,207 @@
+"""
+Report token streams
+
+The worker running an execution buffers its report chunks in a ReportStream.
+With REPORT_STREAM_REDIS_URL set, chunks are also relayed through Redis (a
+list replayed by late subscribers, a channel waking live ones), so a stream
+can be followed from any worker process. Without it only the worker running
+the execution streams chunks; the others send the stored report once done.
+"""
+import asyncio
+import json
+import logging
+import os
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+import redis.asyncio as aioredis
+from redis.exceptions import RedisError
+
+logger = logging.getLogger(__name__)
+
+# Marker the report generator emits before the report itself
+FINAL_ANSWER_MARKER = "Final Answer:"
+# Flush without the marker once this much text is buffered
+MAX_PREAMBLE_CHARS = 2000
+
+REDIS_URL = os.getenv("REPORT_STREAM_REDIS_URL", "")
+# How long relayed events stay replayable after the last one
+RELAY_TTL_SECONDS = int(os.getenv("REPORT_STREAM_TTL_SECONDS", "3600"))
+# Subscribers re-read the relayed list at least this often
+RELAY_WAIT_SECONDS = 5
+
+_redis: Optional[aioredis.Redis] = None
+
+
+def _get_redis() -> aioredis.Redis:
+    global _redis
+    if _redis is None:
+        _redis = aioredis.Redis.from_url(REDIS_URL)
+    return _redis
+
+
+def _relay_key(execution_id: str) -> str:
+    return f"report-stream:{execution_id}"
+
+
+class _RedisRelay:
+    """Copies one stream's events to Redis, in order, batching what piled up"""
+
+    def __init__(self, execution_id: str):
+        self._key = _relay_key(execution_id)
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    def send(self, event: Dict[str, Any]):
+        self._queue.put_nowait(event)
+
+    async def _run(self):
+        done = False
+        while not done:
+            batch = [await self._queue.get()]
+            while not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            done = any(event.get("done") for event in batch)
+            try:
+                pipe = _get_redis().pipeline(transaction=False)
+                pipe.rpush(self._key, *(json.dumps(event) for event in batch))
+                pipe.expire(self._key, RELAY_TTL_SECONDS)
+                pipe.publish(self._key, len(batch))
+                await pipe.execute()
+            except RedisError as e:
+                logger.warning(f"Failed to relay {len(batch)} report stream event(s) of {self._key}: {e}")
+
+
+class ReportStream:
+    """
+    Buffered token stream of one execution's report
+
+    Chunks are pushed from the crew worker thread and consumed by any number
+    of async subscribers; late subscribers replay the buffer first. A failed
+    execution closes its stream with the error.
+    """
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, relay: Optional[_RedisRelay] = None):
+        self._loop = loop
+        self._relay = relay
+        self._chunks: List[str] = []
+        self._changed = asyncio.Event()
+        self._preamble = ""
+        self._started = False
+        self.done = False
+        self.error: Optional[str] = None
+
+    def push(self, chunk: str):
+        """Thread-safe: queue an LLM token chunk for subscribers"""
+        self._loop.call_soon_threadsafe(self._append, chunk)
+
+    def close(self, error: Optional[str] = None):
+        """Thread-safe: mark the stream finished, failed with `error` if given"""
+        self._loop.call_soon_threadsafe(self._finish, error)
+
+    def _append(self, chunk: str):
+        if not self._started:
+            # Skip the agent's "Thought: ..." preamble, stream the answer only
+            self._preamble += chunk
+            if FINAL_ANSWER_MARKER in self._preamble:
+                chunk = self._preamble.split(FINAL_ANSWER_MARKER, 1)[1].lstrip()
+            elif len(self._preamble) > MAX_PREAMBLE_CHARS:
+                chunk = self._preamble
+            else:
+                return
+            self._started = True
+        if chunk:
+            self._emit(chunk)
+
+    def _emit(self, chunk: str):
+        self._chunks.append(chunk)
+        self._changed.set()
+        if self._relay:
+            self._relay.send({"chunk": chunk})
+
+    def _finish(self, error: Optional[str]):
+        if not self._started and self._preamble:
+            # The answer never carried the marker; it is the report itself
+            self._emit(self._preamble)
+        self.error = error
+        self.done = True
+        self._changed.set()
+        if self._relay:
+            self._relay.send({"done": True, "error": error})
+
+    async def iter_chunks(self) -> AsyncIterator[str]:
+        index = 0
+        while True:
+            while index < len(self._chunks):
+                yield self._chunks[index]
+                index += 1
+            if self.done:
+                return
+            self._changed.clear()
+            await self._changed.wait()
+
+
+_streams: Dict[str, ReportStream] = {}
+
+
+def open_report_stream(execution_id: str) -> ReportStream:
+    relay = None
+    if REDIS_URL:
+        relay = _RedisRelay(execution_id)
+        relay.send({"open": True})
+    stream = ReportStream(asyncio.get_running_loop(), relay)
+    _streams[execution_id] = stream
+    return stream
+
+
+def get_report_stream(execution_id: str) -> Optional[ReportStream]:
+    return _streams.get(execution_id)
+
+
+def close_report_stream(execution_id: str, error: Optional[str] = None):
+    """Finish the stream; subscribers already attached drain it, new ones read the DB"""
+    stream = _streams.pop(execution_id, None)
+    if stream:
+        stream.close(error)
+
+
+async def iter_relayed_events(execution_id: str) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Events of a stream run by another worker, as relayed through Redis
+
+    Yields {"chunk": ...} events and a final {"done": True, "error": ...};
+    yields nothing when relaying is off or the stream was never relayed.
+    """
+    if not REDIS_URL:
+        return
+    key = _relay_key(execution_id)
+    client = _get_redis()
+    pubsub = client.pubsub()
+    try:
+        # Subscribe before reading, so no batch lands unnoticed in between
+        await pubsub.subscribe(key)
+        index = 0
+        while True:
+            events = await client.lrange(key, index, -1)
+            if not events and index == 0:
+                return
+            for raw in events:
+                index += 1
+                event = json.loads(raw)
+                if event.get("open"):
+                    continue
+                yield event
+                if event.get("done"):
+                    return
+            await pubsub.get_message(ignore_subscribe_messages=True, timeout=RELAY_WAIT_SECONDS)
+    except RedisError as e:
+        logger.warning(f"Failed to follow relayed report stream of {execution_id}: {e}")
+    finally:
+        await pubsub.aclose()
+
+
+async def close_relay():
+    """Close the Redis client of relayed streams (app shutdown)"""
+    global _redis
+    if _redis is not None:
+        await _redis.aclose()
+        _redis = None
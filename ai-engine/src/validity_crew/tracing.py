@@ -0,0 +1,269 @@
+"""
+Lightweight span tracing of validations, exported as Chrome trace files
+
+Spans nest through a context variable, so they follow the execution into
+asyncio.to_thread and the crew's task threads (run_in_context). crewAI
+agent steps, tool uses and LLM calls are traced from its event bus. A
+trace continues the caller's W3C `traceparent`; when its execution ends it
+is written to TRACE_DIR/<execution_id>.json, which chrome://tracing,
+https://ui.perfetto.dev or speedscope open as a flame chart.
+"""
+import contextvars
+import json
+import logging
+import os
+import re
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+TRACING_ENABLED = os.getenv("TRACING_ENABLED", "true").lower() == "true"
+TRACE_DIR = Path(os.getenv("TRACE_DIR", "output/traces"))
+# Unfinished traces kept in memory; the oldest are dropped beyond this
+MAX_PENDING_TRACES = 256
+
+TRACEPARENT_PATTERN = re.compile(r"^[0-9a-f]{2}-([0-9a-f]{32})-([0-9a-f]{16})-[0-9a-f]{2}$")
+
+
+@dataclass
+class Span:
+    name: str
+    trace_id: str
+    span_id: str
+    parent_id: Optional[str]
+    start_us: int
+    end_us: Optional[int] = None
+    attributes: Dict[str, Any] = field(default_factory=dict)
+    thread_id: int = 0
+    parent: Optional["Span"] = None
+
+    def end(self, end_us: Optional[int] = None):
+        if self.end_us is None:
+            self.end_us = end_us or _now_us()
+            _collector.add(self)
+
+
+current_span: contextvars.ContextVar[Optional[Span]] = contextvars.ContextVar("current_span", default=None)
+
+
+def _now_us() -> int:
+    return time.time_ns() // 1000
+
+
+class _Collector:
+    """Finished spans grouped by trace until the trace is exported"""
+
+    def __init__(self):
+        self._traces: "OrderedDict[str, List[Span]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def add(self, span: Span):
+        with self._lock:
+            self._traces.setdefault(span.trace_id, []).append(span)
+            if len(self._traces) > MAX_PENDING_TRACES:
+                self._traces.popitem(last=False)
+
+    def pop(self, trace_id: str) -> List[Span]:
+        with self._lock:
+            return self._traces.pop(trace_id, [])
+
+
+_collector = _Collector()
+
+
+def parse_traceparent(header: Optional[str]) -> Tuple[Optional[str], Optional[str]]:
+    """(trace id, parent span id) of a W3C traceparent header, or (None, None)"""
+    match = TRACEPARENT_PATTERN.match((header or "").strip().lower())
+    if not match or match.group(1) == "0" * 32:
+        return None, None
+    return match.group(1), match.group(2)
+
+
+def start_span(
+    name: str,
+    parent: Optional[Span] = None,
+    trace_id: Optional[str] = None,
+    parent_id: Optional[str] = None,
+    start_us: Optional[int] = None,
+    **attributes
+) -> Span:
+    """
+    A span under `parent`, or remote parent `parent_id` of trace `trace_id`,
+    or else the current span; not made current
+    """
+    if parent is None and trace_id is None:
+        parent = current_span.get()
+    if parent is not None:
+        trace_id, parent_id = parent.trace_id, parent.span_id
+    return Span(
+        name=name,
+        trace_id=trace_id or secrets.token_hex(16),
+        span_id=secrets.token_hex(8),
+        parent_id=parent_id,
+        start_us=start_us or _now_us(),
+        attributes=attributes,
+        thread_id=threading.get_ident(),
+        parent=parent,
+    )
+
+
+@contextmanager
+def span(name: str, trace_id: Optional[str] = None, parent_id: Optional[str] = None, **attributes):
+    """
+    Trace the enclosed block as a child of the current span
+
+    Without a current span, starts trace `trace_id` under remote parent
+    `parent_id` (from a traceparent header), or a new trace.
+    """
+    if not TRACING_ENABLED:
+        yield None
+        return
+    current = start_span(name, trace_id=trace_id, parent_id=parent_id, **attributes)
+    token = current_span.set(current)
+    try:
+        yield current
+    except BaseException as e:
+        current.attributes["error"] = repr(e)
+        raise
+    finally:
+        current_span.reset(token)
+        current.end()
+
+
+def record_span(
+    name: str,
+    start_us: int,
+    end_us: int,
+    trace_id: Optional[str] = None,
+    parent_id: Optional[str] = None,
+    **attributes
+):
+    """Add an already finished span, e.g. time spent waiting in a queue"""
+    if TRACING_ENABLED and end_us > start_us:
+        start_span(name, trace_id=trace_id, parent_id=parent_id, start_us=start_us, **attributes).end(end_us)
+
+
+def parse_queued_since(tracestate: Optional[str]) -> Optional[int]:
+    """Epoch microseconds the caller queued the work since (`bvp=queued:<us>` in tracestate)"""
+    for member in (tracestate or "").split(","):
+        key, _, value = member.strip().partition("=")
+        if key == "bvp" and value.startswith("queued:") and value[7:].isdigit():
+            return int(value[7:])
+    return None
+
+
+def export_trace(trace_id: str, execution_id: str) -> Optional[Path]:
+    """Write the trace's finished spans as Chrome trace events"""
+    spans = _collector.pop(trace_id)
+    if not spans:
+        return None
+    pid = os.getpid()
+    events = [
+        {
+            "name": s.name,
+            "cat": s.name.split(".")[0],
+            "ph": "X",
+            "ts": s.start_us,
+            "dur": s.end_us - s.start_us,
+            "pid": pid,
+            "tid": s.thread_id,
+            "args": {**s.attributes, "span_id": s.span_id, "parent_id": s.parent_id},
+        }
+        for s in sorted(spans, key=lambda s: s.start_us)
+    ]
+    TRACE_DIR.mkdir(parents=True, exist_ok=True)
+    path = TRACE_DIR / f"{execution_id}.json"
+    with open(path, "w") as f:
+        json.dump({
+            "traceEvents": events,
+            "displayTimeUnit": "ms",
+            "otherData": {"trace_id": trace_id, "execution_id": execution_id},
+        }, f, default=str)
+    return path
+
+
+# Spans opened by crewAI start events, per thread and kind, until their end event
+_open_event_spans: Dict[Tuple[int, str], List[Span]] = {}
+_event_lock = threading.Lock()
+
+
+def _push_event_span(kind: str, name: str, **attributes):
+    parent = current_span.get()
+    if parent is None:
+        return
+    opened = start_span(name, parent=parent, **attributes)
+    with _event_lock:
+        _open_event_spans.setdefault((threading.get_ident(), kind), []).append(opened)
+    current_span.set(opened)
+
+
+def _pop_event_span(kind: str, error: Optional[str] = None):
+    with _event_lock:
+        stack = _open_event_spans.get((threading.get_ident(), kind))
+        opened = stack.pop() if stack else None
+        if stack is not None and not stack:
+            _open_event_spans.pop((threading.get_ident(), kind), None)
+    if opened is None:
+        return
+    if error:
+        opened.attributes["error"] = error
+    opened.end()
+    current_span.set(opened.parent)
+
+
+def install_crewai_tracing():
+    """Trace agent steps, tool uses and LLM calls from crewAI's event bus"""
+    if not TRACING_ENABLED:
+        return
+    from crewai.utilities.events import crewai_event_bus
+    from crewai.utilities.events.agent_events import (
+        AgentExecutionStartedEvent, AgentExecutionCompletedEvent, AgentExecutionErrorEvent
+    )
+    from crewai.utilities.events.llm_events import LLMCallStartedEvent, LLMCallCompletedEvent, LLMCallFailedEvent
+    from crewai.utilities.events.tool_usage_events import (
+        ToolUsageStartedEvent, ToolUsageFinishedEvent, ToolUsageErrorEvent
+    )
+
+    @crewai_event_bus.on(AgentExecutionStartedEvent)
+    def _agent_started(source, event):
+        role = getattr(getattr(event, "agent", None), "role", None)
+        _push_event_span("agent", "agent.step", agent=role)
+
+    @crewai_event_bus.on(AgentExecutionCompletedEvent)
+    def _agent_completed(source, event):
+        _pop_event_span("agent")
+
+    @crewai_event_bus.on(AgentExecutionErrorEvent)
+    def _agent_failed(source, event):
+        _pop_event_span("agent", error=str(getattr(event, "error", "")))
+
+    @crewai_event_bus.on(ToolUsageStartedEvent)
+    def _tool_started(source, event):
+        _push_event_span("tool", "tool.call", tool=getattr(event, "tool_name", None))
+
+    @crewai_event_bus.on(ToolUsageFinishedEvent)
+    def _tool_finished(source, event):
+        _pop_event_span("tool")
+
+    @crewai_event_bus.on(ToolUsageErrorEvent)
+    def _tool_failed(source, event):
+        _pop_event_span("tool", error=str(getattr(event, "error", "")))
+
+    @crewai_event_bus.on(LLMCallStartedEvent)
+    def _llm_started(source, event):
+        _push_event_span("llm", "llm.call", model=getattr(source, "model", None))
+
+    @crewai_event_bus.on(LLMCallCompletedEvent)
+    def _llm_completed(source, event):
+        _pop_event_span("llm")
+
+    @crewai_event_bus.on(LLMCallFailedEvent)
+    def _llm_failed(source, event):
+        _pop_event_span("llm", error=str(getattr(event, "error", "")))
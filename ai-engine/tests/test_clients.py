@@ -0,0 +1,20 @@
+from unittest import mock
+
+from validity_crew import clients
+from validity_crew.clients import PooledSerperDevTool
+
+
+def test_serper_searches_go_through_the_shared_session(monkeypatch):
+    # PooledSerperDevTool overrides a private crewai_tools method: if an
+    # upgrade renames or stops calling it, searches bypass the pool again
+    monkeypatch.setenv("SERPER_API_KEY", "test-key")
+    session = mock.Mock()
+    session.post.return_value.json.return_value = {"organic": [{"title": "Result", "link": "https://e.com"}]}
+    monkeypatch.setattr(clients, "search_session", lambda: session)
+
+    result = PooledSerperDevTool(n_results=3).run(search_query="coffee subscriptions")
+
+    url = session.post.call_args.args[0]
+    assert url == "https://google.serper.dev/search"
+    assert session.post.call_args.kwargs["json"] == {"q": "coffee subscriptions", "num": 3}
+    assert result["organic"][0]["title"] == "Result"
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Idea, Session, Message, Subscription
+from .models import Idea, ImportJob, Session, Message, Subscription, UsageDaily, UsageEvent
 
 @admin.register(Subscription)
 class SubscriptionAdmin(admin.ModelAdmin):
@@ -14,10 +14,17 @@ class IdeaAdmin(admin.ModelAdmin):
     search_fields = ['title', 'description', 'owner__username']
     readonly_fields = ['created_at']
 
+@admin.register(ImportJob)
+class ImportJobAdmin(admin.ModelAdmin):
+    list_display = ['owner', 'format', 'rows_total', 'ideas_created', 'rows_rejected', 'created_at']
+    list_filter = ['format', 'created_at']
+    search_fields = ['owner__username']
+    readonly_fields = ['created_at']
+
 @admin.register(Session)
 class SessionAdmin(admin.ModelAdmin):
-    list_display = ['idea', 'started_at', 'finished', 'agent_run_id']
-    list_filter = ['finished', 'started_at']
+    list_display = ['idea', 'started_at', 'finished', 'failed', 'finished_at', 'archived', 'agent_run_id']
+    list_filter = ['finished', 'failed', 'archived', 'started_at']
     search_fields = ['idea__title', 'agent_run_id']
     readonly_fields = ['started_at']
 
@@ -30,4 +37,17 @@ class MessageAdmin(admin.ModelAdmin):
     
     def content_preview(self, obj):
         return obj.content[:100] + '...' if len(obj.content) > 100 else obj.content
-    content_preview.short_description = 'Content Preview'
\ No newline at end of file
+    content_preview.short_description = 'Content Preview'
+
+@admin.register(UsageEvent)
+class UsageEventAdmin(admin.ModelAdmin):
+    list_display = ['user', 'kind', 'execution_id', 'total_tokens', 'duration_seconds', 'created_at']
+    list_filter = ['kind', 'created_at']
+    search_fields = ['user__username', 'execution_id']
+    readonly_fields = ['created_at']
+
+@admin.register(UsageDaily)
+class UsageDailyAdmin(admin.ModelAdmin):
+    list_display = ['user', 'day', 'ideas', 'executions', 'total_tokens', 'llm_calls']
+    list_filter = ['day']
+    search_fields = ['user__username']
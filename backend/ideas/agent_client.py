@@ -1,10 +1,30 @@
+import logging
 import os
+import secrets
 import requests
-import time
 from django.conf import settings
+from django.utils import timezone
+from .engine_http import EngineUnavailable, get_engine_http
 
 AGENTS_BASE_URL = os.getenv('AGENTS_BASE_URL', settings.AGENTS_BASE_URL)
 
+logger = logging.getLogger(__name__)
+
+
+def trace_headers(session):
+    """
+    W3C trace context starting the engine-side trace of a session's execution
+
+    The engine exports the trace to its output/traces/<execution_id>.json;
+    `tracestate` tells it since when the session waited to be started.
+    """
+    trace_id = secrets.token_hex(16)
+    queued_since = int(session.started_at.timestamp() * 1_000_000) if session.started_at else None
+    headers = {'traceparent': f"00-{trace_id}-{secrets.token_hex(8)}-01"}
+    if queued_since:
+        headers['tracestate'] = f"bvp=queued:{queued_since}"
+    return trace_id, headers
+
 class AgentClient:
     """
     Adapter for CrewAI Validation API
@@ -13,6 +33,7 @@ class AgentClient:
     """
     def __init__(self, base_url=None):
         self.base = base_url or AGENTS_BASE_URL.rstrip('/')
+        self.http = get_engine_http(self.base)
 
     def start_session(self, session):
         """
@@ -20,8 +41,6 @@ class AgentClient:
         
         Maps Django session to CrewAI ValidationRequest format
         """
-        url = f"{self.base}/api/v1/validate"
-        
         # Convert Django session to CrewAI format
         payload = {
             "topic": session.idea.description,
@@ -34,24 +53,37 @@ class AgentClient:
                 "budget": getattr(session.idea, 'budget', 0),
                 "timeline": getattr(session.idea, 'timeline', '')
             },
+            # Scopes warm starts from similar ideas to this user's validations
+            "owner_id": str(session.idea.owner_id),
+            # full, quick, or quick_and_full (short report first, full run after)
+            "mode": settings.AGENT_VALIDATION_MODE,
             "webhook_url": None  # We'll poll for results instead
         }
         
+        trace_id, headers = trace_headers(session)
         try:
-            r = requests.post(url, json=payload, timeout=30)
-            r.raise_for_status()
+            r = self.http.post("/api/v1/validate", json=payload, headers=headers, timeout=30)
             data = r.json()
+            logger.info(f"Session {session.id} started as {data.get('execution_id')}, trace {trace_id}")
             
             # Store CrewAI execution_id as agent_run_id
             if 'execution_id' in data:
                 session.agent_run_id = data['execution_id']
                 session.save()
                 
-                # Start polling for results in background
-                self._poll_for_results(session, data['execution_id'])
+                from .models import Message
+                Message.objects.create(
+                    session=session,
+                    sender=Message.SENDER_AGENT,
+                    content="🚀 Начинаю анализ вашей бизнес-идеи с помощью AI-агентов...",
+                    metadata={"type": "status", "execution_id": data['execution_id'], "trace_id": trace_id}
+                )
             
             return data
             
+        except EngineUnavailable:
+            # Caller reschedules once the engine is healthy again
+            raise
         except requests.RequestException as e:
             from .models import Message
             Message.objects.create(
@@ -62,106 +94,141 @@ class AgentClient:
             )
             return {"error": str(e)}
 
-    def _poll_for_results(self, session, execution_id):
+    def check_progress(self, session):
+        """
+        Check CrewAI validation status once
+        
+        Records progress, the final report or the failure on the session.
+        Returns True once the execution reached a terminal state.
+        Raises requests.RequestException if the engine can't be reached
+        (EngineUnavailable while its circuit breaker is open).
+        """
+        execution_id = session.agent_run_id
+        response = self.http.get(
+            f"/api/v1/status/{execution_id}",
+            endpoint="/api/v1/status/{execution_id}",
+            timeout=10
+        )
+        status_data = response.json()
+        
+        result_data = None
+        if status_data['status'] == 'completed':
+            # Get final results
+            result_response = self.http.get(
+                f"/api/v1/result/{execution_id}",
+                endpoint="/api/v1/result/{execution_id}",
+                timeout=10
+            )
+            result_data = result_response.json()
+        
+        quick_data = None
+        if wants_quick_report(session, status_data):
+            # quick_and_full: show the short report while the full run continues
+            quick_response = self.http.get(
+                f"/api/v1/result/{execution_id}/quick",
+                endpoint="/api/v1/result/{execution_id}/quick",
+                timeout=10
+            )
+            quick_data = quick_response.json()
+        
+        messages, update_fields = self.apply_status(session, status_data, result_data, quick_data)
+        for message in messages:
+            message.save()
+        if update_fields:
+            session.save(update_fields=update_fields)
+        if result_data is not None:
+            from .usage import record_execution
+            record_execution(session, result_data.get('metrics'))
+        return session.finished or session.failed
+
+    def apply_status(self, session, status_data, result_data=None, quick_data=None):
         """
-        Poll CrewAI for validation results
+        Map a CrewAI status (and result, once completed) onto the session
+        
+        Updates session fields in memory and returns the unsaved Messages to
+        record plus the names of the session fields that changed; callers
+        decide how to persist them. Progress is kept on the session and only
+        changes when the completed agent count or the stage moves, or when
+        the quick report (`quick_data`, fetched while the full run is still
+        going) is posted to the chat.
         """
         from .models import Message
+        from .reports import store_report
         
-        # Send initial message
-        Message.objects.create(
-            session=session,
-            sender=Message.SENDER_AGENT,
-            content="🚀 Начинаю анализ вашей бизнес-идеи с помощью AI-агентов...",
-            metadata={"type": "status", "execution_id": execution_id}
-        )
+        execution_id = session.agent_run_id
         
-        max_attempts = 60  # 10 minutes max
-        attempt = 0
+        if status_data['status'] == 'completed':
+            # Render the report once and store it in session
+            update_fields = store_report(session, markdown_text=result_data.get('final_report_markdown', ''))
+            session.finished = True
+            session.finished_at = timezone.now()
+            
+            # Final report message
+            return [Message(
+                session=session,
+                sender=Message.SENDER_AGENT,
+                content="✅ Анализ завершен! Вот ваш подробный отчет:",
+                metadata={
+                    "type": "final_report",
+                    "execution_id": execution_id
+                }
+            )], update_fields + ['finished', 'finished_at']
+            
+        elif status_data['status'] == 'failed':
+            session.failed = True
+            session.finished_at = timezone.now()
+            return [Message(
+                session=session,
+                sender=Message.SENDER_SYSTEM,
+                content="❌ Произошла ошибка при анализе бизнес-идеи",
+                metadata={
+                    "type": "error",
+                    "error": status_data.get('error_message', 'Unknown error')
+                }
+            )], ['failed', 'finished_at']
+            
+        # Still running - update progress only when it moved
+        messages = []
+        progress = {
+            "agents_completed": status_data.get('agents_completed', 0),
+            "total_agents": status_data.get('total_agents', 11),
+            "stage": status_data.get('current_stage', 'Processing...'),
+        }
+        if session.progress.get('quick_report_delivered'):
+            progress["quick_report_delivered"] = True
+        elif quick_data is not None:
+            messages.append(Message(
+                session=session,
+                sender=Message.SENDER_AGENT,
+                content=f"⚡ Краткий отчет готов, полный анализ продолжается:\n\n{quick_data.get('report_markdown', '')}",
+                metadata={
+                    "type": "quick_report",
+                    "execution_id": execution_id
+                }
+            ))
+            progress["quick_report_delivered"] = True
+        if all(session.progress.get(key) == value for key, value in progress.items()):
+            return messages, []
         
-        while attempt < max_attempts:
-            try:
-                # Check status
-                status_url = f"{self.base}/api/v1/status/{execution_id}"
-                response = requests.get(status_url, timeout=10)
-                
-                if response.status_code == 200:
-                    status_data = response.json()
-                    
-                    if status_data['status'] == 'completed':
-                        # Get final results
-                        result_url = f"{self.base}/api/v1/result/{execution_id}"
-                        result_response = requests.get(result_url, timeout=10)
-                        
-                        if result_response.status_code == 200:
-                            result_data = result_response.json()
-                            
-                            # Create final report message
-                            Message.objects.create(
-                                session=session,
-                                sender=Message.SENDER_AGENT,
-                                content="✅ Анализ завершен! Вот ваш подробный отчет:",
-                                metadata={
-                                    "type": "final_report",
-                                    "execution_id": execution_id
-                                }
-                            )
-                            
-                            # Store report in session
-                            session.report = result_data.get('final_report_markdown', '')
-                            session.report_sections = [{
-                                'title': 'AI Validation Report',
-                                'html': result_data.get('final_report_markdown', '').replace('\n', '<br>')
-                            }]
-                            session.finished = True
-                            session.save()
-                            
-                        break
-                        
-                    elif status_data['status'] == 'failed':
-                        Message.objects.create(
-                            session=session,
-                            sender=Message.SENDER_SYSTEM,
-                            content="❌ Произошла ошибка при анализе бизнес-идеи",
-                            metadata={
-                                "type": "error",
-                                "error": status_data.get('error_message', 'Unknown error')
-                            }
-                        )
-                        break
-                        
-                    else:
-                        # Still running - send progress update
-                        agents_completed = status_data.get('agents_completed', 0)
-                        total_agents = status_data.get('total_agents', 11)
-                        current_stage = status_data.get('current_stage', 'Processing...')
-                        
-                        progress_message = f"🔄 Анализ в процессе: {agents_completed}/{total_agents} агентов завершили работу\n{current_stage}"
-                        
-                        Message.objects.create(
-                            session=session,
-                            sender=Message.SENDER_AGENT,
-                            content=progress_message,
-                            metadata={
-                                "type": "progress",
-                                "execution_id": execution_id,
-                                "progress": agents_completed / total_agents if total_agents > 0 else 0
-                            }
-                        )
-                
-                attempt += 1
-                time.sleep(10)  # Wait 10 seconds before next check
-                
-            except Exception as e:
-                attempt += 1
-                if attempt >= max_attempts:
-                    Message.objects.create(
-                        session=session,
-                        sender=Message.SENDER_SYSTEM,
-                        content=f"❌ Превышено время ожидания результатов: {e}",
-                        metadata={"type": "timeout_error"}
-                    )
-                time.sleep(10)
+        progress["updated_at"] = timezone.now().isoformat()
+        session.progress = progress
+        return messages, ['progress']
+
+    def timeout_session(self, session):
+        """
+        Give up tracking: mark the session failed (fields `failed` and
+        `finished_at`) and return the message to record
+        """
+        from .models import Message
+        
+        session.failed = True
+        session.finished_at = timezone.now()
+        return Message(
+            session=session,
+            sender=Message.SENDER_SYSTEM,
+            content="❌ Превышено время ожидания результатов",
+            metadata={"type": "timeout_error"}
+        )
 
     def send_user_message(self, session, message):
         """
@@ -182,4 +249,13 @@ class AgentClient:
             }
         )
         
-        return {"status": "acknowledged"}
\ No newline at end of file
+        return {"status": "acknowledged"}
+
+
+def wants_quick_report(session, status_data):
+    """Whether the quick report of a still running execution should be fetched"""
+    return (
+        status_data['status'] not in ('completed', 'failed')
+        and status_data.get('quick_report_ready', False)
+        and not session.progress.get('quick_report_delivered')
+    )
@@ -3,4 +3,7 @@ from django.apps import AppConfig
 
 class IdeasConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
-    name = 'ideas'
\ No newline at end of file
+    name = 'ideas'
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,116 @@
+import json
+import logging
+import zlib
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .models import Message, Session, SessionArchive
+
+logger = logging.getLogger(__name__)
+
+ARCHIVED_MESSAGE_FIELDS = ['id', 'sender', 'content', 'metadata', 'event_id', 'created_at']
+# Messages restored per INSERT when rehydrating
+REHYDRATE_BATCH_SIZE = 500
+
+
+def archivable_sessions(now=None):
+    """Ended sessions not archived, and not reopened, for SESSION_ARCHIVE_AFTER_DAYS"""
+    cutoff = (now or timezone.now()) - timedelta(days=settings.SESSION_ARCHIVE_AFTER_DAYS)
+    return (
+        Session.objects
+        .filter(archived=False, finished_at__lt=cutoff)
+        .filter(Q(rehydrated_at__isnull=True) | Q(rehydrated_at__lt=cutoff))
+        .order_by('finished_at')
+    )
+
+
+def archive_sessions(limit=None):
+    """Archive up to `limit` sessions, oldest first; returns how many were archived"""
+    limit = limit or settings.SESSION_ARCHIVE_BATCH_SIZE
+    session_ids = list(archivable_sessions().values_list('pk', flat=True)[:limit])
+    archived = sum(1 for session_id in session_ids if archive_session(session_id))
+    if archived:
+        logger.info(f"Archived {archived} session(s)")
+    return archived
+
+
+def archive_session(session_id):
+    """
+    Move a session's messages and report source into its SessionArchive
+
+    Report sections stay on the session (already compressed), so reports
+    keep being served without rehydration.
+    """
+    with transaction.atomic():
+        session = Session.objects.select_for_update().filter(pk=session_id, archived=False).first()
+        if session is None:
+            return False
+        messages = list(
+            Message.objects.filter(session=session).order_by('created_at', 'id').values(*ARCHIVED_MESSAGE_FIELDS)
+        )
+        for message in messages:
+            message['created_at'] = message['created_at'].isoformat()
+        SessionArchive.objects.create(
+            session=session,
+            messages_blob=_pack(messages),
+            report_blob=_pack(session.report) if session.report else None,
+            message_count=len(messages),
+            last_message_id=max((message['id'] for message in messages), default=None),
+        )
+        Message.objects.filter(session=session).delete()
+        session.report = ''
+        session.archived = True
+        session.save(update_fields=['report', 'archived'])
+    return True
+
+
+def rehydrate_session(session_id, owner=None):
+    """
+    Restore an archived session's messages and report source, if archived
+
+    Messages get back their ids and timestamps, so cursors and Last-Event-ID
+    held by clients stay valid. A single indexed lookup for sessions that
+    aren't archived (or, with `owner`, belong to someone else).
+    """
+    sessions = Session.objects.filter(pk=session_id, archived=True)
+    if owner is not None:
+        sessions = sessions.filter(idea__owner=owner)
+    if not sessions.exists():
+        return False
+    with transaction.atomic():
+        archive = SessionArchive.objects.select_for_update().select_related('session').filter(session_id=session_id).first()
+        if archive is None:
+            # Rehydrated concurrently
+            return False
+        session = archive.session
+        messages = [
+            Message(session=session, **{**row, 'created_at': parse_datetime(row['created_at'])})
+            for row in _unpack(archive.messages_blob)
+        ]
+        created_at = {message.pk: message.created_at for message in messages}
+        Message.objects.bulk_create(messages, batch_size=REHYDRATE_BATCH_SIZE)
+        # auto_now_add overwrote the timestamps on insert; put them back
+        for message in messages:
+            message.created_at = created_at[message.pk]
+        Message.objects.bulk_update(messages, ['created_at'], batch_size=REHYDRATE_BATCH_SIZE)
+
+        session.report = _unpack(archive.report_blob) if archive.report_blob else ''
+        session.archived = False
+        session.rehydrated_at = timezone.now()
+        session.save(update_fields=['report', 'archived', 'rehydrated_at'])
+        archive.delete()
+    logger.info(f"Rehydrated session {session_id} with {len(messages)} message(s)")
+    return True
+
+
+def _pack(value):
+    return zlib.compress(json.dumps(value, ensure_ascii=False).encode('utf-8'), 9)
+
+
+def _unpack(blob):
+    return json.loads(zlib.decompress(bytes(blob)).decode('utf-8'))
@@ -0,0 +1,88 @@
+import logging
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from redis import RedisError
+
+logger = logging.getLogger(__name__)
+
+
+def user_version_key(user_id):
+    """Version of everything listed for a user: ideas, idea details, sessions"""
+    return f"ver:user:{user_id}"
+
+
+def session_version_key(session_id):
+    """Version of a single session payload"""
+    return f"ver:session:{session_id}"
+
+
+def cached_data(name, version_keys, build):
+    """
+    Serialized API data, cached under the current versions of its keys
+
+    Bumping any of `version_keys` makes the entry unreachable, so nothing is
+    ever deleted explicitly; stale entries simply expire. Falls back to
+    `build()` when the cache is unavailable.
+    """
+    try:
+        versions = _versions(version_keys)
+        key = f"api:{name}:" + ':'.join(str(versions[k]) for k in version_keys)
+        data = cache.get(key)
+    except RedisError as e:
+        logger.warning(f"API cache unavailable: {e}")
+        return build()
+
+    if data is None:
+        data = build()
+        try:
+            cache.set(key, data, settings.API_CACHE_TIMEOUT_SECONDS)
+        except RedisError as e:
+            logger.warning(f"API cache unavailable: {e}")
+    return data
+
+
+def invalidate_sessions(session_ids):
+    """Bump the versions of sessions and of their owners"""
+    from .models import Session
+
+    rows = Session.objects.filter(pk__in=set(session_ids)).values_list('pk', 'idea__owner_id')
+    keys = {session_version_key(pk) for pk, _ in rows} | {user_version_key(owner) for _, owner in rows}
+    _bump(keys)
+
+
+def invalidate_idea(idea):
+    """Bump the owner's version and the idea's session, which embeds the idea"""
+    from .models import Session
+
+    keys = {user_version_key(idea.owner_id)}
+    keys.update(session_version_key(pk) for pk in Session.objects.filter(idea_id=idea.pk).values_list('pk', flat=True))
+    _bump(keys)
+
+
+def invalidate_deleted_session(session_id):
+    """Bump the version of a deleted session, whose rows can't be looked up anymore"""
+    _bump({session_version_key(session_id)})
+
+
+def _versions(keys):
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            # Start from the clock, not 1, so a counter lost to eviction
+            # can't revive entries cached under its old values
+            cache.add(key, time.time_ns(), None)
+            versions[key] = cache.get(key)
+    return versions
+
+
+def _bump(keys):
+    try:
+        for key in keys:
+            try:
+                cache.incr(key)
+            except ValueError:
+                cache.set(key, time.time_ns(), None)
+    except RedisError as e:
+        logger.warning(f"Failed to invalidate API cache {sorted(keys)}: {e}")
@@ -0,0 +1,88 @@
+from django.db import transaction
+from django.utils import timezone
+
+from .caching import invalidate_sessions
+from .events import publish_messages
+from .models import Message, Session
+from .reports import store_event_report
+from .usage import record_execution
+
+# Largest batch accepted by the batch callback endpoint
+MAX_CALLBACK_BATCH = 500
+
+
+def ingest_agent_events(events):
+    """
+    Store a batch of agent callback events
+
+    Events are deduplicated by `event_id` (within the batch and against
+    stored messages), written with one bulk insert, and each affected
+    session is updated once. `progress` events only update Session.progress;
+    `final_report` events also store the report, finish the session and
+    meter the execution.
+    """
+    seen, batch = set(), []
+    for event in events:
+        event['session_id'] = _session_key(event.get('session_id'))
+        event_id = event.get('event_id')
+        if event_id:
+            if event_id in seen:
+                continue
+            seen.add(event_id)
+        batch.append(event)
+
+    sessions = Session.objects.in_bulk({event['session_id'] for event in batch} - {None})
+    stored = set(Message.objects.filter(event_id__in=seen).values_list('event_id', flat=True))
+
+    messages, updated, unknown, finished = [], {}, set(), []
+    for event in batch:
+        session = sessions.get(event['session_id'])
+        if session is None:
+            unknown.add(event['session_id'])
+            continue
+        if event.get('event_id') in stored:
+            continue
+
+        if event.get('type') == 'progress':
+            session.progress = event.get('metadata', {})
+            updated.setdefault(session.pk, (session, set()))[1].add('progress')
+            continue
+
+        messages.append(Message(
+            session=session,
+            sender=Message.SENDER_AGENT,
+            content=event.get('content', ''),
+            metadata=event.get('metadata', {}),
+            event_id=event.get('event_id') or None
+        ))
+        if event.get('type') == 'final_report':
+            fields = store_event_report(session, event)
+            session.finished = True
+            session.finished_at = timezone.now()
+            finished.append((session, event.get('metrics')))
+            updated.setdefault(session.pk, (session, set()))[1].update(fields + ['finished', 'finished_at'])
+
+    with transaction.atomic():
+        Message.objects.bulk_create(messages)
+        for session, fields in updated.values():
+            session.save(update_fields=sorted(fields))
+        for session, metrics in finished:
+            record_execution(session, metrics)
+        transaction.on_commit(lambda: publish_messages(messages))
+        # bulk_create skips post_save, so bump cache versions here
+        transaction.on_commit(lambda: invalidate_sessions({m.session_id for m in messages}))
+
+    return {
+        "created": len(messages),
+        "duplicates": len(events) - len(batch) + len(stored),
+        "sessions_updated": len(updated),
+        "unknown_sessions": sorted(unknown, key=str),
+    }
+
+
+def _session_key(value):
+    """Session primary key from an event's session_id, None if malformed"""
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
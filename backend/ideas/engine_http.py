@@ -0,0 +1,190 @@
+import logging
+import os
+import threading
+import time
+from collections import defaultdict, deque
+
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+logger = logging.getLogger(__name__)
+
+# Log a latency summary for an endpoint every this many calls
+LATENCY_LOG_EVERY = 100
+
+
+class EngineUnavailable(requests.RequestException):
+    """The circuit breaker is open: the AI engine is considered unhealthy"""
+
+    def __init__(self, retry_after):
+        super().__init__(f"AI engine unavailable, retry in {retry_after:.0f}s")
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """
+    Fail fast while the engine keeps failing
+
+    Opens after `failure_threshold` consecutive failures; after `reset_timeout`
+    seconds a single trial call is let through (half-open) and its outcome
+    closes or re-opens the circuit.
+    """
+
+    def __init__(self, failure_threshold, reset_timeout):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def retry_after(self):
+        if self.opened_at is None:
+            return 0
+        return max(0, self.opened_at + self.reset_timeout - time.monotonic())
+
+    def allow(self):
+        with self._lock:
+            if self.opened_at is None:
+                return True
+            if self.retry_after > 0 or self._trial_in_flight:
+                return False
+            self._trial_in_flight = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self._trial_in_flight = False
+            if self.opened_at is not None or self.failures >= self.failure_threshold:
+                if self.opened_at is None:
+                    logger.warning(f"AI engine circuit opened after {self.failures} failures")
+                self.opened_at = time.monotonic()
+
+
+class LatencyStats:
+    """Per-endpoint call counts and latency percentiles over recent calls"""
+
+    def __init__(self, window=1000):
+        self._samples = defaultdict(lambda: deque(maxlen=window))
+        self._counts = defaultdict(int)
+        self._errors = defaultdict(int)
+        self._lock = threading.Lock()
+
+    def record(self, endpoint, seconds, error=False):
+        with self._lock:
+            self._samples[endpoint].append(seconds * 1000)
+            self._counts[endpoint] += 1
+            if error:
+                self._errors[endpoint] += 1
+            count = self._counts[endpoint]
+        if count % LATENCY_LOG_EVERY == 0:
+            logger.info(f"AI engine latency {endpoint}: {self.snapshot()[endpoint]}")
+
+    def snapshot(self):
+        with self._lock:
+            stats = {}
+            for endpoint, samples in self._samples.items():
+                ordered = sorted(samples)
+                stats[endpoint] = {
+                    "count": self._counts[endpoint],
+                    "errors": self._errors[endpoint],
+                    "p50_ms": round(ordered[len(ordered) // 2], 1),
+                    "p95_ms": round(ordered[int(len(ordered) * 0.95) - 1 if len(ordered) > 1 else 0], 1),
+                    "max_ms": round(ordered[-1], 1),
+                }
+            return stats
+
+
+class EngineHTTP:
+    """
+    Pooled keep-alive HTTP session to the AI engine
+
+    Retries 429 and 5xx responses of idempotent requests with jittered
+    exponential backoff and guards every call with a circuit breaker. POSTs
+    are only retried when the connection failed before sending: a retried
+    /validate would start a second crew run.
+    """
+
+    def __init__(self, base_url):
+        self.base = base_url.rstrip('/')
+        retry = Retry(
+            total=settings.AGENT_HTTP_RETRIES,
+            backoff_factor=0.5,
+            backoff_jitter=0.5,
+            status_forcelist=(429, 500, 502, 503, 504),
+            allowed_methods=Retry.DEFAULT_ALLOWED_METHODS,
+            respect_retry_after_header=True,
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(
+            pool_connections=1,
+            pool_maxsize=settings.AGENT_HTTP_POOL_SIZE,
+            max_retries=retry,
+        )
+        self.session = requests.Session()
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.breaker = CircuitBreaker(
+            failure_threshold=settings.AGENT_CIRCUIT_FAILURE_THRESHOLD,
+            reset_timeout=settings.AGENT_CIRCUIT_RESET_SECONDS,
+        )
+        self.latency = LatencyStats()
+
+    def request(self, method, path, endpoint=None, **kwargs):
+        """
+        Call the engine; `endpoint` is the path template used for metrics
+
+        Raises EngineUnavailable while the circuit is open and
+        requests.HTTPError for error responses left after retries.
+        """
+        endpoint = endpoint or path
+        if not self.breaker.allow():
+            raise EngineUnavailable(self.breaker.retry_after)
+
+        started = time.monotonic()
+        try:
+            response = self.session.request(method, f"{self.base}{path}", **kwargs)
+        except requests.RequestException:
+            self.latency.record(endpoint, time.monotonic() - started, error=True)
+            self.breaker.record_failure()
+            raise
+
+        unhealthy = response.status_code == 429 or response.status_code >= 500
+        self.latency.record(endpoint, time.monotonic() - started, error=response.status_code >= 400)
+        if unhealthy:
+            self.breaker.record_failure()
+        else:
+            self.breaker.record_success()
+        response.raise_for_status()
+        return response
+
+    def get(self, path, **kwargs):
+        return self.request('GET', path, **kwargs)
+
+    def post(self, path, **kwargs):
+        return self.request('POST', path, **kwargs)
+
+
+_engine_http = None
+_engine_http_pid = None
+_engine_http_lock = threading.Lock()
+
+
+def get_engine_http(base_url):
+    """Process-wide EngineHTTP, recreated after fork (one per Celery worker process)"""
+    global _engine_http, _engine_http_pid
+    with _engine_http_lock:
+        if _engine_http is None or _engine_http_pid != os.getpid() or _engine_http.base != base_url.rstrip('/'):
+            _engine_http = EngineHTTP(base_url)
+            _engine_http_pid = os.getpid()
+        return _engine_http
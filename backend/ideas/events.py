@@ -0,0 +1,40 @@
+import json
+import logging
+
+import redis
+import redis.asyncio as aioredis
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+_redis = None
+
+
+def session_channel(session_id):
+    """Redis pub/sub channel carrying new messages of a session"""
+    return f"session:{session_id}:messages"
+
+
+def get_redis():
+    global _redis
+    if _redis is None:
+        _redis = redis.Redis.from_url(settings.REDIS_URL)
+    return _redis
+
+
+def get_async_redis():
+    """New asyncio client; each stream owns its connection"""
+    return aioredis.Redis.from_url(settings.REDIS_URL)
+
+
+def publish_messages(messages):
+    """Push saved messages to their sessions' channels (best effort)"""
+    from .serializers import MessageSerializer
+
+    try:
+        pipe = get_redis().pipeline(transaction=False)
+        for message in messages:
+            pipe.publish(session_channel(message.session_id), json.dumps(MessageSerializer(message).data))
+        pipe.execute()
+    except redis.RedisError as e:
+        logger.warning(f"Failed to publish {len(messages)} message(s): {e}")
@@ -0,0 +1,163 @@
+import codecs
+import csv
+import json
+import logging
+from itertools import islice
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Q
+from rest_framework.exceptions import ValidationError
+
+from .caching import invalidate_sessions
+from .models import Idea, ImportJob, Session
+from .serializers import IdeaSerializer
+from .usage import ideas_remaining, lock_usage, record_idea
+
+logger = logging.getLogger(__name__)
+
+FORMAT_CSV = 'csv'
+FORMAT_JSONL = 'jsonl'
+CONTENT_TYPE_FORMATS = {
+    'text/csv': FORMAT_CSV,
+    'application/csv': FORMAT_CSV,
+    'application/jsonl': FORMAT_JSONL,
+    'application/x-jsonlines': FORMAT_JSONL,
+    'application/x-ndjson': FORMAT_JSONL,
+}
+FILE_EXTENSION_FORMATS = {'.csv': FORMAT_CSV, '.jsonl': FORMAT_JSONL, '.ndjson': FORMAT_JSONL}
+# Rejected rows kept on the job for the client to show
+MAX_STORED_ERRORS = 100
+QUOTA_ERROR = 'Free quota exhausted. Buy a subscription to import more ideas.'
+
+
+def detect_format(content_type, filename=''):
+    """Import format from a content type or file name, or None"""
+    fmt = CONTENT_TYPE_FORMATS.get((content_type or '').split(';')[0].strip().lower())
+    if fmt is None and '.' in filename:
+        fmt = FILE_EXTENSION_FORMATS.get(filename[filename.rindex('.'):].lower())
+    return fmt
+
+
+def read_rows(lines, fmt):
+    """
+    Parse import rows lazily from an iterable of byte lines
+
+    Yields (line number, row dict, error); CSV needs a header row naming
+    `title` and `description`, other columns go to the idea's metadata.
+    """
+    text = codecs.iterdecode(lines, 'utf-8-sig')
+    if fmt == FORMAT_CSV:
+        reader = csv.DictReader(text)
+        for row in reader:
+            extra = {key: value for key, value in row.items() if key not in ('title', 'description') and key}
+            yield reader.line_num, {
+                'title': row.get('title') or '',
+                'description': row.get('description') or '',
+                'metadata': extra,
+            }, None
+        return
+
+    for line_num, line in enumerate(text, start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError as e:
+            yield line_num, None, {'non_field_errors': [f'Invalid JSON: {e}']}
+            continue
+        if not isinstance(row, dict):
+            yield line_num, None, {'non_field_errors': ['Expected a JSON object.']}
+            continue
+        yield line_num, row, None
+
+
+def import_ideas(user, lines, fmt):
+    """
+    Validate rows and create ideas chunk by chunk
+
+    Uploads over BULK_IMPORT_MAX_ROWS rows, or that aren't UTF-8 or valid
+    CSV, are rejected with a ValidationError before any idea is created.
+    Each chunk of valid rows is stored with two bulk inserts (ideas, then
+    their sessions) in one transaction that also checks the quota, and,
+    once committed, dispatched to the engine as a single start_sessions_task.
+
+    Runs within the request: it only parses, validates and inserts (the
+    engine is called from the task), which BULK_IMPORT_MAX_ROWS keeps to
+    about a second, well inside the web server's request timeout. Raise the
+    limit only together with that timeout.
+    """
+    max_rows = settings.BULK_IMPORT_MAX_ROWS
+    try:
+        # One row past the limit tells an oversized upload from a full one
+        rows = list(islice(read_rows(lines, fmt), max_rows + 1))
+    except UnicodeDecodeError:
+        raise ValidationError({'file': 'The file must be UTF-8 encoded.'})
+    except csv.Error as e:
+        raise ValidationError({'file': f'Malformed CSV: {e}'})
+    if len(rows) > max_rows:
+        raise ValidationError({'file': f'At most {max_rows} rows per import; split the file.'})
+
+    job = ImportJob.objects.create(owner=user, format=fmt)
+    chunk = []
+
+    for line_num, row, errors in rows:
+        job.rows_total += 1
+        if errors is None:
+            serializer = IdeaSerializer(data=row)
+            if serializer.is_valid():
+                chunk.append((line_num, serializer.validated_data))
+            else:
+                _reject(job, line_num, serializer.errors)
+        else:
+            _reject(job, line_num, errors)
+        if len(chunk) >= settings.BULK_IMPORT_CHUNK_SIZE:
+            _create_chunk(job, user, chunk)
+            chunk = []
+    if chunk:
+        _create_chunk(job, user, chunk)
+
+    job.save(update_fields=['rows_total', 'ideas_created', 'rows_rejected', 'errors'])
+    logger.info(f"Import job {job.pk}: {job.ideas_created} ideas created, {job.rows_rejected} rows rejected")
+    return job
+
+
+def job_progress(job):
+    """Aggregate state of the job's sessions, in one query"""
+    return Session.objects.filter(idea__import_job=job).aggregate(
+        total=Count('id'),
+        started=Count('id', filter=Q(agent_run_id__isnull=False)),
+        finished=Count('id', filter=Q(finished=True)),
+        failed=Count('id', filter=Q(failed=True)),
+    )
+
+
+def _reject(job, line_num, errors):
+    job.rows_rejected += 1
+    if len(job.errors) < MAX_STORED_ERRORS:
+        job.errors.append({'line': line_num, 'errors': errors})
+
+
+def _create_chunk(job, user, rows):
+    """Create ideas and sessions for (line number, idea data) rows within the user's quota"""
+    from .tasks import start_sessions_task
+
+    with transaction.atomic():
+        # Other imports of the user wait here and other metering of the
+        # user until commit, so the quota check below can't be outraced
+        lock_usage(user.pk)
+        remaining = ideas_remaining(user)
+        if remaining is not None:
+            for line_num, _ in rows[remaining:]:
+                _reject(job, line_num, {'non_field_errors': [QUOTA_ERROR]})
+            rows = rows[:remaining]
+        if not rows:
+            return
+        ideas = Idea.objects.bulk_create([Idea(owner=user, import_job=job, **row) for _, row in rows])
+        sessions = Session.objects.bulk_create([Session(idea=idea) for idea in ideas])
+        record_idea(user.pk, len(ideas))
+        session_ids = [session.pk for session in sessions]
+        # Bulk inserts skip post_save, so bump cache versions here
+        transaction.on_commit(lambda: invalidate_sessions(session_ids))
+        transaction.on_commit(lambda: start_sessions_task.delay(session_ids))
+    job.ideas_created += len(ideas)
@@ -0,0 +1,75 @@
+import time
+import uuid
+
+from django.core.management.base import BaseCommand, CommandError
+
+from ideas.events import get_redis
+from ideas.tasks import bench_io_task
+from project.celery import app
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure task throughput of the workers consuming a queue. Enqueues no-op "
+        "tasks that sleep like an AI engine call and reports tasks/s overall and "
+        "per worker. Needs running workers and Redis."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tasks', type=int, default=500, help='Tasks to enqueue')
+        parser.add_argument('--latency', type=float, default=0.2,
+                            help='Seconds each task waits, simulating engine I/O')
+        parser.add_argument('--queue', default='agents')
+        parser.add_argument('--timeout', type=float, default=300)
+        parser.add_argument('--min-rate', type=float, default=0,
+                            help='Fail if tasks/s per worker is below this')
+
+    def handle(self, *args, **options):
+        queue = options['queue']
+        workers = self.queue_workers(queue)
+        if not workers:
+            raise CommandError(f"No workers consume the '{queue}' queue")
+        for name, concurrency in workers.items():
+            self.stdout.write(f"worker {name}: concurrency {concurrency}")
+
+        redis = get_redis()
+        counter_key = f"bench:{uuid.uuid4()}"
+        redis.set(counter_key, 0, ex=int(options['timeout']) + 60)
+
+        total = options['tasks']
+        started = time.monotonic()
+        for _ in range(total):
+            bench_io_task.apply_async((counter_key, options['latency']), queue=queue)
+        enqueued = time.monotonic() - started
+
+        done = 0
+        while done < total:
+            if time.monotonic() - started > options['timeout']:
+                raise CommandError(f"Timed out with {done}/{total} tasks done")
+            time.sleep(0.1)
+            done = int(redis.get(counter_key) or 0)
+        elapsed = time.monotonic() - started
+        redis.delete(counter_key)
+
+        rate = total / elapsed
+        per_worker = rate / len(workers)
+        # Throughput if every pool slot only ever slept
+        ideal = sum(workers.values()) / options['latency'] if options['latency'] else float('inf')
+        self.stdout.write(
+            f"{total} tasks in {elapsed:.1f}s (enqueue {enqueued:.1f}s): "
+            f"{rate:.1f} tasks/s, {per_worker:.1f} tasks/s per worker, "
+            f"{rate / ideal:.0%} of the pool's I/O bound"
+        )
+        if per_worker < options['min_rate']:
+            raise CommandError(f"{per_worker:.1f} tasks/s per worker is below {options['min_rate']}")
+
+    def queue_workers(self, queue):
+        """{worker name: pool concurrency} of workers consuming `queue`"""
+        inspect = app.control.inspect(timeout=2)
+        active_queues = inspect.active_queues() or {}
+        stats = inspect.stats() or {}
+        return {
+            name: stats.get(name, {}).get('pool', {}).get('max-concurrency', 1)
+            for name, queues in active_queues.items()
+            if any(q['name'] == queue for q in queues)
+        }
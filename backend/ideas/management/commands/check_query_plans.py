@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Min
+
+from ideas.models import Idea, Session
+from ideas.query_plans import hot_query_checks, index_used
+
+
+class Command(BaseCommand):
+    help = (
+        "EXPLAIN the ideas app hot queries and fail if they don't use their indexes. "
+        "Run against a database with realistic volume; planners skip indexes on tiny tables."
+    )
+
+    def handle(self, *args, **options):
+        owner_id = Idea.objects.aggregate(owner=Min('owner_id'))['owner'] or 0
+        session_id = Session.objects.aggregate(id=Min('id'))['id'] or 0
+
+        failures = []
+        for label, queryset, indexes in hot_query_checks(owner_id, session_id):
+            plan = queryset.explain()
+            used = index_used(plan, indexes)
+            if used:
+                self.stdout.write(f"ok    {label}: {used}")
+            else:
+                failures.append(label)
+                self.stdout.write(f"FAIL  {label}:\n{plan}")
+
+        if failures:
+            raise CommandError(f"Queries not using their indexes: {', '.join(failures)}")
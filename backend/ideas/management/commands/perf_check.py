@@ -0,0 +1,122 @@
+import hashlib
+import hmac
+import json
+import time
+import uuid
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Count
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+
+from ideas.models import Idea, Message, Session
+
+# Most queries each request may run. Includes authentication (session and
+# user lookups), so list endpoints must stay flat however many rows they return.
+QUERY_BUDGETS = {
+    'ideas list': 3,
+    'idea detail': 3,
+    'sessions list': 3,
+    'session detail': 4,
+    'session messages': 4,
+    'new messages since': 4,
+    'agent callback': 4,
+    'agent callback batch': 6,
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Run the API hot paths against the current database, enforce per-endpoint "
+        "query budgets (N+1 regressions fail) and report latency percentiles. "
+        "Seed realistic volume first with seed_perf_data; never run against production."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=50)
+        parser.add_argument('--user', help='Username to test as (default: the user with most ideas)')
+        parser.add_argument('--max-p95-ms', type=float, default=0,
+                            help='Also fail if any endpoint p95 exceeds this')
+
+    def handle(self, *args, **options):
+        user = self.pick_user(options['user'])
+        session = Session.objects.filter(idea__owner=user).order_by('-pk').first()
+        if session is None:
+            raise CommandError(f"User {user} has no sessions; seed data with seed_perf_data")
+        since = Message.objects.filter(session=session).order_by('id').values_list('id', flat=True).first() or 0
+        self.stdout.write(f"Testing as {user} ({Idea.objects.filter(owner=user).count()} ideas), session {session.pk}")
+
+        client = Client()
+        client.force_login(user)
+        endpoints = {
+            'ideas list': lambda: client.get('/api/ideas/'),
+            'idea detail': lambda: client.get(f'/api/ideas/{session.idea_id}/'),
+            'sessions list': lambda: client.get('/api/sessions/'),
+            'session detail': lambda: client.get(f'/api/sessions/{session.pk}/'),
+            'session messages': lambda: client.get(f'/api/messages/?session={session.pk}'),
+            'new messages since': lambda: client.get(f'/api/messages/?session={session.pk}&since={since}'),
+            'agent callback': lambda: self.signed_post('/api/agents/callback/', self.event(session)),
+            'agent callback batch': lambda: self.signed_post(
+                '/api/agents/callback/batch/', [self.event(session) for _ in range(20)]
+            ),
+        }
+
+        failures = []
+        # Measure the database path, not the API response cache
+        with override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}}):
+            for name, call in endpoints.items():
+                timings, queries = [], 0
+                for _ in range(options['iterations']):
+                    with CaptureQueriesContext(connection) as captured:
+                        started = time.perf_counter()
+                        response = call()
+                        timings.append((time.perf_counter() - started) * 1000)
+                    if response.status_code >= 400:
+                        raise CommandError(f"{name}: HTTP {response.status_code} {response.content[:200]!r}")
+                    queries = max(queries, len(captured))
+
+                timings.sort()
+                p50, p95, p99 = (timings[min(len(timings) - 1, int(len(timings) * q))] for q in (0.5, 0.95, 0.99))
+                budget = QUERY_BUDGETS[name]
+                line = f"{name:<22} queries {queries:>2}/{budget:<2}  p50 {p50:7.1f}ms  p95 {p95:7.1f}ms  p99 {p99:7.1f}ms"
+                if queries > budget:
+                    failures.append(f"{name}: {queries} queries, budget {budget}")
+                    self.stdout.write(self.style.ERROR(line))
+                elif options['max_p95_ms'] and p95 > options['max_p95_ms']:
+                    failures.append(f"{name}: p95 {p95:.1f}ms over {options['max_p95_ms']}ms")
+                    self.stdout.write(self.style.ERROR(line))
+                else:
+                    self.stdout.write(line)
+
+        if failures:
+            raise CommandError("Performance budgets exceeded:\n" + "\n".join(failures))
+        self.stdout.write(self.style.SUCCESS("All endpoints within budget"))
+
+    def pick_user(self, username):
+        User = get_user_model()
+        if username:
+            try:
+                return User.objects.get(username=username)
+            except User.DoesNotExist:
+                raise CommandError(f"No user {username}")
+        top = Idea.objects.values('owner').annotate(ideas=Count('id')).order_by('-ideas').first()
+        if top is None:
+            raise CommandError("No ideas in the database; seed data with seed_perf_data")
+        return User.objects.get(pk=top['owner'])
+
+    def event(self, session):
+        return {
+            'event_id': f"perf-{uuid.uuid4()}",
+            'session_id': session.pk,
+            'type': 'message',
+            'content': 'perf_check event',
+            'metadata': {'type': 'perf_check'},
+        }
+
+    def signed_post(self, path, payload):
+        body = json.dumps(payload).encode('utf-8')
+        signature = hmac.new(settings.AGENT_CALLBACK_SECRET.encode('utf-8'), body, hashlib.sha256).hexdigest()
+        return Client().post(path, body, content_type='application/json', HTTP_X_AGENT_SIGNATURE=signature)
@@ -0,0 +1,110 @@
+import random
+import time
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from ideas.models import Idea, Message, Session
+from ideas.reports import store_report
+
+USERNAME_PREFIX = 'perf-user-'
+SAMPLE_REPORT = """## Market
+Demand is **growing** in the target segment.
+
+| Segment | Size |
+|---|---|
+| SMB | 120k |
+
+## Risks
+- Competition from incumbents
+- Customer acquisition cost
+"""
+SENDERS = [Message.SENDER_AGENT] * 6 + [Message.SENDER_USER] * 3 + [Message.SENDER_SYSTEM]
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed synthetic users, ideas, sessions and messages at production-like volume "
+        "for perf_check and check_query_plans. Never run against production."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=10_000)
+        parser.add_argument('--ideas', type=int, default=100_000, help='Ideas (one session each), spread over users')
+        parser.add_argument('--messages-per-session', type=int, default=20)
+        parser.add_argument('--finished-ratio', type=float, default=0.8,
+                            help='Share of sessions that finished with a report')
+        parser.add_argument('--batch-size', type=int, default=2000)
+        parser.add_argument('--reset', action='store_true', help='Delete previously seeded data first')
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        User = get_user_model()
+        random.seed(options['seed'])
+        batch_size = options['batch_size']
+
+        if options['reset']:
+            deleted, _ = User.objects.filter(username__startswith=USERNAME_PREFIX).delete()
+            self.stdout.write(f"Deleted {deleted} seeded rows")
+        if User.objects.filter(username__startswith=USERNAME_PREFIX).exists():
+            raise CommandError("Seeded data already exists; pass --reset to recreate it")
+
+        started = time.monotonic()
+        password = make_password(None)
+        user_ids = []
+        for offset in range(0, options['users'], batch_size):
+            users = User.objects.bulk_create([
+                User(username=f"{USERNAME_PREFIX}{n}", email=f"{USERNAME_PREFIX}{n}@example.com", password=password)
+                for n in range(offset, min(offset + batch_size, options['users']))
+            ])
+            user_ids.extend(user.pk for user in users)
+        self.stdout.write(f"{len(user_ids)} users")
+
+        # Rendered once; every finished session shares the same report
+        template = Session()
+        store_report(template, markdown_text=SAMPLE_REPORT)
+
+        messages_total = 0
+        for offset in range(0, options['ideas'], batch_size):
+            count = min(batch_size, options['ideas'] - offset)
+            with transaction.atomic():
+                ideas = Idea.objects.bulk_create([
+                    Idea(
+                        owner_id=random.choice(user_ids),
+                        title=f"Idea {offset + n}",
+                        description=f"Synthetic business idea number {offset + n} for load testing",
+                        metadata={'source': 'seed_perf_data'},
+                    )
+                    for n in range(count)
+                ])
+                sessions = Session.objects.bulk_create([
+                    self.build_session(idea, template, options['finished_ratio']) for idea in ideas
+                ])
+                messages = [
+                    Message(
+                        session=session,
+                        sender=random.choice(SENDERS),
+                        content=f"Message {n} of session {session.pk}",
+                        metadata={'type': 'seed'},
+                    )
+                    for session in sessions
+                    for n in range(options['messages_per_session'])
+                ]
+                Message.objects.bulk_create(messages, batch_size=batch_size * 5)
+            messages_total += len(messages)
+            self.stdout.write(f"{offset + count} ideas, {messages_total} messages ({time.monotonic() - started:.0f}s)")
+
+        self.stdout.write(self.style.SUCCESS(f"Seeded in {time.monotonic() - started:.0f}s"))
+
+    def build_session(self, idea, template, finished_ratio):
+        session = Session(idea=idea, agent_run_id=f"seed-{idea.pk}")
+        if random.random() < finished_ratio:
+            session.finished = True
+            session.finished_at = timezone.now() - timedelta(days=random.uniform(0, 180))
+            for field in ('report', 'report_blob', 'report_hash', 'report_outline'):
+                setattr(session, field, getattr(template, field))
+        return session
@@ -0,0 +1,123 @@
+import asyncio
+import logging
+import time
+from collections import defaultdict
+from datetime import timedelta
+
+import httpx
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from ideas.agent_client import AgentClient, wants_quick_report
+from ideas.caching import invalidate_sessions
+from ideas.events import publish_messages
+from ideas.models import Message, Session
+from ideas.usage import record_execution
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = "Follow all in-flight AI validation sessions from a single asyncio event loop"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--interval', type=float, default=settings.AGENT_POLL_INTERVAL_SECONDS,
+                            help="Seconds between checks of each session")
+        parser.add_argument('--concurrency', type=int, default=50,
+                            help="Maximum concurrent requests to the AI engine")
+        parser.add_argument('--once', action='store_true', help="Run a single tick and exit")
+
+    def handle(self, *args, **options):
+        asyncio.run(self.run(options['interval'], options['concurrency'], options['once']))
+
+    async def run(self, interval, concurrency, once):
+        agent_client = AgentClient()
+        limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async with httpx.AsyncClient(base_url=agent_client.base, timeout=10, limits=limits) as http:
+            while True:
+                tick_started = time.monotonic()
+                sessions = await sync_to_async(self.load_sessions)()
+                statuses = await asyncio.gather(
+                    *(self.fetch_status(http, semaphore, session) for session in sessions)
+                )
+                updated = await sync_to_async(self.write_updates)(agent_client, sessions, statuses)
+
+                # Lag: how far behind schedule the next check of each session will be
+                duration = time.monotonic() - tick_started
+                lag = max(0.0, duration - interval)
+                logger.info(
+                    f"tracker tick sessions={len(sessions)} updated={updated} "
+                    f"duration={duration:.2f}s lag={lag:.2f}s",
+                    extra={"tracker_sessions": len(sessions), "tracker_lag_seconds": lag}
+                )
+                if once:
+                    return
+                await asyncio.sleep(max(0.0, interval - duration))
+
+    def load_sessions(self):
+        return list(
+            Session.objects
+            .filter(finished=False, failed=False, agent_run_id__isnull=False)
+            .exclude(agent_run_id='')
+            .only('id', 'idea', 'agent_run_id', 'started_at', 'finished', 'failed', 'progress')
+        )
+
+    async def fetch_status(self, http, semaphore, session):
+        """Return (status, result, quick) for a session, or None if the engine can't be reached"""
+        async with semaphore:
+            try:
+                response = await http.get(f"/api/v1/status/{session.agent_run_id}")
+                response.raise_for_status()
+                status_data = response.json()
+                result_data = None
+                if status_data['status'] == 'completed':
+                    response = await http.get(f"/api/v1/result/{session.agent_run_id}")
+                    response.raise_for_status()
+                    result_data = response.json()
+                quick_data = None
+                if wants_quick_report(session, status_data):
+                    response = await http.get(f"/api/v1/result/{session.agent_run_id}/quick")
+                    response.raise_for_status()
+                    quick_data = response.json()
+                return status_data, result_data, quick_data
+            except httpx.HTTPError as e:
+                logger.warning(f"Failed to check session {session.id}: {e}")
+                return None
+
+    def write_updates(self, agent_client, sessions, statuses):
+        """Apply fetched statuses and persist them in one batch"""
+        deadline = timezone.now() - timedelta(seconds=settings.AGENT_TRACKING_TIMEOUT_SECONDS)
+        messages, completed = [], []
+        # Sessions grouped by the set of fields that changed, one bulk_update each
+        changed = defaultdict(list)
+
+        for session, fetched in zip(sessions, statuses):
+            update_fields = []
+            if fetched is not None:
+                new_messages, update_fields = agent_client.apply_status(session, *fetched)
+                messages.extend(new_messages)
+                if fetched[1] is not None:
+                    completed.append((session, fetched[1].get('metrics')))
+            if not (session.finished or session.failed) and session.started_at <= deadline:
+                messages.append(agent_client.timeout_session(session))
+                update_fields = sorted(set(update_fields) | {'failed', 'finished_at'})
+            if update_fields:
+                changed[tuple(update_fields)].append(session)
+
+        with transaction.atomic():
+            Message.objects.bulk_create(messages)
+            transaction.on_commit(lambda: publish_messages(messages))
+            for fields, group in changed.items():
+                Session.objects.bulk_update(group, list(fields))
+            for session, metrics in completed:
+                record_execution(session, metrics)
+            # Bulk writes skip post_save, so bump cache versions here
+            touched = {m.session_id for m in messages}
+            touched.update(session.pk for group in changed.values() for session in group)
+            transaction.on_commit(lambda: invalidate_sessions(touched))
+        return sum(len(group) for group in changed.values())
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.18 on 2026-10-18 22:35
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ideas', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='session',
+            name='agent_run_id',
+            field=models.CharField(blank=True, db_index=True, max_length=255, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='idea',
+            index=models.Index(fields=['owner', 'created_at'], name='idea_owner_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='message',
+            index=models.Index(fields=['session', 'created_at', 'id'], name='message_session_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='session',
+            index=models.Index(condition=models.Q(('failed', False), ('finished', False)), fields=['started_at'], name='session_in_flight_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 22:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ideas', '0002_hot_query_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='message',
+            name='event_id',
+            field=models.CharField(blank=True, max_length=100, null=True, unique=True),
+        ),
+    ]
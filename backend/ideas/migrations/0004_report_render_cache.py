@@ -0,0 +1,110 @@
+# Generated by Django 5.2.18 on 2026-10-18 22:41
+
+import hashlib
+import json
+import re
+import zlib
+
+import markdown
+import nh3
+from django.db import migrations, models
+from django.utils.text import slugify
+
+# Rendering as of this migration, frozen here so later changes to
+# ideas.reports don't change what it does
+SECTION_HEADING = re.compile(r'^(#{1,2})\s+(.+?)\s*#*\s*$')
+CODE_FENCE = re.compile(r'^\s*(```|~~~)')
+MARKDOWN_EXTENSIONS = ['tables', 'fenced_code', 'sane_lists']
+DEFAULT_SECTION_TITLE = 'AI Validation Report'
+REPORT_TAGS = {
+    'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'p', 'br', 'hr', 'blockquote',
+    'ul', 'ol', 'li', 'strong', 'em', 'b', 'i', 'code', 'pre', 'a',
+    'table', 'thead', 'tbody', 'tr', 'th', 'td',
+}
+REPORT_ATTRIBUTES = {
+    'a': {'href', 'title'},
+    'ol': {'start'},
+    'th': {'align', 'style'},
+    'td': {'align', 'style'},
+}
+
+
+def render_sections(markdown_text):
+    parts, current, in_code = [], None, False
+    for line in markdown_text.splitlines():
+        if CODE_FENCE.match(line):
+            in_code = not in_code
+        heading = None if in_code else SECTION_HEADING.match(line)
+        if heading:
+            current = {'title': heading.group(2), 'level': len(heading.group(1)), 'lines': []}
+            parts.append(current)
+            continue
+        if current is None:
+            current = {'title': DEFAULT_SECTION_TITLE, 'level': 1, 'lines': []}
+            parts.append(current)
+        current['lines'].append(line)
+
+    sections, anchors = [], set()
+    for part in parts:
+        body = '\n'.join(part['lines']).strip()
+        if not body and part['title'] == DEFAULT_SECTION_TITLE:
+            continue
+        base = slugify(part['title'], allow_unicode=True) or 'section'
+        anchor, n = base, 2
+        while anchor in anchors:
+            anchor, n = f"{base}-{n}", n + 1
+        anchors.add(anchor)
+        html = markdown.markdown(body, extensions=MARKDOWN_EXTENSIONS)
+        sections.append({
+            'title': part['title'],
+            'anchor': anchor,
+            'level': part['level'],
+            'html': nh3.clean(
+                html, tags=REPORT_TAGS, attributes=REPORT_ATTRIBUTES,
+                filter_style_properties={'text-align'},
+            ),
+        })
+    return sections
+
+
+def render_existing_reports(apps, schema_editor):
+    """Render stored reports once; markdown passes older HTML reports through"""
+    Session = apps.get_model('ideas', 'Session')
+    for session in Session.objects.exclude(report='').iterator():
+        sections = render_sections(session.report)
+        session.report_blob = zlib.compress(json.dumps(sections, ensure_ascii=False).encode('utf-8'), 6)
+        session.report_hash = hashlib.sha256(session.report_blob).hexdigest()
+        session.report_outline = [
+            {key: section[key] for key in ('title', 'anchor', 'level')} for section in sections
+        ]
+        session.save(update_fields=['report_blob', 'report_hash', 'report_outline'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ideas', '0003_message_event_id'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='session',
+            name='report_blob',
+            field=models.BinaryField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='session',
+            name='report_hash',
+            field=models.CharField(blank=True, max_length=64),
+        ),
+        migrations.AddField(
+            model_name='session',
+            name='report_outline',
+            field=models.JSONField(blank=True, default=list),
+        ),
+        migrations.RunPython(render_existing_reports, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name='session',
+            name='report_sections',
+        ),
+    ]
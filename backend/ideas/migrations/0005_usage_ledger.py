@@ -0,0 +1,69 @@
+# Generated by Django 5.2.18 on 2026-10-18 22:46
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count
+from django.db.models.functions import TruncDate
+
+
+def backfill_idea_usage(apps, schema_editor):
+    """Count existing ideas into the daily totals so quotas carry over"""
+    Idea = apps.get_model('ideas', 'Idea')
+    UsageDaily = apps.get_model('ideas', 'UsageDaily')
+    rows = (
+        Idea.objects.annotate(day=TruncDate('created_at'))
+        .values('owner_id', 'day')
+        .annotate(ideas=Count('id'))
+    )
+    UsageDaily.objects.bulk_create(
+        [UsageDaily(user_id=row['owner_id'], day=row['day'], ideas=row['ideas']) for row in rows],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ideas', '0004_report_render_cache'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UsageDaily',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('ideas', models.PositiveIntegerField(default=0)),
+                ('executions', models.PositiveIntegerField(default=0)),
+                ('total_tokens', models.PositiveBigIntegerField(default=0)),
+                ('cached_prompt_tokens', models.PositiveBigIntegerField(default=0)),
+                ('llm_calls', models.PositiveIntegerField(default=0)),
+                ('duration_seconds', models.PositiveBigIntegerField(default=0)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='usage_daily', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('user', 'day'), name='usage_daily_user_day_uniq')],
+            },
+        ),
+        migrations.CreateModel(
+            name='UsageEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('idea', 'Idea'), ('execution', 'Execution')], max_length=20)),
+                ('execution_id', models.CharField(blank=True, max_length=255, null=True, unique=True)),
+                ('total_tokens', models.PositiveIntegerField(default=0)),
+                ('cached_prompt_tokens', models.PositiveIntegerField(default=0)),
+                ('llm_calls', models.PositiveIntegerField(default=0)),
+                ('duration_seconds', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('session', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='usage_events', to='ideas.session')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='usage_events', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['user', 'created_at'], name='usage_user_created_idx')],
+            },
+        ),
+        migrations.RunPython(backfill_idea_usage, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,65 @@
+# Generated by Django 5.2.18 on 2026-10-18 22:51
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import F, Max, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_finished_at(apps, schema_editor):
+    """Ended sessions: finished_at from their last message, else their start"""
+    Session = apps.get_model('ideas', 'Session')
+    Message = apps.get_model('ideas', 'Message')
+    last_message = (
+        Message.objects.filter(session=OuterRef('pk'))
+        .values('session').annotate(last=Max('created_at')).values('last')
+    )
+    Session.objects.filter(Q(finished=True) | Q(failed=True)).update(
+        finished_at=Coalesce(Subquery(last_message), F('started_at'))
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ideas', '0006_import_jobs'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SessionArchive',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('messages_blob', models.BinaryField()),
+                ('report_blob', models.BinaryField(blank=True, null=True)),
+                ('message_count', models.PositiveIntegerField(default=0)),
+                ('last_message_id', models.BigIntegerField(blank=True, null=True)),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='session',
+            name='archived',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name='session',
+            name='finished_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='session',
+            name='rehydrated_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='session',
+            index=models.Index(condition=models.Q(('archived', False), ('finished_at__isnull', False)), fields=['finished_at'], name='session_archivable_idx'),
+        ),
+        migrations.AddField(
+            model_name='sessionarchive',
+            name='session',
+            field=models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='archive', to='ideas.session'),
+        ),
+        migrations.RunPython(backfill_finished_at, migrations.RunPython.noop),
+    ]
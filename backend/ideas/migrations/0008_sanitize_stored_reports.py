@@ -0,0 +1,49 @@
+import hashlib
+import json
+import zlib
+
+import nh3
+from django.db import migrations
+
+# Allowlist as of this migration (ideas.reports.REPORT_TAGS/REPORT_ATTRIBUTES)
+REPORT_TAGS = {
+    'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'p', 'br', 'hr', 'blockquote',
+    'ul', 'ol', 'li', 'strong', 'em', 'b', 'i', 'code', 'pre', 'a',
+    'table', 'thead', 'tbody', 'tr', 'th', 'td',
+}
+REPORT_ATTRIBUTES = {
+    'a': {'href', 'title'},
+    'ol': {'start'},
+    'th': {'align', 'style'},
+    'td': {'align', 'style'},
+}
+
+
+def sanitize_stored_reports(apps, schema_editor):
+    """Strip scripts and other unsafe markup from reports rendered before sanitizing"""
+    Session = apps.get_model('ideas', 'Session')
+    sessions = Session.objects.exclude(report_blob=None).only('id', 'report_blob', 'report_hash')
+    for session in sessions.iterator():
+        sections = json.loads(zlib.decompress(bytes(session.report_blob)).decode('utf-8'))
+        for section in sections:
+            section['html'] = nh3.clean(
+                section.get('html', ''), tags=REPORT_TAGS, attributes=REPORT_ATTRIBUTES,
+                filter_style_properties={'text-align'},
+            )
+        blob = zlib.compress(json.dumps(sections, ensure_ascii=False).encode('utf-8'), 6)
+        report_hash = hashlib.sha256(blob).hexdigest()
+        if report_hash != session.report_hash:
+            session.report_blob = blob
+            session.report_hash = report_hash
+            session.save(update_fields=['report_blob', 'report_hash'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ideas', '0007_session_archive'),
+    ]
+
+    operations = [
+        migrations.RunPython(sanitize_stored_reports, migrations.RunPython.noop),
+    ]
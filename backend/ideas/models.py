@@ -14,12 +14,33 @@ class Subscription(models.Model):
     def __str__(self):
         return f"Subscription({self.user}, active={self.active})"
 
+class ImportJob(models.Model):
+    """A bulk idea import; progress is aggregated from its ideas' sessions"""
+    owner = models.ForeignKey(User, on_delete=models.CASCADE, related_name='import_jobs')
+    format = models.CharField(max_length=10)
+    rows_total = models.PositiveIntegerField(default=0)
+    ideas_created = models.PositiveIntegerField(default=0)
+    rows_rejected = models.PositiveIntegerField(default=0)
+    # First rejected rows: [{"line": n, "errors": {...}}]
+    errors = JSONField(default=list, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"ImportJob({self.owner_id}, {self.ideas_created} ideas)"
+
 class Idea(models.Model):
     owner = models.ForeignKey(User, on_delete=models.CASCADE, related_name='ideas')
     title = models.CharField(max_length=255)
     description = models.TextField()
     created_at = models.DateTimeField(auto_now_add=True)
     metadata = JSONField(default=dict, blank=True)
+    import_job = models.ForeignKey(ImportJob, on_delete=models.SET_NULL, null=True, blank=True, related_name='ideas')
+
+    class Meta:
+        indexes = [
+            # Free-quota check and per-owner listings
+            models.Index(fields=['owner', 'created_at'], name='idea_owner_created_idx'),
+        ]
 
     def __str__(self):
         return self.title
@@ -28,13 +49,62 @@ class Session(models.Model):
     idea = models.OneToOneField(Idea, on_delete=models.CASCADE, related_name='session')
     started_at = models.DateTimeField(auto_now_add=True)
     finished = models.BooleanField(default=False)
-    agent_run_id = models.CharField(max_length=255, blank=True, null=True)
+    # Set when the AI validation failed or timed out; tracking stops
+    failed = models.BooleanField(default=False)
+    # When the session finished or failed; drives archival
+    finished_at = models.DateTimeField(null=True, blank=True)
+    # Messages and report source moved to SessionArchive, see ideas.archive
+    archived = models.BooleanField(default=False)
+    rehydrated_at = models.DateTimeField(null=True, blank=True)
+    agent_run_id = models.CharField(max_length=255, blank=True, null=True, db_index=True)
+    # Report source; rendered once into report_blob, see ideas.reports
     report = models.TextField(blank=True)
-    report_sections = JSONField(default=list, blank=True)
+    # Section titles, anchors and levels, without the HTML
+    report_outline = JSONField(default=list, blank=True)
+    # zlib-compressed JSON list of rendered sections
+    report_blob = models.BinaryField(null=True, blank=True)
+    # sha256 of report_blob, used as the report ETag
+    report_hash = models.CharField(max_length=64, blank=True)
+    # Latest engine progress: agents_completed, total_agents, stage, updated_at
+    progress = JSONField(default=dict, blank=True)
+
+    class Meta:
+        indexes = [
+            # Trackers load only the sessions still in flight
+            models.Index(
+                fields=['started_at'],
+                name='session_in_flight_idx',
+                condition=models.Q(finished=False, failed=False),
+            ),
+            # Archival candidates: ended sessions not archived yet
+            models.Index(
+                fields=['finished_at'],
+                name='session_archivable_idx',
+                condition=models.Q(archived=False, finished_at__isnull=False),
+            ),
+        ]
+
+    @property
+    def report_sections(self):
+        from .reports import unpack_sections
+        return unpack_sections(self.report_blob)
 
     def __str__(self):
         return f"Session({self.idea_id})"
 
+class SessionArchive(models.Model):
+    """Cold storage of an ended session's messages and report source, zlib-compressed JSON"""
+    session = models.OneToOneField(Session, on_delete=models.CASCADE, related_name='archive')
+    messages_blob = models.BinaryField()
+    report_blob = models.BinaryField(null=True, blank=True)
+    # Kept uncompressed so session listings don't need to unpack the archive
+    message_count = models.PositiveIntegerField(default=0)
+    last_message_id = models.BigIntegerField(null=True, blank=True)
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"SessionArchive({self.session_id}, {self.message_count} messages)"
+
 class Message(models.Model):
     SENDER_USER = 'user'
     SENDER_AGENT = 'agent'
@@ -49,10 +119,66 @@ class Message(models.Model):
     sender = models.CharField(max_length=20, choices=SENDER_CHOICES)
     content = models.TextField()
     metadata = JSONField(default=dict, blank=True)
+    # Id of the agent callback event this message came from, for deduplication
+    event_id = models.CharField(max_length=100, unique=True, null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
         ordering = ['created_at']
+        indexes = [
+            # Per-session history in (created_at, id) cursor order
+            models.Index(fields=['session', 'created_at', 'id'], name='message_session_created_idx'),
+        ]
+
+    def __str__(self):
+        return f"Message({self.sender}, {self.created_at})"
+
+class UsageEvent(models.Model):
+    """
+    Append-only usage ledger: one row per created idea and per finished
+    engine execution. Never updated; UsageDaily holds the running totals.
+    """
+    KIND_IDEA = 'idea'
+    KIND_EXECUTION = 'execution'
+    KIND_CHOICES = [
+        (KIND_IDEA, 'Idea'),
+        (KIND_EXECUTION, 'Execution'),
+    ]
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='usage_events')
+    session = models.ForeignKey(Session, on_delete=models.SET_NULL, null=True, blank=True, related_name='usage_events')
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    # Engine execution id; unique so a completion is metered once
+    execution_id = models.CharField(max_length=255, unique=True, null=True, blank=True)
+    total_tokens = models.PositiveIntegerField(default=0)
+    cached_prompt_tokens = models.PositiveIntegerField(default=0)
+    llm_calls = models.PositiveIntegerField(default=0)
+    duration_seconds = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', 'created_at'], name='usage_user_created_idx'),
+        ]
+
+    def __str__(self):
+        return f"UsageEvent({self.user_id}, {self.kind}, {self.total_tokens})"
+
+class UsageDaily(models.Model):
+    """Per-user daily totals of UsageEvent, summed over a few rows for quota checks"""
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='usage_daily')
+    day = models.DateField()
+    ideas = models.PositiveIntegerField(default=0)
+    executions = models.PositiveIntegerField(default=0)
+    total_tokens = models.PositiveBigIntegerField(default=0)
+    cached_prompt_tokens = models.PositiveBigIntegerField(default=0)
+    llm_calls = models.PositiveIntegerField(default=0)
+    duration_seconds = models.PositiveBigIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'day'], name='usage_daily_user_day_uniq'),
+        ]
 
     def __str__(self):
-        return f"Message({self.sender}, {self.created_at})"
\ No newline at end of file
+        return f"UsageDaily({self.user_id}, {self.day})"
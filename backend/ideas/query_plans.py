@@ -0,0 +1,60 @@
+"""
+Hot queries of the ideas app and the indexes they must use
+
+Shared by the check_query_plans command (realistic volume) and the test
+suite (EXPLAIN on a small fixture).
+"""
+import re
+from datetime import timedelta
+
+from django.db import connection
+from django.utils import timezone
+
+from .models import Idea, Message, Session
+
+
+def column_indexes(model, column):
+    """Names of the indexes of `model` whose first column is `column` (auto-named ones included)"""
+    table = model._meta.db_table
+    with connection.cursor() as cursor:
+        constraints = connection.introspection.get_constraints(cursor, table)
+    return [
+        name for name, info in constraints.items()
+        if info['index'] and not info['primary_key'] and info['columns'][:1] == [column]
+    ]
+
+
+def hot_query_checks(owner_id, session_id):
+    """(label, queryset, names of the indexes any of which satisfies the check)"""
+    month_ago = timezone.now() - timedelta(days=30)
+    return [
+        ("free quota check",
+         Idea.objects.filter(owner_id=owner_id, created_at__gte=month_ago),
+         ['idea_owner_created_idx']),
+        ("session messages in order",
+         Message.objects.filter(session_id=session_id).order_by('created_at', 'id'),
+         ['message_session_created_idx']),
+        ("messages of an owner",
+         Message.objects.filter(session__idea__owner_id=owner_id),
+         column_indexes(Idea, 'owner_id')),
+        ("session by agent_run_id",
+         Session.objects.filter(agent_run_id='lookup'),
+         column_indexes(Session, 'agent_run_id')),
+        ("sessions in flight",
+         Session.objects.filter(finished=False, failed=False, agent_run_id__isnull=False),
+         ['session_in_flight_idx', *column_indexes(Session, 'agent_run_id')]),
+    ]
+
+
+def index_used(plan, indexes):
+    """
+    The first of `indexes` the plan scans, or None
+
+    Index names only show up in index scan nodes ("Index Scan using",
+    "Bitmap Index Scan on", SQLite's "USING INDEX"), never in filters; they
+    are matched whole so a column name can't pass for one.
+    """
+    for index in indexes:
+        if re.search(rf'(?<!\w){re.escape(index)}(?!\w)', plan.replace('"', '')):
+            return index
+    return None
@@ -0,0 +1,135 @@
+import hashlib
+import json
+import re
+import zlib
+
+import markdown
+import nh3
+from django.utils.text import slugify
+
+# Headings that start a new report section (# and ##)
+SECTION_HEADING = re.compile(r'^(#{1,2})\s+(.+?)\s*#*\s*$')
+CODE_FENCE = re.compile(r'^\s*(```|~~~)')
+MARKDOWN_EXTENSIONS = ['tables', 'fenced_code', 'sane_lists']
+DEFAULT_SECTION_TITLE = 'AI Validation Report'
+
+# What rendered reports may contain: the markup of MARKDOWN_EXTENSIONS.
+# Reports carry LLM output (and raw HTML passes through markdown), so
+# anything else - scripts, event handlers, iframes, styles - is dropped.
+REPORT_TAGS = {
+    'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'p', 'br', 'hr', 'blockquote',
+    'ul', 'ol', 'li', 'strong', 'em', 'b', 'i', 'code', 'pre', 'a',
+    'table', 'thead', 'tbody', 'tr', 'th', 'td',
+}
+REPORT_ATTRIBUTES = {
+    'a': {'href', 'title'},
+    'ol': {'start'},
+    'th': {'align', 'style'},
+    'td': {'align', 'style'},
+}
+
+
+def render_report(markdown_text):
+    """
+    Split a markdown report at its top-level headings and render each part
+
+    Returns [{'title', 'anchor', 'level', 'html'}]; text before the first
+    heading becomes a leading section of its own.
+    """
+    parts, current, in_code = [], None, False
+    for line in markdown_text.splitlines():
+        if CODE_FENCE.match(line):
+            in_code = not in_code
+        heading = None if in_code else SECTION_HEADING.match(line)
+        if heading:
+            current = {'title': heading.group(2), 'level': len(heading.group(1)), 'lines': []}
+            parts.append(current)
+            continue
+        if current is None:
+            current = {'title': DEFAULT_SECTION_TITLE, 'level': 1, 'lines': []}
+            parts.append(current)
+        current['lines'].append(line)
+
+    sections, anchors = [], set()
+    for part in parts:
+        body = '\n'.join(part['lines']).strip()
+        if not body and part['title'] == DEFAULT_SECTION_TITLE:
+            continue
+        sections.append({
+            'title': part['title'],
+            'anchor': _unique_anchor(part['title'], anchors),
+            'level': part['level'],
+            'html': sanitize_html(markdown.markdown(body, extensions=MARKDOWN_EXTENSIONS)),
+        })
+    return sections
+
+
+def sanitize_html(html):
+    """Keep only REPORT_TAGS and REPORT_ATTRIBUTES of rendered report HTML"""
+    return nh3.clean(
+        html,
+        tags=REPORT_TAGS,
+        attributes=REPORT_ATTRIBUTES,
+        filter_style_properties={'text-align'},
+    )
+
+
+def store_report(session, markdown_text=None, sections=None):
+    """
+    Render a report once and store it compressed on the session
+
+    Pass the markdown source, or ready-made [{'title', 'html'}] sections from
+    the engine. Returns the names of the session fields that changed.
+    """
+    if markdown_text is not None:
+        sections = render_report(markdown_text)
+        source = markdown_text
+    else:
+        anchors = set()
+        sections = [
+            {
+                'title': section.get('title') or DEFAULT_SECTION_TITLE,
+                'anchor': _unique_anchor(section.get('title') or DEFAULT_SECTION_TITLE, anchors),
+                'level': section.get('level', 1),
+                'html': sanitize_html(section.get('html', '')),
+            }
+            for section in sections or []
+        ]
+        source = ''.join(section['html'] for section in sections)
+
+    session.report = source
+    session.report_blob = pack_sections(sections)
+    session.report_hash = hashlib.sha256(session.report_blob).hexdigest()
+    session.report_outline = [
+        {key: section[key] for key in ('title', 'anchor', 'level')} for section in sections
+    ]
+    return ['report', 'report_blob', 'report_hash', 'report_outline']
+
+
+def store_event_report(session, event):
+    """Store the report carried by an agent callback `final_report` event"""
+    if event.get('report_markdown') is not None:
+        return store_report(session, markdown_text=event['report_markdown'])
+    sections = event.get('report_sections') or [
+        {'title': DEFAULT_SECTION_TITLE, 'html': event.get('report_html', '')}
+    ]
+    return store_report(session, sections=sections)
+
+
+def pack_sections(sections):
+    return zlib.compress(json.dumps(sections, ensure_ascii=False).encode('utf-8'), 6)
+
+
+def unpack_sections(blob):
+    if not blob:
+        return []
+    return json.loads(zlib.decompress(bytes(blob)).decode('utf-8'))
+
+
+def _unique_anchor(title, taken):
+    base = slugify(title, allow_unicode=True) or 'section'
+    anchor, n = base, 2
+    while anchor in taken:
+        anchor, n = f"{base}-{n}", n + 1
+    taken.add(anchor)
+    return anchor
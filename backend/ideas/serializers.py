@@ -1,11 +1,13 @@
 from rest_framework import serializers
-from .models import Idea, Message, Session
+from .models import Idea, ImportJob, Message, Session
 
 class IdeaSerializer(serializers.ModelSerializer):
+    session = serializers.PrimaryKeyRelatedField(read_only=True)
+
     class Meta:
         model = Idea
-        fields = ['id', 'title', 'description', 'created_at', 'metadata']
-        read_only_fields = ['id', 'created_at']
+        fields = ['id', 'title', 'description', 'created_at', 'metadata', 'session']
+        read_only_fields = ['id', 'created_at', 'session']
 
 class MessageSerializer(serializers.ModelSerializer):
     class Meta:
@@ -14,12 +16,31 @@ class MessageSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'created_at']
 
 class SessionSerializer(serializers.ModelSerializer):
+    """
+    Session without its chat history or report body: fetch messages
+    incrementally from /api/messages/?session=<id>&since=<last_message_id>
+    and the report from /api/sessions/<id>/report/
+    """
     idea = IdeaSerializer(read_only=True)
-    messages = MessageSerializer(many=True, read_only=True)
+    message_count = serializers.IntegerField(read_only=True)
+    last_message_id = serializers.IntegerField(read_only=True, allow_null=True)
     
     class Meta:
         model = Session
-        fields = ['id', 'idea', 'started_at', 'finished', 'agent_run_id', 
-                 'report', 'report_sections', 'messages']
-        read_only_fields = ['id', 'started_at', 'finished', 'agent_run_id', 
-                           'report', 'report_sections']
\ No newline at end of file
+        fields = ['id', 'idea', 'started_at', 'finished', 'failed', 'progress', 'agent_run_id', 
+                 'report_hash', 'report_outline', 'message_count', 'last_message_id']
+        read_only_fields = ['id', 'started_at', 'finished', 'failed', 'progress', 'agent_run_id', 
+                           'report_hash', 'report_outline']
+
+class ImportJobSerializer(serializers.ModelSerializer):
+    """Bulk import result with the aggregate progress of its sessions"""
+    progress = serializers.SerializerMethodField()
+
+    class Meta:
+        model = ImportJob
+        fields = ['id', 'format', 'rows_total', 'ideas_created', 'rows_rejected', 'errors', 'created_at', 'progress']
+        read_only_fields = fields
+
+    def get_progress(self, job):
+        from .imports import job_progress
+        return job_progress(job)
@@ -0,0 +1,41 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .caching import invalidate_deleted_session, invalidate_idea, invalidate_sessions
+from .events import publish_messages
+from .models import Idea, Message, Session
+
+
+@receiver(post_save, sender=Message)
+def publish_new_message(sender, instance, created, **kwargs):
+    # Bulk-created messages bypass signals; their writers publish them
+    if created:
+        transaction.on_commit(lambda: publish_messages([instance]))
+
+
+# Cache versions are bumped after commit so a concurrent read can't cache
+# the old rows under the new version. Bulk writers invalidate explicitly.
+
+@receiver(post_save, sender=Message)
+def invalidate_message_session(sender, instance, **kwargs):
+    transaction.on_commit(lambda: invalidate_sessions([instance.session_id]))
+
+
+@receiver(post_save, sender=Session)
+def invalidate_session(sender, instance, **kwargs):
+    transaction.on_commit(lambda: invalidate_sessions([instance.pk]))
+
+
+@receiver(post_delete, sender=Session)
+def invalidate_deleted_session_payload(sender, instance, **kwargs):
+    # Also sent when an idea's deletion cascades: by the time the idea's
+    # receiver runs, its session is gone and can't be found to invalidate
+    session_id = instance.pk
+    transaction.on_commit(lambda: invalidate_deleted_session(session_id))
+
+
+@receiver(post_save, sender=Idea)
+@receiver(post_delete, sender=Idea)
+def invalidate_idea_owner(sender, instance, **kwargs):
+    transaction.on_commit(lambda: invalidate_idea(instance))
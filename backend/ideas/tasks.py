@@ -1,19 +1,77 @@
 from celery import shared_task
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+from datetime import timedelta
 from .models import Session, Message
 from .agent_client import AgentClient
+from .engine_http import EngineUnavailable
+from .events import get_redis
 import logging
+import time
+import uuid
+import requests
+from redis import RedisError
 
 logger = logging.getLogger(__name__)
 
-@shared_task
+@shared_task(acks_late=True, ignore_result=True)
 def start_session_task(session_id):
-    """Start AI validation session in background"""
+    """
+    Start AI validation session in background
+
+    Acknowledged after it runs, so a worker lost mid-task gets the task
+    redelivered; a session that already has an agent run is not restarted.
+    """
+    try:
+        return _start_session(session_id)
+    except EngineUnavailable as e:
+        logger.warning(f"Deferring start of session {session_id}: {e}")
+        start_session_task.apply_async((session_id,), countdown=max(e.retry_after, 1))
+        return {"deferred": str(e)}
+
+@shared_task(acks_late=True, ignore_result=True)
+def start_sessions_task(session_ids):
+    """
+    Start a chunk of bulk-imported sessions, one task per chunk
+
+    Sessions left when the engine becomes unavailable are deferred together.
+    Redelivery is safe: already started sessions are skipped.
+    """
+    for index, session_id in enumerate(session_ids):
+        try:
+            _start_session(session_id)
+        except EngineUnavailable as e:
+            remaining = session_ids[index:]
+            logger.warning(f"Deferring start of {len(remaining)} session(s): {e}")
+            start_sessions_task.apply_async((remaining,), countdown=max(e.retry_after, 1))
+            return
+
+def _start_session(session_id):
+    """
+    Start one session and schedule its tracking
+
+    Raises EngineUnavailable for the caller to defer; other failures are
+    recorded as a system message on the session.
+    """
     try:
         session = Session.objects.get(id=session_id)
+        if session.agent_run_id:
+            logger.info(f"Session {session_id} already started as {session.agent_run_id}, skipping")
+            if not (session.finished or session.failed) and settings.SESSION_TRACKER == 'celery':
+                # The first delivery may have died before scheduling tracking;
+                # an extra chain is stopped by the tracking token
+                schedule_tracking(session_id, settings.AGENT_POLL_INTERVAL_SECONDS)
+            return {"skipped": session.agent_run_id}
         agent_client = AgentClient()
         result = agent_client.start_session(session)
         logger.info(f"Started session {session_id}: {result}")
+        if session.agent_run_id and settings.SESSION_TRACKER == 'celery':
+            # Follow the execution with short checks instead of holding this worker
+            schedule_tracking(session_id, settings.AGENT_POLL_INTERVAL_SECONDS)
         return result
+    except EngineUnavailable:
+        raise
     except Exception as e:
         logger.error(f"Failed to start session {session_id}: {e}")
         # Create error message
@@ -29,7 +87,78 @@ def start_session_task(session_id):
             pass
         return {"error": str(e)}
 
-@shared_task
+def _tracking_key(session_id):
+    return f"track:{session_id}"
+
+def schedule_tracking(session_id, countdown):
+    """
+    Queue the next check of a session under a new chain token
+
+    Only the task holding the session's latest token keeps polling: a
+    track_session_task redelivered after its worker died (acks_late) once
+    it had already queued its successor finds its token superseded and
+    stops, instead of forking a second polling chain.
+    """
+    token = uuid.uuid4().hex
+    track_session_task.apply_async((session_id, token), countdown=countdown)
+    # Set after queuing: if the worker dies in between, the redelivered
+    # task still holds the current token and carries on, the new one stops
+    try:
+        cache.set(_tracking_key(session_id), token, settings.AGENT_TRACKING_TIMEOUT_SECONDS * 2)
+    except RedisError as e:
+        logger.warning(f"Tracking token of session {session_id} not stored: {e}")
+
+def _holds_tracking(session_id, token):
+    """Whether `token` is the session's current chain; a lost token goes to the first claimant"""
+    key = _tracking_key(session_id)
+    try:
+        current = cache.get(key)
+        if current is None:
+            cache.add(key, token, settings.AGENT_TRACKING_TIMEOUT_SECONDS * 2)
+            current = cache.get(key)
+    except RedisError as e:
+        # Polling twice beats not polling at all
+        logger.warning(f"Tracking token of session {session_id} not checked: {e}")
+        return True
+    return current == token
+
+@shared_task(acks_late=True, ignore_result=True)
+def track_session_task(session_id, token=None):
+    """
+    Check a session's AI validation once, rescheduling itself until it finishes
+
+    `token` identifies the polling chain (see schedule_tracking); tasks
+    queued without one continue as the session's chain.
+    """
+    if token is not None and not _holds_tracking(session_id, token):
+        logger.info(f"Tracking of session {session_id} superseded by another chain, stopping")
+        return
+    try:
+        session = Session.objects.get(id=session_id)
+    except Session.DoesNotExist:
+        return
+    if session.finished or session.failed or not session.agent_run_id:
+        return
+
+    agent_client = AgentClient()
+    countdown = settings.AGENT_POLL_INTERVAL_SECONDS
+    try:
+        if agent_client.check_progress(session):
+            return
+    except EngineUnavailable as e:
+        countdown = max(countdown, e.retry_after)
+    except requests.RequestException as e:
+        logger.warning(f"Failed to check session {session_id}: {e}")
+
+    deadline = session.started_at + timedelta(seconds=settings.AGENT_TRACKING_TIMEOUT_SECONDS)
+    if timezone.now() >= deadline:
+        agent_client.timeout_session(session).save()
+        session.save(update_fields=['failed', 'finished_at'])
+        return
+
+    schedule_tracking(session_id, countdown)
+
+@shared_task(ignore_result=True)
 def send_user_message_task(session_id, message_id):
     """Forward user message to AI agents"""
     try:
@@ -41,4 +170,17 @@ def send_user_message_task(session_id, message_id):
         return result
     except Exception as e:
         logger.error(f"Failed to send message {message_id} to session {session_id}: {e}")
-        return {"error": str(e)}
\ No newline at end of file
+        return {"error": str(e)}
+
+@shared_task(ignore_result=True)
+def archive_sessions_task():
+    """Periodic (celery beat): move old sessions' history to cold storage"""
+    from .archive import archive_sessions
+    if settings.SESSION_ARCHIVE_AFTER_DAYS:
+        archive_sessions()
+
+@shared_task(ignore_result=True)
+def bench_io_task(counter_key, latency):
+    """No-op task standing in for one engine HTTP call, for bench_tasks"""
+    time.sleep(latency)
+    get_redis().incr(counter_key)
@@ -0,0 +1,46 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+
+from ideas.agent_client import AgentClient
+from ideas.models import Idea, Message, Session
+
+
+def engine_response(data):
+    return mock.Mock(json=mock.Mock(return_value=data))
+
+
+class QuickReportTests(TestCase):
+
+    def setUp(self):
+        user = get_user_model().objects.create_user(username='quick', password='x')
+        idea = Idea.objects.create(owner=user, title="Idea", description="Quick fixture")
+        self.session = Session.objects.create(idea=idea, agent_run_id='run-1')
+        self.client = AgentClient()
+        self.client.http = mock.Mock()
+
+    @override_settings(AGENT_VALIDATION_MODE='quick_and_full')
+    def test_start_requests_the_configured_mode(self):
+        self.client.http.post.return_value = engine_response({'execution_id': 'run-2'})
+
+        self.client.start_session(self.session)
+
+        self.assertEqual(self.client.http.post.call_args.kwargs['json']['mode'], 'quick_and_full')
+
+    def test_quick_report_is_posted_once_while_running(self):
+        status = {'status': 'running', 'agents_completed': 0, 'quick_report_ready': True}
+        quick = {'execution_id': 'run-1', 'report_markdown': "# Short verdict"}
+        self.client.http.get.side_effect = lambda path, **kwargs: engine_response(
+            quick if path.endswith('/quick') else status
+        )
+
+        self.client.check_progress(self.session)
+        self.client.check_progress(self.session)
+
+        quick_paths = [c.args[0] for c in self.client.http.get.call_args_list if c.args[0].endswith('/quick')]
+        self.assertEqual(quick_paths, ["/api/v1/result/run-1/quick"])
+        message = Message.objects.get(session=self.session, metadata__type='quick_report')
+        self.assertIn("# Short verdict", message.content)
+        self.session.refresh_from_db()
+        self.assertTrue(self.session.progress['quick_report_delivered'])
@@ -0,0 +1,25 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from ideas.models import Idea, Session
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class SessionCacheTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_user(username='cached', password='x')
+        self.idea = Idea.objects.create(owner=self.user, title="Idea", description="Cache fixture")
+        self.session = Session.objects.create(idea=self.idea)
+        self.client.force_login(self.user)
+
+    def test_deleting_idea_stops_serving_its_session(self):
+        url = f'/api/sessions/{self.session.pk}/'
+        self.assertEqual(self.client.get(url).status_code, 200)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.idea.delete()
+
+        self.assertEqual(self.client.get(url).status_code, 404)
@@ -0,0 +1,70 @@
+import csv
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+
+from ideas.models import Idea, ImportJob, Subscription
+from ideas.usage import lock_usage, record_idea
+
+
+@override_settings(BULK_IMPORT_MAX_ROWS=3, BULK_IMPORT_CHUNK_SIZE=2)
+class BulkImportTests(TestCase):
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(username='importer', password='x')
+        Subscription.objects.create(user=self.user, active=True, plan='pro')
+        self.client.force_login(self.user)
+
+    def upload(self, rows):
+        body = 'title,description\n' + ''.join(f'Idea {n},Imported idea {n}\n' for n in range(rows))
+        return self.client.post('/api/ideas/bulk/', body, content_type='text/csv')
+
+    def test_upload_at_the_limit_is_imported(self):
+        response = self.upload(3)
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response.json()['ideas_created'], 3)
+        self.assertEqual(Idea.objects.filter(owner=self.user).count(), 3)
+
+    def test_upload_over_the_limit_is_rejected_whole(self):
+        response = self.upload(4)
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('file', response.json())
+        self.assertFalse(ImportJob.objects.exists())
+        self.assertFalse(Idea.objects.exists())
+
+    def test_non_utf8_upload_is_rejected(self):
+        body = 'title,description\nCaf\xe9,Coffee shop\n'.encode('latin-1')
+        response = self.client.post('/api/ideas/bulk/', body, content_type='text/csv')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('file', response.json())
+        self.assertFalse(ImportJob.objects.exists())
+
+    def test_malformed_csv_is_rejected(self):
+        body = 'title,description\nBig,' + 'x' * (csv.field_size_limit() + 1) + '\n'
+        response = self.client.post('/api/ideas/bulk/', body, content_type='text/csv')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('Malformed CSV', response.json()['file'])
+
+
+@override_settings(FREE_IDEAS_PER_PERIOD=2, BULK_IMPORT_CHUNK_SIZE=10)
+class BulkImportQuotaTests(TestCase):
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(username='free', password='x')
+        self.client.force_login(self.user)
+
+    def test_quota_is_checked_after_locking_usage(self):
+        # Another upload of the user commits an idea while this one is parsed
+        def concurrent_import(user_id):
+            lock_usage(user_id)
+            record_idea(user_id)
+
+        with mock.patch('ideas.imports.lock_usage', side_effect=concurrent_import):
+            response = self.client.post(
+                '/api/ideas/bulk/', 'title,description\nOne,First idea\nTwo,Second idea\n', content_type='text/csv'
+            )
+
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response.json()['ideas_created'], 1)
+        self.assertEqual(response.json()['rows_rejected'], 1)
@@ -0,0 +1,112 @@
+import hashlib
+import hmac
+import json
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.test import Client, TestCase, override_settings
+
+from ideas.models import Idea, Message, Session
+
+IDEAS = 4
+MESSAGES_PER_SESSION = 5
+
+
+# Measure the database path, not the API response cache
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}})
+class QueryBudgetTests(TestCase):
+    """
+    Queries per request of the API hot paths
+
+    The fixture has several ideas, sessions and messages per user, so a
+    per-row query (N+1) changes the counts. Counts include authentication
+    (session and user lookups); the agent callbacks are unauthenticated.
+    Latency at production volume is measured by the perf_check command.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        User = get_user_model()
+        cls.user = User.objects.create_user(username='budget', password='x')
+        other = User.objects.create_user(username='budget-other', password='x')
+        for owner in (cls.user, other):
+            for n in range(IDEAS):
+                idea = Idea.objects.create(owner=owner, title=f"Idea {n}", description="Budget fixture")
+                session = Session.objects.create(idea=idea, agent_run_id=f"run-{owner.pk}-{n}")
+                Message.objects.bulk_create([
+                    Message(session=session, sender=Message.SENDER_AGENT, content=f"Message {m}")
+                    for m in range(MESSAGES_PER_SESSION)
+                ])
+        cls.session = Session.objects.filter(idea__owner=cls.user).order_by('-pk').first()
+        cls.since = Message.objects.filter(session=cls.session).order_by('id').values_list('id', flat=True)[1]
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def assertResponseQueries(self, num, call):
+        with self.assertNumQueries(num):
+            response = call()
+        self.assertLess(response.status_code, 400, response.content[:200])
+        return response
+
+    def test_ideas_list(self):
+        response = self.assertResponseQueries(3, lambda: self.client.get('/api/ideas/'))
+        self.assertEqual(len(response.json()), IDEAS)
+
+    def test_idea_detail(self):
+        self.assertResponseQueries(3, lambda: self.client.get(f'/api/ideas/{self.session.idea_id}/'))
+
+    def test_sessions_list(self):
+        response = self.assertResponseQueries(3, lambda: self.client.get('/api/sessions/'))
+        self.assertEqual(len(response.json()), IDEAS)
+
+    def test_session_detail(self):
+        self.assertResponseQueries(4, lambda: self.client.get(f'/api/sessions/{self.session.pk}/'))
+
+    def test_session_messages(self):
+        response = self.assertResponseQueries(
+            4, lambda: self.client.get(f'/api/messages/?session={self.session.pk}')
+        )
+        self.assertEqual(len(response.json()['results']), MESSAGES_PER_SESSION)
+
+    def test_messages_since(self):
+        response = self.assertResponseQueries(
+            4, lambda: self.client.get(f'/api/messages/?session={self.session.pk}&since={self.since}')
+        )
+        self.assertEqual(len(response.json()['results']), MESSAGES_PER_SESSION - 2)
+
+    def test_agent_callback(self):
+        event = self.event('single', self.session)
+        self.assertResponseQueries(4, lambda: self.signed_post('/api/agents/callback/', event))
+
+    def test_agent_callback_redelivery(self):
+        event = self.event('redelivered', self.session)
+        self.signed_post('/api/agents/callback/', event)
+        # The duplicate insert is rolled back to its savepoint
+        response = self.assertResponseQueries(5, lambda: self.signed_post('/api/agents/callback/', event))
+        self.assertEqual(response.json(), {'status': 'duplicate'})
+        self.assertEqual(Message.objects.filter(event_id=event['event_id']).count(), 1)
+
+    def test_agent_callback_batch(self):
+        events = [
+            self.event(f"{session.pk}-{n}", session)
+            for session in Session.objects.filter(idea__owner=self.user)
+            for n in range(3)
+        ]
+        response = self.assertResponseQueries(5, lambda: self.signed_post('/api/agents/callback/batch/', events))
+        self.assertEqual(response.json()['created'], len(events))
+
+    def event(self, key, session):
+        return {
+            'event_id': f"budget-{key}",
+            'session_id': session.pk,
+            'type': 'message',
+            'content': f"Event {key}",
+            'metadata': {'type': 'test'},
+        }
+
+    def signed_post(self, path, payload):
+        body = json.dumps(payload).encode('utf-8')
+        signature = hmac.new(settings.AGENT_CALLBACK_SECRET.encode('utf-8'), body, hashlib.sha256).hexdigest()
+        # The engine calls back without a user session
+        return Client().post(path, body, content_type='application/json', HTTP_X_AGENT_SIGNATURE=signature)
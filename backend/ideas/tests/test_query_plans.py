@@ -0,0 +1,44 @@
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+
+from ideas.models import Idea, Message, Session
+from ideas.query_plans import hot_query_checks, index_used
+
+
+class HotQueryPlanTests(TestCase):
+    """EXPLAIN every hot query and assert it scans one of its indexes"""
+
+    @classmethod
+    def setUpTestData(cls):
+        User = get_user_model()
+        for n in range(3):
+            user = User.objects.create_user(username=f"planner-{n}", password='x')
+            for i in range(5):
+                idea = Idea.objects.create(owner=user, title=f"Idea {i}", description="Plan fixture")
+                session = Session.objects.create(idea=idea, agent_run_id=f"run-{n}-{i}", finished=i % 2 == 0)
+                Message.objects.bulk_create([
+                    Message(session=session, sender=Message.SENDER_AGENT, content=f"Message {m}")
+                    for m in range(4)
+                ])
+        cls.owner_id = user.pk
+        cls.session_id = session.pk
+
+    def setUp(self):
+        if connection.vendor == 'postgresql':
+            # Fixture tables are tiny; make the planner show which index it would use
+            with connection.cursor() as cursor:
+                cursor.execute("SET LOCAL enable_seqscan = off")
+                cursor.execute("ANALYZE")
+
+    def test_hot_queries_use_their_indexes(self):
+        for label, queryset, indexes in hot_query_checks(self.owner_id, self.session_id):
+            with self.subTest(label):
+                self.assertTrue(indexes, f"{label}: no index to check against")
+                plan = queryset.explain()
+                self.assertIsNotNone(index_used(plan, indexes), f"{label} does not use {indexes}:\n{plan}")
+
+    def test_column_names_in_filters_do_not_count(self):
+        plan = 'Seq Scan on ideas_session  (cost=0.00..1.05 rows=1)\n  Filter: ((agent_run_id)::text = \'lookup\'::text)'
+        self.assertIsNone(index_used(plan, ['ideas_session_agent_run_id_8e7e3b52']))
+        self.assertIsNone(index_used(plan, ['agent_run_id_idx']))
@@ -0,0 +1,27 @@
+from django.test import SimpleTestCase
+
+from ideas.reports import render_report, store_event_report, unpack_sections
+from ideas.models import Session
+
+
+class ReportSanitizingTests(SimpleTestCase):
+
+    def test_raw_html_in_markdown_is_stripped(self):
+        html = render_report(
+            "# Verdict\n<script>alert(1)</script>\n\n"
+            "<img src=x onerror=alert(1)> [link](javascript:alert(1)) **go**"
+        )[0]['html']
+
+        self.assertNotIn('<script', html)
+        self.assertNotIn('onerror', html)
+        self.assertNotIn('javascript:', html)
+        self.assertIn('<strong>go</strong>', html)
+
+    def test_engine_sections_are_sanitized(self):
+        session = Session()
+        store_event_report(session, {
+            'report_sections': [{'title': 'Market', 'html': '<p onclick="x()">Big</p><iframe src="//e"></iframe>'}]
+        })
+
+        section, = unpack_sections(session.report_blob)
+        self.assertEqual(section['html'], '<p>Big</p>')
@@ -0,0 +1,29 @@
+import base64
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+
+from ideas.models import Idea, Session
+
+
+class SessionStreamAuthTests(TestCase):
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(username='streamer', password='secret')
+        idea = Idea.objects.create(owner=self.user, title="Idea", description="Stream fixture")
+        self.session = Session.objects.create(idea=idea)
+        self.url = f'/api/sessions/{self.session.pk}/stream/'
+
+    def test_anonymous_request_is_rejected(self):
+        self.assertEqual(self.client.get(self.url).status_code, 401)
+
+    def test_api_authentication_classes_are_honoured(self):
+        # Basic auth is one of the API's authentication classes, not a Django login
+        credentials = base64.b64encode(b'streamer:wrong').decode()
+        response = self.client.get(self.url, HTTP_AUTHORIZATION=f'Basic {credentials}')
+        self.assertEqual(response.status_code, 401)
+
+        other = get_user_model().objects.create_user(username='other', password='secret')
+        credentials = base64.b64encode(b'other:secret').decode()
+        response = self.client.get(self.url, HTTP_AUTHORIZATION=f'Basic {credentials}')
+        self.assertEqual(response.status_code, 404)
@@ -0,0 +1,67 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from ideas import tasks
+from ideas.models import Idea, Session
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class TrackSessionTaskTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        user = get_user_model().objects.create_user(username='tracked', password='x')
+        idea = Idea.objects.create(owner=user, title="Idea", description="Tracking fixture")
+        self.session = Session.objects.create(idea=idea, agent_run_id='run-1')
+        patcher = mock.patch.object(tasks.AgentClient, 'check_progress', return_value=False)
+        self.check_progress = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def queued_tokens(self, apply_async):
+        return [call.args[0][1] for call in apply_async.call_args_list]
+
+    @mock.patch.object(tasks.track_session_task, 'apply_async')
+    def test_chain_reschedules_with_a_new_token(self, apply_async):
+        tasks.schedule_tracking(self.session.pk, 10)
+        first, = self.queued_tokens(apply_async)
+
+        tasks.track_session_task(self.session.pk, first)
+
+        self.assertEqual(self.check_progress.call_count, 1)
+        second = self.queued_tokens(apply_async)[1]
+        self.assertNotEqual(second, first)
+        self.assertEqual(cache.get(f"track:{self.session.pk}"), second)
+
+    @mock.patch.object(tasks.track_session_task, 'apply_async')
+    def test_redelivered_check_does_not_fork_the_chain(self, apply_async):
+        tasks.schedule_tracking(self.session.pk, 10)
+        first, = self.queued_tokens(apply_async)
+        tasks.track_session_task(self.session.pk, first)
+
+        # The worker died before acking: the same message runs again
+        tasks.track_session_task(self.session.pk, first)
+
+        self.assertEqual(self.check_progress.call_count, 1)
+        self.assertEqual(apply_async.call_count, 2)
+
+    @override_settings(SESSION_TRACKER='celery')
+    @mock.patch.object(tasks.track_session_task, 'apply_async')
+    def test_redelivered_start_schedules_tracking(self, apply_async):
+        # The first delivery saved agent_run_id, then its worker died
+        with mock.patch.object(tasks.AgentClient, 'start_session') as start_session:
+            result = tasks.start_session_task(self.session.pk)
+
+        start_session.assert_not_called()
+        self.assertEqual(result, {"skipped": 'run-1'})
+        token, = self.queued_tokens(apply_async)
+        self.assertEqual(cache.get(f"track:{self.session.pk}"), token)
+
+    @override_settings(SESSION_TRACKER='celery')
+    @mock.patch.object(tasks.track_session_task, 'apply_async')
+    def test_redelivered_start_of_finished_session_is_not_tracked(self, apply_async):
+        Session.objects.filter(pk=self.session.pk).update(finished=True)
+        tasks.start_session_task(self.session.pk)
+        apply_async.assert_not_called()
@@ -1,14 +1,19 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import IdeaViewSet, MessageViewSet, agent_callback, stripe_start_subscription, stripe_webhook_stub
+from .views import IdeaViewSet, ImportJobViewSet, SessionViewSet, MessageViewSet, session_stream, usage_summary, agent_callback, agent_callback_batch, stripe_start_subscription, stripe_webhook_stub
 
 router = DefaultRouter()
 router.register(r'ideas', IdeaViewSet, basename='idea')
+router.register(r'sessions', SessionViewSet, basename='session')
+router.register(r'import-jobs', ImportJobViewSet, basename='import-job')
 router.register(r'messages', MessageViewSet, basename='message')
 
 urlpatterns = [
     path('', include(router.urls)),
+    path('sessions/<int:pk>/stream/', session_stream, name='session-stream'),
+    path('usage/', usage_summary, name='usage-summary'),
     path('agents/callback/', agent_callback, name='agent-callback'),
+    path('agents/callback/batch/', agent_callback_batch, name='agent-callback-batch'),
     path('stripe/start/', stripe_start_subscription, name='stripe-start'),
     path('stripe/webhook/', stripe_webhook_stub, name='stripe-webhook'),
 ]
\ No newline at end of file
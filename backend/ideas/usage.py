@@ -0,0 +1,109 @@
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Sum
+from django.utils import timezone
+
+from .models import Idea, UsageDaily, UsageEvent
+
+logger = logging.getLogger(__name__)
+
+# UsageDaily counters summed over the quota period
+USAGE_FIELDS = ['ideas', 'executions', 'total_tokens', 'cached_prompt_tokens', 'llm_calls', 'duration_seconds']
+
+
+def record_idea(user_id, count=1):
+    """Meter newly created ideas"""
+    with transaction.atomic():
+        UsageEvent.objects.bulk_create([UsageEvent(user_id=user_id, kind=UsageEvent.KIND_IDEA) for _ in range(count)])
+        _add_daily(user_id, ideas=count)
+
+
+def record_execution(session, metrics):
+    """
+    Meter a finished engine execution from its result `metrics`
+
+    Idempotent per execution id, so repeated completion events (polling and
+    callbacks, redelivered tasks) are counted once.
+    """
+    metrics = metrics or {}
+    owner_id = Idea.objects.filter(pk=session.idea_id).values_list('owner_id', flat=True).first()
+    if owner_id is None:
+        return
+    fields = {
+        'total_tokens': metrics.get('total_tokens') or 0,
+        'cached_prompt_tokens': metrics.get('cached_prompt_tokens') or 0,
+        'llm_calls': metrics.get('llm_calls') or 0,
+        'duration_seconds': metrics.get('duration_seconds') or 0,
+    }
+    with transaction.atomic():
+        if session.agent_run_id:
+            _, created = UsageEvent.objects.get_or_create(
+                execution_id=session.agent_run_id,
+                defaults={'user_id': owner_id, 'session': session, 'kind': UsageEvent.KIND_EXECUTION, **fields},
+            )
+            if not created:
+                return
+        else:
+            UsageEvent.objects.create(user_id=owner_id, session=session, kind=UsageEvent.KIND_EXECUTION, **fields)
+        _add_daily(owner_id, executions=1, **fields)
+    logger.info(f"Metered execution {session.agent_run_id} of user {owner_id}: {fields['total_tokens']} tokens")
+
+
+def usage_for_period(user_id, days=None):
+    """Totals over the last `days` days (today included), from at most `days` UsageDaily rows"""
+    days = days or settings.USAGE_PERIOD_DAYS
+    since = timezone.localdate() - timedelta(days=days - 1)
+    totals = UsageDaily.objects.filter(user_id=user_id, day__gte=since).aggregate(
+        **{field: Sum(field) for field in USAGE_FIELDS}
+    )
+    return {field: totals[field] or 0 for field in USAGE_FIELDS}
+
+
+def usage_limits(user):
+    """Per-period limits of a user's plan; 0 means unlimited"""
+    subscription = getattr(user, 'subscription', None)
+    if subscription and subscription.active:
+        return {'ideas': 0, 'total_tokens': settings.SUBSCRIPTION_TOKENS_PER_PERIOD}
+    return {'ideas': settings.FREE_IDEAS_PER_PERIOD, 'total_tokens': settings.FREE_TOKENS_PER_PERIOD}
+
+
+def ideas_remaining(user):
+    """Ideas the user may still create this period, or None if unlimited"""
+    limit = usage_limits(user)['ideas']
+    if not limit:
+        return None
+    return max(0, limit - usage_for_period(user.pk)['ideas'])
+
+
+def lock_usage(user_id):
+    """
+    Lock the user's usage row of today until the transaction ends
+
+    Quota checks made after it see every idea recorded before, and other
+    recorders of the user wait for the transaction (_add_daily updates
+    that row), so check-then-create can't overshoot the quota.
+    """
+    UsageDaily.objects.select_for_update().get_or_create(user_id=user_id, day=timezone.localdate())
+
+
+def quota_exceeded(user):
+    """Reason a user can't start another validation, or None"""
+    limits = usage_limits(user)
+    usage = usage_for_period(user.pk)
+    days = settings.USAGE_PERIOD_DAYS
+    if limits['ideas'] and usage['ideas'] >= limits['ideas']:
+        return (
+            f"Free quota exhausted: only {limits['ideas']} idea(s) per {days} days. "
+            f"Buy a subscription to continue."
+        )
+    if limits['total_tokens'] and usage['total_tokens'] >= limits['total_tokens']:
+        return f"Token quota exhausted: {usage['total_tokens']} of {limits['total_tokens']} tokens used in the last {days} days."
+    return None
+
+
+def _add_daily(user_id, **deltas):
+    daily, _ = UsageDaily.objects.get_or_create(user_id=user_id, day=timezone.localdate())
+    UsageDaily.objects.filter(pk=daily.pk).update(**{field: F(field) + value for field, value in deltas.items()})
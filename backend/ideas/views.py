@@ -1,15 +1,30 @@
 import hmac, hashlib, json, os
-from datetime import timedelta
 from django.utils import timezone
+from django.http import Http404, JsonResponse, StreamingHttpResponse
+from django.db.models import BigIntegerField, Count, IntegerField, Max, Value
+from django.db.models.functions import Coalesce
+from asgiref.sync import sync_to_async
+from django.utils.cache import patch_cache_control
 from django.shortcuts import get_object_or_404
 from rest_framework import viewsets, permissions, status
 from rest_framework.response import Response
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework.decorators import action, api_view, permission_classes
 from rest_framework.permissions import AllowAny, IsAuthenticated
-from .models import Idea, Session, Message, Subscription
-from .serializers import IdeaSerializer, MessageSerializer, SessionSerializer
+from rest_framework.exceptions import AuthenticationFailed, ValidationError
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+from .models import Idea, ImportJob, Session, Message, Subscription
+from .serializers import IdeaSerializer, ImportJobSerializer, MessageSerializer, SessionSerializer
+from .pagination import MessageCursorPagination
+from .caching import cached_data, session_version_key, user_version_key
+from .archive import rehydrate_session
+from .imports import detect_format, import_ideas
+from .usage import quota_exceeded, record_execution, record_idea, usage_for_period, usage_limits
+from .reports import store_event_report
+from .events import get_async_redis, session_channel
+from .callbacks import MAX_CALLBACK_BATCH, ingest_agent_events
 from .agent_client import AgentClient
-from django.db import transaction
+from django.db import IntegrityError, transaction
 from .tasks import start_session_task, send_user_message_task
 from django.conf import settings
 
@@ -29,39 +44,184 @@ class IdeaViewSet(viewsets.ModelViewSet):
     permission_classes = [permissions.IsAuthenticated]
 
     def get_queryset(self):
-        return Idea.objects.filter(owner=self.request.user)
+        return Idea.objects.filter(owner=self.request.user).select_related('session')
+
+    def list(self, request, *args, **kwargs):
+        data = cached_data(
+            f"user:{request.user.pk}:ideas", [user_version_key(request.user.pk)],
+            lambda: super(IdeaViewSet, self).list(request, *args, **kwargs).data
+        )
+        return Response(data)
+
+    def retrieve(self, request, *args, **kwargs):
+        data = cached_data(
+            f"user:{request.user.pk}:idea:{kwargs['pk']}", [user_version_key(request.user.pk)],
+            lambda: super(IdeaViewSet, self).retrieve(request, *args, **kwargs).data
+        )
+        return Response(data)
 
     def create(self, request, *args, **kwargs):
         user = request.user
-        has_subscription = getattr(user, 'subscription', None) and user.subscription.active
-        if not has_subscription:
-            one_month_ago = timezone.now() - timedelta(days=30)
-            recent = Idea.objects.filter(owner=user, created_at__gte=one_month_ago).exists()
-            if recent:
-                return Response({
-                    "detail": "Free quota exhausted: only 1 idea per 30 days. Buy a subscription to continue."
-                }, status=status.HTTP_402_PAYMENT_REQUIRED)
+        exceeded = quota_exceeded(user)
+        if exceeded:
+            return Response({"detail": exceeded}, status=status.HTTP_402_PAYMENT_REQUIRED)
 
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         with transaction.atomic():
             idea = serializer.save(owner=user)
             session = Session.objects.create(idea=idea)
+            record_idea(user.pk)
             # start async task
             start_session_task.delay(session.id)
         headers = self.get_success_headers(serializer.data)
         return Response(serializer.data, status=status.HTTP_201_CREATED, headers=headers)
 
+    @action(detail=False, methods=['post'])
+    def bulk(self, request):
+        """
+        Import many ideas from CSV (header: title,description,...) or JSONL
+
+        Send the file as the request body with a text/csv or
+        application/x-ndjson content type, or as the multipart field `file`.
+        Returns the import job; its progress is at /api/import-jobs/<id>/.
+        """
+        exceeded = quota_exceeded(request.user)
+        if exceeded:
+            return Response({"detail": exceeded}, status=status.HTTP_402_PAYMENT_REQUIRED)
+
+        if request.content_type.startswith('multipart/'):
+            upload = request.FILES.get('file')
+            if upload is None:
+                raise ValidationError({'file': 'No file was submitted.'})
+            fmt = detect_format(upload.content_type, upload.name)
+            lines = upload
+        else:
+            fmt = detect_format(request.content_type)
+            stream = request.stream
+            lines = iter(stream.readline, b'') if stream is not None else []
+        if fmt is None:
+            raise ValidationError({'format': 'Send CSV (text/csv) or JSONL (application/x-ndjson).'})
+
+        job = import_ideas(request.user, lines, fmt)
+        return Response(
+            ImportJobSerializer(job).data,
+            status=status.HTTP_202_ACCEPTED,
+            headers={'Location': f'/api/import-jobs/{job.pk}/'},
+        )
+
+class ImportJobViewSet(viewsets.ReadOnlyModelViewSet):
+    serializer_class = ImportJobSerializer
+    permission_classes = [IsAuthenticated]
+
+    def get_queryset(self):
+        return ImportJob.objects.filter(owner=self.request.user).order_by('-created_at')
+
+class SessionViewSet(viewsets.ReadOnlyModelViewSet):
+    """
+    Sessions with their report outline
+
+    The rendered report is served by /report/ (all sections) and
+    /report/<anchor>/ (one section), both cacheable by ETag.
+    """
+    serializer_class = SessionSerializer
+    permission_classes = [IsAuthenticated]
+
+    def get_queryset(self):
+        return (
+            Session.objects
+            .filter(idea__owner=self.request.user)
+            .select_related('idea')
+            .defer('report', 'report_blob')
+            # Archived sessions keep their counts on the archive
+            .annotate(
+                message_count=Count('messages') + Coalesce(
+                    Max('archive__message_count'), Value(0), output_field=IntegerField()
+                ),
+                last_message_id=Coalesce(
+                    Max('messages__id'), Max('archive__last_message_id'), output_field=BigIntegerField()
+                ),
+            )
+            .order_by('-started_at')
+        )
+
+    def list(self, request, *args, **kwargs):
+        data = cached_data(
+            f"user:{request.user.pk}:sessions", [user_version_key(request.user.pk)],
+            lambda: super(SessionViewSet, self).list(request, *args, **kwargs).data
+        )
+        return Response(data)
+
+    def retrieve(self, request, *args, **kwargs):
+        # Opening an archived session brings its history back
+        if kwargs['pk'].isdigit():
+            rehydrate_session(int(kwargs['pk']), owner=request.user)
+        data = cached_data(
+            f"user:{request.user.pk}:session:{kwargs['pk']}", [session_version_key(kwargs['pk'])],
+            lambda: super(SessionViewSet, self).retrieve(request, *args, **kwargs).data
+        )
+        return Response(data)
+
+    @action(detail=True, methods=['get'])
+    def report(self, request, pk=None):
+        return self._report_response(request, pk)
+
+    @action(detail=True, methods=['get'], url_path=r'report/(?P<anchor>[\w-]+)')
+    def report_section(self, request, pk=None, anchor=None):
+        return self._report_response(request, pk, anchor)
+
+    def _report_response(self, request, pk, anchor=None):
+        session = get_object_or_404(
+            Session.objects.only('report_hash'), pk=pk, idea__owner=request.user
+        )
+        if not session.report_hash:
+            raise Http404('Report is not ready yet.')
+
+        etag = f'"{session.report_hash}-{anchor}"' if anchor else f'"{session.report_hash}"'
+        if etag in request.headers.get('If-None-Match', ''):
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            sections = session.report_sections
+            if anchor:
+                sections = [section for section in sections if section['anchor'] == anchor]
+                if not sections:
+                    raise Http404('No such report section.')
+                data = sections[0]
+            else:
+                data = {'hash': session.report_hash, 'sections': sections}
+            response = Response(data)
+        response['ETag'] = etag
+        patch_cache_control(response, private=True, max_age=0, must_revalidate=True)
+        return response
+
 class MessageViewSet(viewsets.ModelViewSet):
+    """
+    Messages in creation order, cursor-paginated
+
+    Filters: ?session=<id> limits to one session, ?since=<message id> returns
+    only newer messages for incremental refreshes.
+    """
     serializer_class = MessageSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = MessageCursorPagination
 
     def get_queryset(self):
-        return Message.objects.filter(session__idea__owner=self.request.user)
+        queryset = Message.objects.filter(session__idea__owner=self.request.user)
+        for param, lookup in (('session', 'session_id'), ('since', 'id__gt')):
+            value = self.request.query_params.get(param)
+            if not value:
+                continue
+            if not value.isdigit():
+                raise ValidationError({param: 'Must be an integer id.'})
+            if param == 'session':
+                rehydrate_session(int(value), owner=self.request.user)
+            queryset = queryset.filter(**{lookup: int(value)})
+        return queryset
 
     def create(self, request, *args, **kwargs):
         session_id = request.data.get('session')
         session = get_object_or_404(Session, pk=session_id, idea__owner=request.user)
+        rehydrate_session(session.pk)
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         msg = serializer.save()
@@ -83,21 +243,128 @@ def agent_callback(request):
     except Session.DoesNotExist:
         return Response({"error": "session not found"}, status=404)
 
-    Message.objects.create(
-        session=session,
-        sender=Message.SENDER_AGENT,
-        content=payload.get('content', ''),
-        metadata=payload.get('metadata', {})
-    )
+    # A redelivered event hits the unique event_id, also when it races the first delivery
+    try:
+        with transaction.atomic():
+            Message.objects.create(
+                session=session,
+                sender=Message.SENDER_AGENT,
+                content=payload.get('content', ''),
+                metadata=payload.get('metadata', {}),
+                event_id=payload.get('event_id') or None
+            )
+    except IntegrityError:
+        return Response({"status": "duplicate"})
 
     if payload.get('type') == 'final_report':
-        session.report = payload.get('report_html', '')
-        session.report_sections = payload.get('report_sections', [])
+        update_fields = store_event_report(session, payload)
         session.finished = True
-        session.save()
+        session.finished_at = timezone.now()
+        session.save(update_fields=update_fields + ['finished', 'finished_at'])
+        record_execution(session, payload.get('metrics'))
 
     return Response({"status": "ok"})
 
+@api_view(['POST'])
+@permission_classes([AllowAny])
+def agent_callback_batch(request):
+    """
+    Ingest an array of agent events in one transaction
+
+    Body: [{"event_id", "session_id", "type", "content", "metadata", ...}],
+    signed as a whole with X-Agent-Signature. Redelivered events are skipped.
+    """
+    if not verify_agent_signature(request):
+        return Response({'error': 'invalid signature'}, status=401)
+
+    events = request.data
+    if not isinstance(events, list) or not all(isinstance(event, dict) for event in events):
+        return Response({'error': 'expected a list of events'}, status=400)
+    if len(events) > MAX_CALLBACK_BATCH:
+        return Response({'error': f'at most {MAX_CALLBACK_BATCH} events per batch'}, status=400)
+
+    try:
+        result = ingest_agent_events(events)
+    except IntegrityError:
+        # A concurrent delivery stored some of these events first; retry is safe
+        return Response({'error': 'concurrent delivery, retry'}, status=409)
+    return Response({"status": "ok", **result})
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def usage_summary(request):
+    """The user's metered usage over the quota period and their plan's limits"""
+    return Response({
+        'period_days': settings.USAGE_PERIOD_DAYS,
+        'usage': usage_for_period(request.user.pk),
+        'limits': usage_limits(request.user),
+    })
+
+async def session_stream(request, pk):
+    """
+    Server-sent events with a session's new messages
+
+    Replays messages newer than Last-Event-ID (or ?since=<id>), then pushes
+    each new message as it is published on the session's Redis channel.
+    Serve through project.asgi so an open stream doesn't hold a worker thread.
+    """
+    user = await sync_to_async(_api_user)(request)
+    if user is None:
+        return JsonResponse({'detail': 'Authentication credentials were not provided.'}, status=401)
+    if not await Session.objects.filter(pk=pk, idea__owner=user).aexists():
+        return JsonResponse({'detail': 'Not found.'}, status=404)
+    await sync_to_async(rehydrate_session)(pk)
+
+    since = request.headers.get('Last-Event-ID') or request.GET.get('since') or '0'
+    last_id = int(since) if since.isdigit() else 0
+
+    response = StreamingHttpResponse(_session_events(pk, last_id), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+def _api_user(request):
+    """The user authenticated by the API's authentication classes, or None"""
+    drf_request = Request(request, authenticators=[auth() for auth in api_settings.DEFAULT_AUTHENTICATION_CLASSES])
+    try:
+        user = drf_request.user
+    except AuthenticationFailed:
+        return None
+    return user if user and user.is_authenticated else None
+
+def _sse_message(data):
+    return f"id: {data['id']}\nevent: message\ndata: {json.dumps(data)}\n\n"
+
+async def _session_events(session_id, last_id):
+    client = get_async_redis()
+    pubsub = client.pubsub()
+    # Subscribe before reading the backlog so nothing falls in between
+    await pubsub.subscribe(session_channel(session_id))
+    try:
+        backlog = Message.objects.filter(session_id=session_id, id__gt=last_id).order_by('id')
+        async for message in backlog:
+            data = MessageSerializer(message).data
+            last_id = data['id']
+            yield _sse_message(data)
+
+        while True:
+            event = await pubsub.get_message(
+                ignore_subscribe_messages=True,
+                timeout=settings.SESSION_STREAM_KEEPALIVE_SECONDS
+            )
+            if event is None:
+                yield ": keepalive\n\n"
+                continue
+            data = json.loads(event['data'])
+            if data['id'] <= last_id:
+                continue
+            last_id = data['id']
+            yield _sse_message(data)
+    finally:
+        await pubsub.unsubscribe()
+        await pubsub.aclose()
+        await client.aclose()
+
 # Stripe-stub endpoints (simple)
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
@@ -44,6 +44,7 @@ TEMPLATES = [{
 }]
 
 WSGI_APPLICATION = 'project.wsgi.application'
+ASGI_APPLICATION = 'project.asgi.application'
 
 DATABASE_URL = os.getenv('DATABASE_URL')
 if DATABASE_URL:
@@ -74,7 +75,77 @@ LOGOUT_REDIRECT_URL = '/'
 # Agents and security
 AGENTS_BASE_URL = os.getenv('AGENTS_BASE_URL', 'http://localhost:8000')
 AGENT_CALLBACK_SECRET = os.getenv('AGENT_CALLBACK_SECRET', 'dev-secret')
+# Validation mode requested from the engine: 'full', 'quick' (single-pass
+# short report) or 'quick_and_full' (short report first, then the full run)
+AGENT_VALIDATION_MODE = os.getenv('AGENT_VALIDATION_MODE', 'full')
+# Result tracking: seconds between status checks and before giving up on a session
+AGENT_POLL_INTERVAL_SECONDS = int(os.getenv('AGENT_POLL_INTERVAL_SECONDS', '10'))
+AGENT_TRACKING_TIMEOUT_SECONDS = int(os.getenv('AGENT_TRACKING_TIMEOUT_SECONDS', '3600'))
+# HTTP client to the AI engine: connection pool per worker process, retries
+# on 429/5xx, and a circuit breaker that fails fast while the engine is down
+AGENT_HTTP_POOL_SIZE = int(os.getenv('AGENT_HTTP_POOL_SIZE', '20'))
+AGENT_HTTP_RETRIES = int(os.getenv('AGENT_HTTP_RETRIES', '3'))
+AGENT_CIRCUIT_FAILURE_THRESHOLD = int(os.getenv('AGENT_CIRCUIT_FAILURE_THRESHOLD', '5'))
+AGENT_CIRCUIT_RESET_SECONDS = int(os.getenv('AGENT_CIRCUIT_RESET_SECONDS', '30'))
+
+# Usage quotas over a rolling period, from the metering ledger
+# (ideas/usage.py); token limits of 0 mean unlimited
+USAGE_PERIOD_DAYS = int(os.getenv('USAGE_PERIOD_DAYS', '30'))
+FREE_IDEAS_PER_PERIOD = int(os.getenv('FREE_IDEAS_PER_PERIOD', '1'))
+FREE_TOKENS_PER_PERIOD = int(os.getenv('FREE_TOKENS_PER_PERIOD', '0'))
+SUBSCRIPTION_TOKENS_PER_PERIOD = int(os.getenv('SUBSCRIPTION_TOKENS_PER_PERIOD', '0'))
+
+# Bulk idea import: most rows per upload, and rows created and dispatched together
+BULK_IMPORT_MAX_ROWS = int(os.getenv('BULK_IMPORT_MAX_ROWS', '1000'))
+BULK_IMPORT_CHUNK_SIZE = int(os.getenv('BULK_IMPORT_CHUNK_SIZE', '100'))
+
+# Who follows running sessions: 'celery' (track_session_task) or 'asyncio'
+# (the track_sessions management command)
+SESSION_TRACKER = os.getenv('SESSION_TRACKER', 'celery')
 
 # Celery
 CELERY_BROKER_URL = os.getenv('CELERY_BROKER_URL', 'redis://localhost:6379/0')
-CELERY_RESULT_BACKEND = os.getenv('CELERY_RESULT_BACKEND', CELERY_BROKER_URL)
\ No newline at end of file
+CELERY_RESULT_BACKEND = os.getenv('CELERY_RESULT_BACKEND', CELERY_BROKER_URL)
+# 'agents' holds the HTTP-bound calls to the AI engine and is consumed by a
+# thread-pool worker; 'messages' keeps chat forwarding off that backlog
+CELERY_TASK_DEFAULT_QUEUE = 'default'
+CELERY_TASK_ROUTES = {
+    'ideas.tasks.start_session_task': {'queue': 'agents'},
+    'ideas.tasks.start_sessions_task': {'queue': 'agents'},
+    'ideas.tasks.track_session_task': {'queue': 'agents'},
+    'ideas.tasks.bench_io_task': {'queue': 'agents'},
+    'ideas.tasks.send_user_message_task': {'queue': 'messages'},
+}
+# acks_late tasks are redelivered if their worker dies; don't let a worker
+# reserve more than it is running
+CELERY_WORKER_PREFETCH_MULTIPLIER = int(os.getenv('CELERY_WORKER_PREFETCH_MULTIPLIER', '1'))
+CELERY_TASK_REJECT_ON_WORKER_LOST = True
+
+# Archival of ended sessions (ideas/archive.py): messages and report source of
+# sessions ended more than SESSION_ARCHIVE_AFTER_DAYS ago (0 disables) are
+# compressed into SessionArchive and restored when the session is opened
+SESSION_ARCHIVE_AFTER_DAYS = int(os.getenv('SESSION_ARCHIVE_AFTER_DAYS', '90'))
+SESSION_ARCHIVE_BATCH_SIZE = int(os.getenv('SESSION_ARCHIVE_BATCH_SIZE', '500'))
+CELERY_BEAT_SCHEDULE = {
+    'archive-ended-sessions': {
+        'task': 'ideas.tasks.archive_sessions_task',
+        'schedule': float(os.getenv('SESSION_ARCHIVE_INTERVAL_SECONDS', '3600')),
+    },
+}
+
+# Redis pub/sub for live session updates
+REDIS_URL = os.getenv('REDIS_URL', CELERY_BROKER_URL)
+# Seconds between keep-alive comments on idle event streams
+SESSION_STREAM_KEEPALIVE_SECONDS = int(os.getenv('SESSION_STREAM_KEEPALIVE_SECONDS', '15'))
+
+# Per-user cache of serialized ideas and sessions, invalidated by version
+# counters (see ideas/caching.py)
+CACHE_URL = os.getenv('CACHE_URL', REDIS_URL)
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': CACHE_URL,
+        'KEY_PREFIX': 'bvp',
+    }
+}
+API_CACHE_TIMEOUT_SECONDS = int(os.getenv('API_CACHE_TIMEOUT_SECONDS', '3600'))
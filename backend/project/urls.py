@@ -14,10 +14,14 @@ Including another URLconf
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
 from django.contrib import admin
+from django.contrib.staticfiles.urls import staticfiles_urlpatterns
 from django.urls import path, include
 
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/', include('ideas.urls')),
     path('', include('webapp.urls')),
-]
\ No newline at end of file
+]
+
+# runserver serves static files itself; under uvicorn they come from here (DEBUG only)
+urlpatterns += staticfiles_urlpatterns()